@@ -9,6 +9,31 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///data/groceries.db"
 
+    # SQLite engine profile, applied to every new connection
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 64 * 1024 * 1024  # bytes
+    sqlite_cache_size_kib: int = 16 * 1024
+
+    # Connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: float = 30.0
+
+    # Rendered list/export cache
+    render_cache_max_entries: int = 128
+
+    # Memoized parsing of item phrases (entries per memo; 0 disables)
+    parse_cache_size: int = 16384
+
+    # Bulk import: items merged and committed per transaction
+    import_batch_size: int = 200
+
+    # Change event stream (SSE)
+    event_buffer_size: int = 64  # events per subscriber before it must resync
+    event_heartbeat_seconds: float = 15.0
+
     # API
     api_token: str = ""
     cors_origins: str = "*"
@@ -20,6 +45,41 @@ class Settings(BaseSettings):
     # Albert Heijn integration
     ah_email: str = ""
     ah_password: str = ""
+    ah_base_url: str = "https://api.ah.nl"  # or a local stand-in, see tests/ah_stub.py
+    # Tokens are encrypted with this Fernet key (default: derived from the
+    # password) and stored in this file (default: next to the database)
+    ah_token_key: str = ""
+    ah_token_file: str = ""
+    ah_token_refresh_margin_seconds: int = 300  # refresh this long before expiry
+    # AH HTTP client: connection pool, timeouts and optional HTTP/2
+    ah_http_max_connections: int = 10
+    ah_http_max_keepalive_connections: int = 10
+    ah_http_keepalive_expiry_seconds: float = 60.0
+    ah_http_connect_timeout_seconds: float = 5.0
+    ah_http_read_timeout_seconds: float = 15.0
+    ah_http_pool_timeout_seconds: float = 10.0  # wait for a free connection
+    ah_http2: bool = False
+    ah_sync_concurrency: int = 6  # items searched/added at the same time
+    ah_item_timeout_seconds: float = 20.0
+    ah_patch_batch_size: int = 50  # products per shopping-list PATCH
+    ah_sync_wait_seconds: float = 8.0  # /sync/ah/simple answers "bezig" after this
+
+    # Outgoing AH request limits: rate, retries and circuit breaker
+    ah_rate_limit_per_second: float = 10.0  # 0 disables
+    ah_rate_limit_burst: int = 20
+    ah_retry_attempts: int = 3
+    ah_retry_base_delay: float = 0.5
+    ah_retry_max_delay: float = 8.0
+    ah_breaker_failure_threshold: int = 5  # consecutive failures before failing fast
+    ah_breaker_reset_seconds: float = 30.0
+
+    # Cached name-to-product matches
+    ah_match_ttl_days: int = 30
+    ah_match_not_found_ttl_hours: int = 24
+    # Search names as they are added, so a sync only has to add products
+    ah_prefetch_enabled: bool = False
+    ah_prefetch_concurrency: int = 2
+    ah_prefetch_queue_size: int = 500
 
     class Config:
         env_file = ".env"
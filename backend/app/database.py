@@ -1,9 +1,15 @@
 """Database configuration and session management."""
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from fastapi import Request
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.config import get_settings
+from app.config import Settings, get_settings
 
 settings = get_settings()
 
@@ -13,24 +19,115 @@ db_dir = os.path.dirname(db_path)
 if db_dir:
     os.makedirs(db_dir, exist_ok=True)
 
+# Alembic configuration lives next to the app package
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_REVISION = "0001"
+
+# HTTP methods that never write; everything else gets a write transaction
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def get_async_database_url(url: str) -> str:
+    """Translate a plain SQLite URL to its aiosqlite equivalent."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+def sqlite_pragmas(settings: Settings) -> list[str]:
+    """PRAGMA statements for the configured SQLite engine profile."""
+    return [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        # Negative values are interpreted by SQLite as KiB instead of pages
+        f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kib)}",
+    ]
+
+
 # Create engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False},  # SQLite specific
+engine = create_async_engine(
+    get_async_database_url(settings.database_url),
     echo=settings.log_level == "debug",
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
 )
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, connection_record):
+        """Apply the engine profile and take over transaction control."""
+        # Stop the driver from issuing its own BEGIN so _begin_sqlite_transaction
+        # can choose the locking mode
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas(settings):
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_sqlite_transaction(conn):
+        """Start transactions as DEFERRED, or IMMEDIATE for write sessions.
+
+        A deferred transaction that reads and then writes cannot wait for the
+        write lock (SQLite fails the upgrade immediately to avoid deadlock),
+        so busy_timeout only helps if writers take the lock up front.
+        """
+        mode = conn.get_execution_options().get("sqlite_begin", "DEFERRED")
+        conn.exec_driver_sql(f"BEGIN {mode}")
+
+
+# Session factories. Objects stay usable after commit so handlers can
+# serialize them without an implicit (and in async mode illegal) reload.
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+WriteSessionLocal = async_sessionmaker(
+    engine.execution_options(sqlite_begin="IMMEDIATE"),
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 # Base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
-    try:
+async def get_db(request: Request):
+    """Dependency to get database session.
+
+    Read-only requests use deferred transactions so they never wait on
+    writers; all other requests take the write lock when they begin.
+    """
+    factory = SessionLocal if request.method in READ_ONLY_METHODS else WriteSessionLocal
+    async with factory() as db:
         yield db
-    finally:
-        db.close()
+
+
+def alembic_config(connection) -> Config:
+    """Alembic configuration that runs on an open connection."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def _upgrade_schema(connection) -> None:
+    """Bring the schema to the latest migration on an open connection."""
+    config = alembic_config(connection)
+
+    # Databases created with create_all before migrations existed already
+    # have the baseline tables; record that instead of recreating them
+    tables = inspect(connection).get_table_names()
+    if "items" in tables and "alembic_version" not in tables:
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+
+
+async def run_migrations() -> None:
+    """Apply pending Alembic migrations."""
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_schema)
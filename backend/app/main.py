@@ -2,9 +2,10 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import select
 
 from app.config import get_settings
-from app.database import engine, Base, SessionLocal
+from app.database import engine, SessionLocal, run_migrations
 from app.models import Category, Item, ShoppingSession, SessionItem
 from app.models.category import DEFAULT_CATEGORIES
 from app.routers import (
@@ -15,36 +16,55 @@ from app.routers import (
     export_router,
     sync_router,
 )
+from app.services.ah import close_ah_service, get_ah_service
+from app.services.ah_prefetch import get_match_prefetcher
+from app.services.categories import get_category_registry
+from app.services.sync_jobs import get_sync_worker
 
 settings = get_settings()
 
 
-def seed_categories(db):
-    """Seed default categories if they don't exist."""
+async def seed_categories(db):
+    """Seed default categories if they don't exist and load the registry."""
+    result = await db.execute(select(Category.name))
+    existing = set(result.scalars().all())
     for cat_data in DEFAULT_CATEGORIES:
-        existing = db.query(Category).filter(Category.name == cat_data["name"]).first()
-        if not existing:
+        if cat_data["name"] not in existing:
             category = Category(**cat_data)
             db.add(category)
-    db.commit()
+    await db.commit()
+    await get_category_registry().load(db)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
-    # Startup: create tables and seed data
-    Base.metadata.create_all(bind=engine)
+    # Startup: migrate schema and seed data
+    await run_migrations()
 
     # Seed categories
-    db = SessionLocal()
-    try:
-        seed_categories(db)
-    finally:
-        db.close()
+    async with SessionLocal() as db:
+        await seed_categories(db)
+
+    # AH client with its connection pool, shared by all syncs
+    get_ah_service()
+
+    # Run AH syncs in the background, picking up jobs queued before a restart
+    sync_worker = get_sync_worker()
+    await sync_worker.start()
+
+    # Optionally look up AH products for items as they are added
+    match_prefetcher = get_match_prefetcher()
+    if settings.ah_prefetch_enabled:
+        await match_prefetcher.start()
 
     yield
 
-    # Shutdown: nothing to do
+    # Shutdown: stop the background AH work and release pooled connections
+    await match_prefetcher.stop()
+    await sync_worker.stop()
+    await close_ah_service()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -1,6 +1,17 @@
 """Database models."""
+from app.models.ah_match import AHProductMatch
+from app.models.ah_sync import AHItemSync
 from app.models.category import Category
 from app.models.item import Item
 from app.models.session import ShoppingSession, SessionItem
+from app.models.sync_job import SyncJob
 
-__all__ = ["Category", "Item", "ShoppingSession", "SessionItem"]
+__all__ = [
+    "AHItemSync",
+    "AHProductMatch",
+    "Category",
+    "Item",
+    "ShoppingSession",
+    "SessionItem",
+    "SyncJob",
+]
@@ -0,0 +1,27 @@
+"""Cached name-to-AH-product matches."""
+from datetime import datetime
+from sqlalchemy import Column, String, Float, Integer, Boolean, DateTime
+
+from app.database import Base
+
+
+class AHProductMatch(Base):
+    """AH product that an item name resolves to.
+
+    A row without ``product_id`` records that AH search found nothing.
+    Pinned matches are set by hand, never expire and are not overwritten
+    by search results.
+    """
+
+    __tablename__ = "ah_product_matches"
+
+    name_norm = Column(String(255), primary_key=True)
+    product_id = Column(Integer, nullable=True)
+    title = Column(String(255), nullable=True)
+    price = Column(Float, nullable=True)
+    pinned = Column(Boolean, default=False, nullable=False)
+    matched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<AHProductMatch {self.name_norm} -> {self.product_id}>"
@@ -0,0 +1,25 @@
+"""Per-item AH sync state model."""
+from datetime import datetime
+from sqlalchemy import Column, String, Float, Integer, DateTime, ForeignKey
+
+from app.database import Base
+
+
+class AHItemSync(Base):
+    """What the last successful sync put on the AH shopping list for an open item.
+
+    Rows are deleted by database triggers when the item is checked or
+    removed, or renamed (see migrations 0006 and 0007), so an item that
+    comes back or now means another product is pushed in full again.
+    """
+
+    __tablename__ = "ah_item_sync"
+
+    item_id = Column(String(36), ForeignKey("items.id"), primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=True)
+    qty = Column(Float, nullable=False)
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<AHItemSync {self.item_id} {self.qty}x {self.product_id}>"
@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, String, Float, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, Integer, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -41,10 +41,21 @@ class Item(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     last_added_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Stamped by database triggers on every insert/update (see migration 0003)
+    change_seq = Column(Integer, server_default="0", nullable=False, index=True)
 
     # Relationships
     category = relationship("Category", back_populates="items")
     session_items = relationship("SessionItem", back_populates="item")
 
+    __table_args__ = (
+        Index("ix_items_status_snooze_until", "status", "snooze_until"),
+        Index(
+            "ix_items_snooze_until_set",
+            "snooze_until",
+            sqlite_where=snooze_until.isnot(None),
+        ),
+    )
+
     def __repr__(self):
         return f"<Item {self.name_raw} ({self.qty}{self.unit or ''})>"
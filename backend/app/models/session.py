@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -39,6 +39,8 @@ class ShoppingSession(Base):
     # Relationships
     session_items = relationship("SessionItem", back_populates="session")
 
+    __table_args__ = (Index("ix_sessions_started_at", "started_at"),)
+
     def __repr__(self):
         return f"<ShoppingSession {self.store} @ {self.started_at}>"
 
@@ -60,5 +62,10 @@ class SessionItem(Base):
     session = relationship("ShoppingSession", back_populates="session_items")
     item = relationship("Item", back_populates="session_items")
 
+    __table_args__ = (
+        Index("ix_session_items_session_id_state", "session_id", "state"),
+        Index("ix_session_items_session_id_item_id", "session_id", "item_id"),
+    )
+
     def __repr__(self):
         return f"<SessionItem {self.item_id} in {self.session_id}>"
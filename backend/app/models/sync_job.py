@@ -0,0 +1,45 @@
+"""Background AH sync job model."""
+import uuid
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import (
+    Column, String, Integer, Boolean, Text, DateTime, Index, JSON, Enum as SQLEnum,
+)
+
+from app.database import Base
+
+
+class SyncJobStatus(str, Enum):
+    """Sync job status."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class SyncJob(Base):
+    """Sync of the open items to the AH shopping list, run in the background."""
+
+    __tablename__ = "sync_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(SQLEnum(SyncJobStatus), default=SyncJobStatus.QUEUED, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Push every open item in full instead of only what changed since the last sync
+    full_resync = Column(Boolean, default=False, server_default="0", nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    synced = Column(Integer, default=0, nullable=False)
+    unchanged = Column(Integer, default=0, server_default="0", nullable=False)
+    not_found = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    # Per-item results: [{"item", "status", "ah_product", "error"}, ...]
+    results = Column(JSON, nullable=True)
+
+    __table_args__ = (Index("ix_sync_jobs_status", "status"),)
+
+    def __repr__(self):
+        return f"<SyncJob {self.id} {self.status}>"
@@ -1,16 +1,27 @@
 """Categories API endpoints."""
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models.category import Category
+from app.routers.conditional import cache_headers, not_modified
 from app.schemas.category import CategoryResponse
+from app.services.categories import get_category_registry
+from app.services.versioning import get_list_version
 
 router = APIRouter(prefix="/api/v1/categories", tags=["categories"])
 
 
 @router.get("", response_model=list[CategoryResponse])
-async def list_categories(db: Session = Depends(get_db)):
+async def list_categories(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
     """List all categories."""
-    categories = db.query(Category).order_by(Category.sort_order).all()
-    return categories
+    list_version = get_list_version()
+    etag = list_version.etag(await list_version.current(db))
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers.update(cache_headers(etag))
+
+    return get_category_registry().all()
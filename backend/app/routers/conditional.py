@@ -0,0 +1,27 @@
+"""Helpers for ETag-based conditional GET requests."""
+from fastapi import Request, Response
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """Headers that let clients revalidate with If-None-Match on every use."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """Return a 304 response if the client already has this version."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
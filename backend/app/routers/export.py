@@ -1,16 +1,22 @@
 """Export API endpoints."""
+import json
 from datetime import datetime
 from enum import Enum
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import PlainTextResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.item import Item, ItemStatus, Store
-from app.models.category import Category
+from app.routers.conditional import cache_headers, not_modified
+from app.services.categories import get_category_registry
+from app.services.render_cache import RenderedBody, get_render_cache
+from app.services.versioning import get_list_version
 
 router = APIRouter(prefix="/api/v1/export", tags=["export"])
 
+PLAINTEXT_MEDIA_TYPE = "text/plain; charset=utf-8"
+
 
 class ExportFormat(str, Enum):
     PLAINTEXT = "plaintext"
@@ -33,55 +39,16 @@ def format_item_line(item: Item) -> str:
     return f"- {qty_str}{item.name_raw}{unit_str}"
 
 
-@router.get("/{store}")
-async def export_items(
-    store: str,
-    format: ExportFormat = Query(default=ExportFormat.PLAINTEXT),
-    include_checked: bool = Query(default=False),
-    include_snoozed: bool = Query(default=False),
-    simple: bool = Query(default=False, description="Simple list without headers (for Siri)"),
-    db: Session = Depends(get_db),
-):
-    """Export items for a specific store."""
-    # Parse store
-    store_enum = None
-    if store.upper() == "AH":
-        store_enum = Store.AH
-    elif store.upper() == "JUMBO":
-        store_enum = Store.JUMBO
-    # else: generic export
+def render_export(items: list[Item], store: str, format: ExportFormat, simple: bool) -> RenderedBody:
+    """Render the export body for a list of items."""
+    categories = get_category_registry()
 
-    # Build query
-    query = db.query(Item)
-
-    # Filter by status
-    if include_checked:
-        query = query.filter(Item.status.in_([ItemStatus.OPEN, ItemStatus.CHECKED]))
-    else:
-        query = query.filter(Item.status == ItemStatus.OPEN)
-
-    # Filter snoozed
-    if not include_snoozed:
-        query = query.filter(
-            (Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow())
-        )
-
-    # Filter by store preference
-    if store_enum:
-        query = query.filter(
-            (Item.preferred_store.is_(None)) | (Item.preferred_store == store_enum)
-        )
-
-    # Order by category, then name
-    query = query.outerjoin(Category).order_by(
-        Category.sort_order.nulls_last(),
-        Item.name_norm,
-    )
-
-    items = query.all()
+    def category_name(item: Item) -> str | None:
+        category = categories.get(item.category_id)
+        return category.name_nl if category else None
 
     if format == ExportFormat.JSON:
-        return {
+        payload = {
             "store": store,
             "exported_at": datetime.utcnow().isoformat(),
             "count": len(items),
@@ -91,17 +58,23 @@ async def export_items(
                     "name": item.name_raw,
                     "qty": item.qty,
                     "unit": item.unit,
-                    "category": item.category.name_nl if item.category else None,
+                    "category": category_name(item),
                     "status": item.status.value,
                 }
                 for item in items
             ],
         }
+        return RenderedBody(
+            content=json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(),
+            media_type="application/json",
+        )
 
     # Simple format for Siri - just item names
     if simple:
         if not items:
-            return PlainTextResponse("Je boodschappenlijst is leeg.")
+            return RenderedBody(
+                content="Je boodschappenlijst is leeg.".encode(), media_type=PLAINTEXT_MEDIA_TYPE
+            )
 
         item_names = []
         for item in items:
@@ -111,20 +84,20 @@ async def export_items(
             else:
                 item_names.append(item.name_raw)
 
-        return PlainTextResponse(", ".join(item_names))
+        return RenderedBody(content=", ".join(item_names).encode(), media_type=PLAINTEXT_MEDIA_TYPE)
 
     # Plaintext format - group by category
     lines = []
     current_category = None
 
     for item in items:
-        category_name = item.category.name_nl if item.category else "Overig"
+        name = category_name(item) or "Overig"
 
-        if category_name != current_category:
+        if name != current_category:
             if current_category is not None:
                 lines.append("")  # Empty line between categories
-            lines.append(f"## {category_name}")
-            current_category = category_name
+            lines.append(f"## {name}")
+            current_category = name
 
         lines.append(format_item_line(item))
 
@@ -132,4 +105,75 @@ async def export_items(
     store_name = store.upper() if store.upper() in ["AH", "JUMBO"] else "Boodschappen"
     header = f"# {store_name} ({len(items)} items)\n"
 
-    return PlainTextResponse(header + "\n".join(lines))
+    return RenderedBody(content=(header + "\n".join(lines)).encode(), media_type=PLAINTEXT_MEDIA_TYPE)
+
+
+async def query_export_items(
+    db: AsyncSession, store: str, include_checked: bool, include_snoozed: bool
+) -> list[Item]:
+    """Load the items that belong in an export."""
+    # Parse store
+    store_enum = None
+    if store.upper() == "AH":
+        store_enum = Store.AH
+    elif store.upper() == "JUMBO":
+        store_enum = Store.JUMBO
+    # else: generic export
+
+    # Build query
+    query = select(Item)
+
+    # Filter by status
+    if include_checked:
+        query = query.where(Item.status.in_([ItemStatus.OPEN, ItemStatus.CHECKED]))
+    else:
+        query = query.where(Item.status == ItemStatus.OPEN)
+
+    # Filter snoozed
+    if not include_snoozed:
+        query = query.where(
+            (Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow())
+        )
+
+    # Filter by store preference
+    if store_enum:
+        query = query.where(
+            (Item.preferred_store.is_(None)) | (Item.preferred_store == store_enum)
+        )
+
+    # Order by category, then name (categories are in memory)
+    result = await db.execute(query)
+    return get_category_registry().sort_items(result.scalars())
+
+
+@router.get("/{store}")
+async def export_items(
+    request: Request,
+    store: str,
+    format: ExportFormat = Query(default=ExportFormat.PLAINTEXT),
+    include_checked: bool = Query(default=False),
+    include_snoozed: bool = Query(default=False),
+    simple: bool = Query(default=False, description="Simple list without headers (for Siri)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Export items for a specific store.
+
+    Rendered bodies are cached per list version, so repeated polls (Siri,
+    widgets) skip the query and rendering until the list changes. For JSON
+    exports ``exported_at`` is the time the body was rendered.
+    """
+    list_version = get_list_version()
+    version = await list_version.current(db)
+    etag = list_version.etag(version)
+    if cached := not_modified(request, etag):
+        return cached
+
+    cache = get_render_cache()
+    key = ("export", store, format, include_checked, include_snoozed, simple)
+    body = cache.get(key, version)
+    if body is None:
+        items = await query_export_items(db, store, include_checked, include_snoozed)
+        body = render_export(items, store, format, simple)
+        cache.put(key, version, body, expires_at=list_version.snooze_deadline)
+
+    return Response(content=body.content, media_type=body.media_type, headers=cache_headers(etag))
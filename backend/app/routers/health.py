@@ -1,6 +1,11 @@
 """Health check endpoint."""
 from fastapi import APIRouter
 
+from app.services.ah import get_ah_service
+from app.services.ah_prefetch import get_match_prefetcher
+from app.services.parser import parse_cache_stats
+from app.services.render_cache import get_render_cache
+
 router = APIRouter(tags=["health"])
 
 
@@ -8,3 +13,15 @@ router = APIRouter(tags=["health"])
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "boodschappen-api"}
+
+
+@router.get("/health/cache")
+async def cache_stats():
+    """Render cache and parse memo counters."""
+    return {"render": get_render_cache().stats(), **parse_cache_stats()}
+
+
+@router.get("/health/ah")
+async def ah_status():
+    """AH client circuit breaker, rate limiter and request counters, and prefetching."""
+    return {**get_ah_service().status(), "prefetch": get_match_prefetcher().status()}
@@ -1,88 +1,227 @@
 """Items API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import AsyncIterator
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
 from app.database import get_db
-from app.models.item import ItemStatus
-from app.schemas.item import ItemResponse, ItemsAddRequest, ItemsAddResponse, ItemUpdateRequest
+from app.models.item import Item, ItemStatus, Store
+from app.routers.conditional import cache_headers, not_modified
+from app.schemas.item import (
+    ItemChangesResponse,
+    ItemResponse,
+    ItemsAddRequest,
+    ItemsAddResponse,
+    ItemsImportResponse,
+    ItemUpdateRequest,
+)
+from app.services.categories import get_category_registry
+from app.services.events import ChangeEvent, get_event_hub
+from app.services.importer import ImportFormat, ImportReader, format_for_content_type
 from app.services.items import ItemService
+from app.services.render_cache import RenderedBody, get_render_cache
+from app.services.versioning import get_list_version
 
 router = APIRouter(prefix="/api/v1/items", tags=["items"])
 
+ITEM_LIST_ADAPTER = TypeAdapter(list[ItemResponse])
+
+
+def item_response(item: Item) -> ItemResponse:
+    """Build an item response, resolving the category from the registry."""
+    return ItemResponse(
+        id=item.id,
+        name_raw=item.name_raw,
+        name_norm=item.name_norm,
+        category=get_category_registry().get(item.category_id),
+        qty=item.qty,
+        unit=item.unit,
+        notes=item.notes,
+        status=item.status,
+        preferred_store=item.preferred_store,
+        snooze_until=item.snooze_until,
+        created_at=item.created_at,
+        updated_at=item.updated_at,
+        last_added_at=item.last_added_at,
+    )
+
 
 @router.get("", response_model=list[ItemResponse])
 async def list_items(
+    request: Request,
     status: ItemStatus | None = None,
     category_id: str | None = None,
     include_snoozed: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """List items with optional filters."""
-    service = ItemService(db)
-    items = service.get_items(
-        status=status,
-        category_id=category_id,
-        include_snoozed=include_snoozed,
-    )
-    return items
+    """List items with optional filters.
+
+    The serialized list is cached per list version and filter combination.
+    """
+    list_version = get_list_version()
+    version = await list_version.current(db)
+    etag = list_version.etag(version)
+    if cached := not_modified(request, etag):
+        return cached
+
+    cache = get_render_cache()
+    key = ("items", status, category_id, include_snoozed)
+    body = cache.get(key, version)
+    if body is None:
+        service = ItemService(db)
+        items = await service.get_items(
+            status=status,
+            category_id=category_id,
+            include_snoozed=include_snoozed,
+        )
+        body = RenderedBody(
+            content=ITEM_LIST_ADAPTER.dump_json([item_response(item) for item in items]),
+            media_type="application/json",
+        )
+        cache.put(key, version, body, expires_at=list_version.snooze_deadline)
+
+    return Response(content=body.content, media_type=body.media_type, headers=cache_headers(etag))
 
 
 @router.post(":add", response_model=ItemsAddResponse)
-async def add_items(request: ItemsAddRequest, db: Session = Depends(get_db)):
+async def add_items(request: ItemsAddRequest, db: AsyncSession = Depends(get_db)):
     """Add items from text input."""
     service = ItemService(db)
-    result = service.add_items(request)
+    result = await service.add_items(request)
     return result
 
 
+@router.post(":import", response_model=ItemsImportResponse)
+async def import_items(
+    request: Request,
+    format: ImportFormat | None = Query(default=None, description="Defaults to the Content-Type"),
+    category: str | None = None,
+    preferred_store: Store | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Import a large list from a (chunked) text, CSV or NDJSON upload.
+
+    The body is read and parsed line by line and merged in batches of
+    ``import_batch_size`` items, each in its own transaction, so memory use
+    does not grow with the upload. Send plain text with one or more items
+    per line, CSV with a ``name,qty,unit`` header (or items in the first
+    column), or NDJSON strings / ``{"text": ...}`` / ``{"name", "qty", "unit"}``.
+    """
+    reader = ImportReader(format or format_for_content_type(request.headers.get("content-type")))
+    service = ItemService(db)
+    result = await service.import_items(
+        reader.items(request.stream()),
+        category=category,
+        preferred_store=preferred_store,
+        batch_size=get_settings().import_batch_size,
+    )
+    result.skipped = reader.skipped
+    return result
+
+
+@router.get("/changes", response_model=ItemChangesResponse)
+async def list_changes(
+    since: int = Query(default=0, ge=0, description="Cursor from the previous call; 0 for everything"),
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+):
+    """List items created, updated or removed since a cursor."""
+    service = ItemService(db)
+    items, removed, cursor, has_more = await service.get_changes(since, limit)
+    return ItemChangesResponse(
+        cursor=cursor,
+        items=[item_response(item) for item in items],
+        removed=removed,
+        has_more=has_more,
+    )
+
+
+async def stream_events(heartbeat_seconds: float) -> AsyncIterator[str]:
+    """Yield change events for one subscriber, with comment heartbeats."""
+    hub = get_event_hub()
+    list_version = get_list_version()
+    subscriber = hub.subscribe()
+    try:
+        yield ChangeEvent(type="ready", version=list_version.counter, data={}).encode()
+        while True:
+            event = await subscriber.next_event(heartbeat_seconds)
+            if event is None:
+                # Idle: keep proxies from closing the connection, and let
+                # expired snoozes reach clients that only listen
+                list_version.expire_snoozes()
+                yield ": heartbeat\n\n"
+            else:
+                yield event.encode()
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+@router.get("/stream")
+async def stream_changes():
+    """Stream list changes as Server-Sent Events.
+
+    Events carry the item id, status, qty and list version. A ``resync``
+    event (after bulk changes, or when a client fell too far behind) means
+    the list should be refetched.
+    """
+    return StreamingResponse(
+        stream_events(get_settings().event_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{item_id}", response_model=ItemResponse)
-async def get_item(item_id: str, db: Session = Depends(get_db)):
+async def get_item(item_id: str, db: AsyncSession = Depends(get_db)):
     """Get a single item."""
     service = ItemService(db)
-    item = service.get_item(item_id)
+    item = await service.get_item(item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item niet gevonden")
-    return item
+    return item_response(item)
 
 
 @router.post("/{item_id}:check", response_model=ItemResponse)
-async def check_item(item_id: str, db: Session = Depends(get_db)):
+async def check_item(item_id: str, db: AsyncSession = Depends(get_db)):
     """Mark an item as checked."""
     service = ItemService(db)
-    item = service.check_item(item_id)
+    item = await service.check_item(item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item niet gevonden")
-    return item
+    return item_response(item)
 
 
 @router.post("/{item_id}:uncheck", response_model=ItemResponse)
-async def uncheck_item(item_id: str, db: Session = Depends(get_db)):
+async def uncheck_item(item_id: str, db: AsyncSession = Depends(get_db)):
     """Mark an item as open (unchecked)."""
     service = ItemService(db)
-    item = service.uncheck_item(item_id)
+    item = await service.uncheck_item(item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item niet gevonden")
-    return item
+    return item_response(item)
 
 
 @router.patch("/{item_id}", response_model=ItemResponse)
 async def update_item(
     item_id: str,
     request: ItemUpdateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update an item."""
     service = ItemService(db)
-    item = service.update_item(item_id, request)
+    item = await service.update_item(item_id, request)
     if not item:
         raise HTTPException(status_code=404, detail="Item niet gevonden")
-    return item
+    return item_response(item)
 
 
 @router.delete("/{item_id}")
-async def delete_item(item_id: str, db: Session = Depends(get_db)):
+async def delete_item(item_id: str, db: AsyncSession = Depends(get_db)):
     """Delete an item."""
     service = ItemService(db)
-    if not service.delete_item(item_id):
+    if not await service.delete_item(item_id):
         raise HTTPException(status_code=404, detail="Item niet gevonden")
     return {"message": "Item verwijderd"}
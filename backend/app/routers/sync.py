@@ -1,120 +1,131 @@
 """Sync API endpoints for external services like Albert Heijn."""
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import PlainTextResponse
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
-from app.models.item import Item, ItemStatus
-from app.services.ah import get_ah_service, SyncResult
+from app.models.sync_job import SyncJob, SyncJobStatus
+from app.schemas.ah import AHProductMatchResponse, AHProductPinRequest, SyncJobResponse
+from app.services.ah import AHProduct
+from app.services.ah_matches import AHMatchService
+from app.services.parser import normalize_name
+from app.services.sync_jobs import get_items_to_sync, get_sync_worker
 
 router = APIRouter(prefix="/api/v1/sync", tags=["sync"])
 
 
-class SyncResponse(BaseModel):
-    """Response from sync operation."""
-    synced: int
-    failed: int
-    not_found: int
-    details: list[dict]
-
-
-@router.post("/ah", response_model=SyncResponse)
-async def sync_to_ah(db: Session = Depends(get_db)):
-    """Sync all open items to Albert Heijn shopping list."""
-    # Get all open items
-    items = (
-        db.query(Item)
-        .filter(Item.status == ItemStatus.OPEN)
-        .filter(
-            (Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow())
-        )
-        .all()
+def job_response(job: SyncJob) -> SyncJobResponse:
+    """Build a job response, with live progress while the job runs."""
+    processed = total = job.total
+    if live := get_sync_worker().progress(job.id):
+        processed, total = live
+    return SyncJobResponse(
+        id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        full_resync=job.full_resync,
+        total=total,
+        processed=processed,
+        synced=job.synced,
+        unchanged=job.unchanged,
+        not_found=job.not_found,
+        failed=job.failed,
+        error=job.error,
+        results=job.results or [],
     )
 
-    if not items:
+
+def job_summary(job: SyncJob) -> str:
+    """Short Dutch summary of a job, for Siri."""
+    if job.status == SyncJobStatus.FAILED:
+        return f"AH sync mislukt: {job.error}"
+    if job.status != SyncJobStatus.DONE:
+        return "Bezig met synchroniseren naar Appie..."
+
+    parts = []
+    if job.synced > 0:
+        parts.append(f"{job.synced} items toegevoegd aan Appie")
+    if job.not_found > 0:
+        parts.append(f"{job.not_found} niet gevonden")
+    if job.failed > 0:
+        parts.append(f"{job.failed} mislukt")
+    if not parts:
+        if job.unchanged > 0:
+            return "Appie is al bijgewerkt."
+        return "Geen items om te synchroniseren."
+
+    return ". ".join(parts) + "."
+
+
+@router.post("/ah", response_model=SyncJobResponse, status_code=202)
+async def sync_to_ah(full_resync: bool = False, db: AsyncSession = Depends(get_db)):
+    """Start syncing open items to the Albert Heijn shopping list.
+
+    Only new items and quantity increases since the last sync are pushed,
+    unless ``full_resync`` is set. The sync runs in the background; poll
+    ``GET /api/v1/sync/jobs/{id}`` for progress and per-item results.
+    """
+    if not await get_items_to_sync(db):
         raise HTTPException(status_code=404, detail="Geen items om te synchroniseren")
 
-    # Convert to list of dicts for sync
-    items_to_sync = [
-        {"name": item.name_raw, "qty": item.qty}
-        for item in items
-    ]
-
-    # Sync to AH
-    ah_service = get_ah_service()
-    try:
-        results = await ah_service.sync_items(items_to_sync)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AH sync failed: {str(e)}")
-
-    # Count results
-    synced = sum(1 for r in results if r.status == "ok")
-    not_found = sum(1 for r in results if r.status == "not_found")
-    failed = sum(1 for r in results if r.status == "error")
-
-    return SyncResponse(
-        synced=synced,
-        failed=failed,
-        not_found=not_found,
-        details=[
-            {
-                "item": r.item_name,
-                "status": r.status,
-                "ah_product": r.ah_product,
-                "error": r.error,
-            }
-            for r in results
-        ],
-    )
+    job = await get_sync_worker().enqueue(db, full_resync=full_resync)
+    return job_response(job)
 
 
 @router.post("/ah/simple", response_class=PlainTextResponse)
-async def sync_to_ah_simple(db: Session = Depends(get_db)):
-    """Sync to AH and return simple text response (for Siri)."""
-    # Get all open items
-    items = (
-        db.query(Item)
-        .filter(Item.status == ItemStatus.OPEN)
-        .filter(
-            (Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow())
-        )
-        .all()
-    )
+async def sync_to_ah_simple(full_resync: bool = False, db: AsyncSession = Depends(get_db)):
+    """Sync to AH and return simple text response (for Siri).
 
-    if not items:
+    Waits up to ``ah_sync_wait_seconds`` for the result; a longer sync
+    keeps running in the background.
+    """
+    if not await get_items_to_sync(db):
         return "Geen items om te synchroniseren."
 
-    # Convert to list of dicts for sync
-    items_to_sync = [
-        {"name": item.name_raw, "qty": item.qty}
-        for item in items
-    ]
-
-    # Sync to AH
-    ah_service = get_ah_service()
-    try:
-        results = await ah_service.sync_items(items_to_sync)
-    except ValueError as e:
-        return f"Fout: {str(e)}"
-    except Exception as e:
-        return f"AH sync mislukt: {str(e)}"
-
-    # Count results
-    synced = sum(1 for r in results if r.status == "ok")
-    not_found = sum(1 for r in results if r.status == "not_found")
-    failed = sum(1 for r in results if r.status == "error")
-
-    # Build response
-    parts = []
-    if synced > 0:
-        parts.append(f"{synced} items toegevoegd aan Appie")
-    if not_found > 0:
-        parts.append(f"{not_found} niet gevonden")
-    if failed > 0:
-        parts.append(f"{failed} mislukt")
+    worker = get_sync_worker()
+    job = await worker.enqueue(db, full_resync=full_resync)
+    if await worker.wait(job.id, get_settings().ah_sync_wait_seconds):
+        await db.refresh(job)
+    return job_summary(job)
+
+
+@router.get("/jobs/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    """Get the status, progress and results of a sync job."""
+    job = await db.get(SyncJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync-taak niet gevonden")
+    return job_response(job)
+
+
+@router.get("/ah/matches", response_model=list[AHProductMatchResponse])
+async def list_ah_matches(db: AsyncSession = Depends(get_db)):
+    """List the cached AH products per item name."""
+    service = AHMatchService(db)
+    return await service.list_matches()
+
+
+@router.put("/ah/matches/{name}", response_model=AHProductMatchResponse)
+async def pin_ah_match(
+    name: str,
+    request: AHProductPinRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Always sync an item name to a specific AH product."""
+    service = AHMatchService(db)
+    return await service.pin(
+        normalize_name(name),
+        AHProduct(product_id=request.product_id, title=request.title, price=request.price),
+    )
 
-    return ". ".join(parts) + "."
+
+@router.delete("/ah/matches/{name}")
+async def delete_ah_match(name: str, db: AsyncSession = Depends(get_db)):
+    """Forget the AH product for an item name; the next sync searches again."""
+    service = AHMatchService(db)
+    if not await service.forget(normalize_name(name)):
+        raise HTTPException(status_code=404, detail="Koppeling niet gevonden")
+    return {"message": "Koppeling verwijderd"}
@@ -1,9 +1,18 @@
 """Pydantic schemas for API."""
+from app.schemas.ah import (
+    AHProductMatchResponse,
+    AHProductPinRequest,
+    SyncItemResult,
+    SyncJobResponse,
+)
 from app.schemas.category import CategoryResponse
 from app.schemas.item import (
+    ImportBatchProgress,
+    ItemChangesResponse,
     ItemResponse,
     ItemsAddRequest,
     ItemsAddResponse,
+    ItemsImportResponse,
     ItemUpdateRequest,
 )
 from app.schemas.session import (
@@ -13,12 +22,19 @@ from app.schemas.session import (
 )
 
 __all__ = [
+    "AHProductMatchResponse",
+    "AHProductPinRequest",
     "CategoryResponse",
+    "ImportBatchProgress",
+    "ItemChangesResponse",
     "ItemResponse",
     "ItemsAddRequest",
     "ItemsAddResponse",
+    "ItemsImportResponse",
     "ItemUpdateRequest",
     "SessionResponse",
     "SessionStartRequest",
     "SessionCloseRequest",
+    "SyncItemResult",
+    "SyncJobResponse",
 ]
@@ -0,0 +1,56 @@
+"""AH integration schemas."""
+from datetime import datetime
+from pydantic import BaseModel
+
+from app.models.sync_job import SyncJobStatus
+
+
+class AHProductMatchResponse(BaseModel):
+    """Cached AH product for an item name (no product: not found on AH)."""
+
+    name_norm: str
+    product_id: int | None
+    title: str | None
+    price: float | None
+    pinned: bool
+    matched_at: datetime
+    expires_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
+class AHProductPinRequest(BaseModel):
+    """Request to always use a specific AH product for an item name."""
+
+    product_id: int
+    title: str
+    price: float | None = None
+
+
+class SyncItemResult(BaseModel):
+    """Outcome of syncing one item: "ok", "not_found", "error" or "unchanged"."""
+
+    item: str
+    status: str
+    ah_product: str | None = None
+    error: str | None = None
+
+
+class SyncJobResponse(BaseModel):
+    """Background sync job with its progress and per-item results."""
+
+    id: str
+    status: SyncJobStatus
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    full_resync: bool
+    total: int
+    processed: int
+    synced: int
+    unchanged: int
+    not_found: int
+    failed: int
+    error: str | None
+    results: list[SyncItemResult]
@@ -62,6 +62,26 @@ class ItemsAddResponse(BaseModel):
     message: str  # Dutch confirmation message
 
 
+class ImportBatchProgress(BaseModel):
+    """Result of one committed import batch."""
+
+    batch: int
+    items: int
+    new: int
+    merged: int
+
+
+class ItemsImportResponse(BaseModel):
+    """Summary of a bulk import."""
+
+    count: int
+    new: int
+    merged: int
+    skipped: int  # Lines that could not be read
+    batches: list[ImportBatchProgress]
+    message: str  # Dutch confirmation message
+
+
 class ItemUpdateRequest(BaseModel):
     """Request to update an item."""
 
@@ -72,3 +92,12 @@ class ItemUpdateRequest(BaseModel):
     category_id: str | None = None
     preferred_store: Store | None = None
     snooze_until: datetime | None = None
+
+
+class ItemChangesResponse(BaseModel):
+    """Items written since a change cursor."""
+
+    cursor: int  # Pass as ?since= on the next call
+    items: list[ItemResponse]  # Created or updated, including snoozed items
+    removed: list[str]  # IDs of items removed since the cursor
+    has_more: bool  # More changes are waiting; call again with the new cursor
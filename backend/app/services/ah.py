@@ -1,17 +1,32 @@
 """Albert Heijn API integration service."""
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
 import httpx
 
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.models.ah_match import AHProductMatch
+from app.services.ah_tokens import AHTokens, TokenStore
+from app.services.parser import normalize_name
+from app.services.resilience import CircuitBreaker, CircuitOpenError, TokenBucket, backoff_delay
+
+if TYPE_CHECKING:
+    from app.services.ah_matches import AHMatchService
 
 logger = logging.getLogger(__name__)
 
-AH_BASE_URL = "https://api.ah.nl"
-AH_AUTH_URL = f"{AH_BASE_URL}/mobile-auth/v1/auth/token"
-AH_SEARCH_URL = f"{AH_BASE_URL}/mobile-services/product/search/v2"
-AH_SHOPPINGLIST_URL = f"{AH_BASE_URL}/mobile-services/shoppinglist/v2/items"
+# Paths below settings.ah_base_url
+AH_AUTH_PATH = "/mobile-auth/v1/auth/token"
+AH_SEARCH_PATH = "/mobile-services/product/search/v2"
+AH_SHOPPINGLIST_PATH = "/mobile-services/shoppinglist/v2/items"
+
+# Responses worth retrying: rate limited, or AH temporarily failing
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# PATCH responses that mean AH rejected the request without applying it
+REJECTED_STATUSES = {400, 422}
 
 DEFAULT_HEADERS = {
     "User-Agent": "Appie/8.22.3",
@@ -20,14 +35,6 @@ DEFAULT_HEADERS = {
 }
 
 
-@dataclass
-class AHTokens:
-    """AH authentication tokens."""
-    access_token: str
-    refresh_token: str
-    expires_at: datetime
-
-
 @dataclass
 class AHProduct:
     """AH product info."""
@@ -41,34 +48,228 @@ class AHProduct:
 class SyncResult:
     """Result of syncing an item to AH."""
     item_name: str
-    status: str  # "ok", "not_found", "error"
+    status: str  # "ok", "not_found", "error", "unchanged"
     ah_product: str | None = None
     error: str | None = None
+    ah_product_id: int | None = None
+
+
+def create_ah_client(settings: Settings) -> httpx.AsyncClient:
+    """HTTP client for the AH API with the configured pool limits and timeouts."""
+    http2 = settings.ah_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("AH_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.ah_http_max_connections,
+            max_keepalive_connections=settings.ah_http_max_keepalive_connections,
+            keepalive_expiry=settings.ah_http_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.ah_http_connect_timeout_seconds,
+            read=settings.ah_http_read_timeout_seconds,
+            write=settings.ah_http_read_timeout_seconds,
+            pool=settings.ah_http_pool_timeout_seconds,
+        ),
+    )
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds from a Retry-After header, if it holds a number."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def product_from_match(match: AHProductMatch) -> AHProduct | None:
+    """The cached product of a match, or None for a cached "not found"."""
+    if match.product_id is None:
+        return None
+    return AHProduct(product_id=match.product_id, title=match.title, price=match.price)
+
+
+def _mark_failed(result: SyncResult, error: Exception) -> None:
+    message = "timeout" if isinstance(error, TimeoutError) else str(error)
+    logger.error(f"Failed to sync item '{result.item_name}': {message}")
+    result.status = "error"
+    result.ah_product = None
+    result.ah_product_id = None
+    result.error = message
 
 
 class AHService:
     """Service for Albert Heijn API integration."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        token_store: TokenStore | None = None,
+    ):
         self.settings = get_settings()
+        self.base_url = self.settings.ah_base_url.rstrip("/")
         self._tokens: AHTokens | None = None
-        self._client = httpx.AsyncClient(timeout=30.0)
+        self._token_lock = asyncio.Lock()
+        self._token_store = token_store or TokenStore.from_settings(self.settings)
+        self._tokens_loaded = False
+        self._client = client or create_ah_client(self.settings)
+        self.rate_limiter = TokenBucket(
+            self.settings.ah_rate_limit_per_second, self.settings.ah_rate_limit_burst
+        )
+        self.breaker = CircuitBreaker(
+            self.settings.ah_breaker_failure_threshold, self.settings.ah_breaker_reset_seconds
+        )
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+        self.connection_stats = {"connections_opened": 0, "tls_handshakes": 0}
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        """httpcore trace hook counting new connections and TLS handshakes."""
+        if event_name == "connection.connect_tcp.complete":
+            self.connection_stats["connections_opened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self.connection_stats["tls_handshakes"] += 1
+
+    async def _request(
+        self, method: str, url: str, *, idempotent: bool = True, **kwargs
+    ) -> httpx.Response:
+        """Send a request through the rate limiter and circuit breaker.
+
+        Connection failures, 429s and 5xx responses are retried with
+        jittered exponential backoff, up to ``ah_retry_attempts`` times. A
+        Retry-After header is honoured, unless it asks for a longer wait
+        than ``ah_retry_max_delay``. Non-idempotent requests are only
+        retried when AH cannot have acted on them: the connection failed
+        or the request was rate limited. Raises httpx.HTTPStatusError for
+        the final error response and CircuitOpenError while AH is down.
+        """
+        attempt = 0
+        while True:
+            self.breaker.check()
+            await self.rate_limiter.acquire()
+            self.stats["requests"] += 1
+
+            try:
+                response = await self._client.request(
+                    method, url, extensions={"trace": self._trace}, **kwargs
+                )
+            except httpx.TransportError as e:
+                self.stats["failures"] += 1
+                self.breaker.record_failure()
+                safe = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not safe or attempt == self.settings.ah_retry_attempts:
+                    raise
+                reason, delay = repr(e), None
+            else:
+                status = response.status_code
+                if status >= 500:
+                    self.stats["failures"] += 1
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if status == 429:
+                    self.stats["rate_limited"] += 1
+
+                retryable = status == 429 or (status in RETRY_STATUSES and idempotent)
+                delay = _retry_after(response)
+                if (
+                    not retryable
+                    or attempt == self.settings.ah_retry_attempts
+                    or (delay is not None and delay > self.settings.ah_retry_max_delay)
+                ):
+                    response.raise_for_status()
+                    return response
+                reason = f"HTTP {status}"
+
+            if delay is None:
+                delay = backoff_delay(
+                    attempt, self.settings.ah_retry_base_delay, self.settings.ah_retry_max_delay
+                )
+            logger.warning(f"AH {method} {url} failed ({reason}), retry {attempt + 1} in {delay:.2f}s")
+            self.stats["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def pool_stats(self) -> dict:
+        """Connection pool state, and how often requests needed a new connection."""
+        stats = {
+            "max_connections": self.settings.ah_http_max_connections,
+            "max_keepalive_connections": self.settings.ah_http_max_keepalive_connections,
+            **self.connection_stats,
+        }
+        # httpx does not expose its pool; absent for custom transports
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            idle = sum(1 for connection in connections if connection.is_idle())
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = idle
+            stats["active_connections"] = len(connections) - idle
+        return stats
+
+    def status(self) -> dict:
+        """Circuit breaker, rate limiter, connection pool and request counters."""
+        return {
+            "circuit": self.breaker.status(),
+            "rate_limit": self.rate_limiter.status(),
+            "pool": self.pool_stats(),
+            **self.stats,
+        }
+
+    def _token_is_fresh(self) -> bool:
+        """Whether the access token is valid beyond the refresh margin."""
+        margin = timedelta(seconds=self.settings.ah_token_refresh_margin_seconds)
+        return self._tokens is not None and datetime.utcnow() < self._tokens.expires_at - margin
 
     async def _get_access_token(self) -> str:
-        """Get a valid access token, refreshing if necessary."""
-        if self._tokens and datetime.utcnow() < self._tokens.expires_at:
+        """Get a valid access token, refreshing it shortly before it expires.
+
+        Only one caller at a time refreshes or logs in; concurrent callers
+        wait for it and use its result. On first use tokens persisted by an
+        earlier run are picked up, so a restart does not need a password login.
+        """
+        if self._token_is_fresh():
             return self._tokens.access_token
 
-        # Need to login or refresh
-        if self._tokens:
-            try:
-                await self._refresh_token()
+        async with self._token_lock:
+            if not self._tokens_loaded:
+                self._tokens_loaded = True
+                if self._token_store and self._tokens is None:
+                    self._tokens = self._token_store.load()
+
+            # Someone else may have refreshed while we waited for the lock
+            if self._token_is_fresh():
                 return self._tokens.access_token
-            except Exception as e:
-                logger.warning(f"Token refresh failed, re-authenticating: {e}")
 
-        await self._authenticate()
-        return self._tokens.access_token
+            # Need to login or refresh
+            if self._tokens:
+                try:
+                    await self._refresh_token()
+                    return self._tokens.access_token
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    if datetime.utcnow() < self._tokens.expires_at:
+                        # Refreshed early; the current token still works for now
+                        logger.warning(f"Early token refresh failed, keeping current token: {e}")
+                        return self._tokens.access_token
+                    logger.warning(f"Token refresh failed, re-authenticating: {e}")
+
+            await self._authenticate()
+            return self._tokens.access_token
+
+    def _store_tokens(self, tokens: AHTokens) -> None:
+        self._tokens = tokens
+        if self._token_store:
+            try:
+                self._token_store.save(tokens)
+            except OSError as e:
+                logger.warning(f"Could not persist AH tokens: {e}")
 
     async def _authenticate(self) -> None:
         """Authenticate with AH API using email/password."""
@@ -76,18 +277,19 @@ class AHService:
             raise ValueError("AH credentials not configured. Set AH_EMAIL and AH_PASSWORD.")
 
         # Step 1: Get anonymous token first
-        anon_response = await self._client.post(
-            f"{AH_BASE_URL}/mobile-auth/v1/auth/token/anonymous",
+        anon_response = await self._request(
+            "POST",
+            f"{self.base_url}{AH_AUTH_PATH}/anonymous",
             headers=DEFAULT_HEADERS,
             json={"clientId": "appie"}
         )
-        anon_response.raise_for_status()
         anon_data = anon_response.json()
         anon_token = anon_data.get("access_token")
 
         # Step 2: Login with credentials
-        login_response = await self._client.post(
-            f"{AH_AUTH_URL}/password",
+        login_response = await self._request(
+            "POST",
+            f"{self.base_url}{AH_AUTH_PATH}/password",
             headers={
                 **DEFAULT_HEADERS,
                 "Authorization": f"Bearer {anon_token}",
@@ -98,14 +300,13 @@ class AHService:
                 "clientId": "appie",
             }
         )
-        login_response.raise_for_status()
         data = login_response.json()
 
-        self._tokens = AHTokens(
+        self._store_tokens(AHTokens(
             access_token=data["access_token"],
             refresh_token=data["refresh_token"],
-            expires_at=datetime.utcnow() + timedelta(seconds=data.get("expires_in", 3600) - 60),
-        )
+            expires_at=datetime.utcnow() + timedelta(seconds=data.get("expires_in", 3600)),
+        ))
         logger.info("Successfully authenticated with AH API")
 
     async def _refresh_token(self) -> None:
@@ -113,30 +314,32 @@ class AHService:
         if not self._tokens:
             raise ValueError("No tokens to refresh")
 
-        response = await self._client.post(
-            f"{AH_AUTH_URL}/refresh",
+        response = await self._request(
+            "POST",
+            f"{self.base_url}{AH_AUTH_PATH}/refresh",
+            idempotent=False,
             headers=DEFAULT_HEADERS,
             json={
                 "refreshToken": self._tokens.refresh_token,
                 "clientId": "appie",
             }
         )
-        response.raise_for_status()
         data = response.json()
 
-        self._tokens = AHTokens(
+        self._store_tokens(AHTokens(
             access_token=data["access_token"],
             refresh_token=data.get("refresh_token", self._tokens.refresh_token),
-            expires_at=datetime.utcnow() + timedelta(seconds=data.get("expires_in", 3600) - 60),
-        )
+            expires_at=datetime.utcnow() + timedelta(seconds=data.get("expires_in", 3600)),
+        ))
         logger.info("Successfully refreshed AH token")
 
     async def search_product(self, query: str) -> AHProduct | None:
         """Search for a product and return the best match."""
         token = await self._get_access_token()
 
-        response = await self._client.get(
-            AH_SEARCH_URL,
+        response = await self._request(
+            "GET",
+            f"{self.base_url}{AH_SEARCH_PATH}",
             headers={
                 **DEFAULT_HEADERS,
                 "Authorization": f"Bearer {token}",
@@ -147,7 +350,6 @@ class AHService:
                 "size": 1,
             }
         )
-        response.raise_for_status()
         data = response.json()
 
         products = data.get("products", [])
@@ -164,67 +366,158 @@ class AHService:
 
     async def add_to_shopping_list(self, product_id: int, quantity: int = 1) -> bool:
         """Add a product to the AH shopping list."""
+        return await self.add_products_to_shopping_list([(product_id, quantity)])
+
+    async def add_products_to_shopping_list(self, products: list[tuple[int, int]]) -> bool:
+        """Add (product_id, quantity) pairs to the AH shopping list in one request."""
         token = await self._get_access_token()
 
-        response = await self._client.patch(
-            AH_SHOPPINGLIST_URL,
+        response = await self._request(
+            "PATCH",
+            f"{self.base_url}{AH_SHOPPINGLIST_PATH}",
+            idempotent=False,
             headers={
                 **DEFAULT_HEADERS,
                 "Authorization": f"Bearer {token}",
             },
             json={
-                "items": [{
-                    "productId": product_id,
-                    "quantity": quantity,
-                    "type": "SHOPPABLE",
-                }]
+                "items": [
+                    {
+                        "productId": product_id,
+                        "quantity": quantity,
+                        "type": "SHOPPABLE",
+                    }
+                    for product_id, quantity in products
+                ]
             }
         )
-        response.raise_for_status()
         return True
 
-    async def sync_items(self, items: list[dict]) -> list[SyncResult]:
+    async def sync_items(
+        self,
+        items: list[dict],
+        matches: "AHMatchService | None" = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> list[SyncResult]:
         """Sync a list of items to AH shopping list.
 
+        Names are first looked up in the ``matches`` cache, if given; the
+        rest are searched concurrently, at most ``ah_sync_concurrency``
+        requests at a time, and the outcome is stored in the cache. The
+        products are then added with one PATCH per ``ah_patch_batch_size``
+        products; when AH rejects a batch (400/422) its products are retried
+        one by one, so a single bad product only fails its own item. A batch
+        that timed out or failed otherwise may have been applied, so its
+        items fail rather than being sent again. Every request is limited to
+        ``ah_item_timeout_seconds``.
+
         Args:
-            items: List of dicts with 'name' and 'qty' keys
+            items: List of dicts with 'name' and 'qty' keys, and optionally
+                'name_norm' (derived from 'name' when missing) and
+                'product', an AHProduct that needs no lookup
+            matches: Cache of earlier product matches
+            progress: Called with the number of items whose result is final
 
         Returns:
-            List of SyncResult for each item
+            List of SyncResult for each item, in the order of ``items``
         """
-        results = []
-
-        for item in items:
-            name = item.get("name", "")
-            qty = int(item.get("qty", 1))
+        names = [item.get("name", "") for item in items]
+        names_norm = [
+            item.get("name_norm") or normalize_name(name) for item, name in zip(items, names)
+        ]
+
+        products: dict[str, AHProduct | Exception | None] = {
+            name_norm: item["product"]
+            for item, name_norm in zip(items, names_norm)
+            if item.get("product")
+        }
+        if matches:
+            unknown = [name_norm for name_norm in names_norm if name_norm not in products]
+            for name_norm, match in (await matches.lookup(unknown)).items():
+                products[name_norm] = product_from_match(match)
+
+        # Search each unknown name once, with the first spelling on the list
+        queries = {}
+        for name, name_norm in zip(names, names_norm):
+            if name_norm not in products:
+                queries.setdefault(name_norm, name)
+
+        semaphore = asyncio.Semaphore(self.settings.ah_sync_concurrency)
+        timeout = self.settings.ah_item_timeout_seconds
+        completed = 0
+
+        def report(count: int) -> None:
+            nonlocal completed
+            completed += count
+            if progress:
+                progress(completed)
+
+        async def limited(call):
+            async with semaphore:
+                async with asyncio.timeout(timeout):
+                    return await call
+
+        if queries:
+            # Log in once up front instead of once per concurrent search
+            await self._get_access_token()
+            found = await asyncio.gather(
+                *(limited(self.search_product(query)) for query in queries.values()),
+                return_exceptions=True,
+            )
+            searched = dict(zip(queries, found))
+            products.update(searched)
+            if matches:
+                await matches.remember({
+                    name_norm: product
+                    for name_norm, product in searched.items()
+                    if not isinstance(product, Exception)
+                })
 
+        results = []
+        to_add: list[tuple[SyncResult, AHProduct, int]] = []
+        for item, name, name_norm in zip(items, names, names_norm):
+            product = item.get("product") or products[name_norm]
+            result = SyncResult(item_name=name, status="not_found")
+            results.append(result)
+            if isinstance(product, Exception):
+                _mark_failed(result, product)
+            elif product:
+                result.status = "ok"
+                result.ah_product = product.title
+                result.ah_product_id = product.product_id
+                to_add.append((result, product, int(item.get("qty", 1))))
+        # Misses and failed searches are final already
+        report(len(results) - len(to_add))
+
+        async def add_batch(batch: list[tuple[SyncResult, AHProduct, int]]) -> None:
             try:
-                # Search for the product
-                product = await self.search_product(name)
-
-                if not product:
-                    results.append(SyncResult(
-                        item_name=name,
-                        status="not_found",
-                    ))
-                    continue
-
-                # Add to shopping list
-                await self.add_to_shopping_list(product.product_id, qty)
-
-                results.append(SyncResult(
-                    item_name=name,
-                    status="ok",
-                    ah_product=product.title,
+                await limited(self.add_products_to_shopping_list(
+                    [(product.product_id, qty) for _, product, qty in batch]
                 ))
-
             except Exception as e:
-                logger.error(f"Failed to sync item '{name}': {e}")
-                results.append(SyncResult(
-                    item_name=name,
-                    status="error",
-                    error=str(e),
-                ))
+                rejected = (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and e.response.status_code in REJECTED_STATUSES
+                )
+                if len(batch) == 1 or not rejected:
+                    # After a timeout or server error AH may have applied the
+                    # PATCH already; sending it again could double quantities
+                    for result, _, _ in batch:
+                        _mark_failed(result, e)
+                    report(len(batch))
+                    return
+                logger.warning(f"Adding {len(batch)} products rejected, retrying one by one: {e}")
+                await asyncio.gather(*(add_batch([entry]) for entry in batch))
+                return
+            report(len(batch))
+
+        if to_add:
+            await self._get_access_token()
+        batch_size = self.settings.ah_patch_batch_size
+        await asyncio.gather(*(
+            add_batch(to_add[start:start + batch_size])
+            for start in range(0, len(to_add), batch_size)
+        ))
 
         return results
 
@@ -243,3 +536,11 @@ def get_ah_service() -> AHService:
     if _ah_service is None:
         _ah_service = AHService()
     return _ah_service
+
+
+async def close_ah_service() -> None:
+    """Close the AH service singleton and its connection pool."""
+    global _ah_service
+    if _ah_service is not None:
+        await _ah_service.close()
+        _ah_service = None
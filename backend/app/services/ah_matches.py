@@ -0,0 +1,107 @@
+"""Persistent cache of item names resolved to AH products."""
+from datetime import datetime, timedelta
+from typing import Iterable
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.ah_match import AHProductMatch
+from app.services.ah import AHProduct
+
+
+class AHMatchService:
+    """Service for cached AH product matches, keyed by normalized item name."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.settings = get_settings()
+
+    async def lookup(self, names: Iterable[str]) -> dict[str, AHProductMatch]:
+        """Unexpired matches for the given normalized names."""
+        names = set(names)
+        if not names:
+            return {}
+
+        result = await self.db.execute(
+            select(AHProductMatch).where(AHProductMatch.name_norm.in_(names))
+        )
+        now = datetime.utcnow()
+        found = {
+            match.name_norm: match
+            for match in result.scalars()
+            if match.expires_at is None or match.expires_at > now
+        }
+        # Don't hold the transaction (and its locks) open across AH requests
+        await self.db.commit()
+        return found
+
+    async def remember(self, found: dict[str, AHProduct | None]) -> None:
+        """Store search results by normalized name; None means AH found nothing.
+
+        Products are kept for ``ah_match_ttl_days``, misses only for
+        ``ah_match_not_found_ttl_hours``. Pinned matches are left alone.
+        """
+        if not found:
+            return
+
+        now = datetime.utcnow()
+        product_expiry = now + timedelta(days=self.settings.ah_match_ttl_days)
+        not_found_expiry = now + timedelta(hours=self.settings.ah_match_not_found_ttl_hours)
+        rows = [
+            {
+                "name_norm": name_norm,
+                "product_id": product.product_id if product else None,
+                "title": product.title if product else None,
+                "price": product.price if product else None,
+                "pinned": False,
+                "matched_at": now,
+                "expires_at": product_expiry if product else not_found_expiry,
+            }
+            for name_norm, product in found.items()
+        ]
+        statement = insert(AHProductMatch).values(rows)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[AHProductMatch.name_norm],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("product_id", "title", "price", "matched_at", "expires_at")
+                },
+                where=AHProductMatch.pinned.is_(False),
+            )
+        )
+        await self.db.commit()
+
+    async def list_matches(self) -> list[AHProductMatch]:
+        """All cached matches, pinned first."""
+        result = await self.db.execute(
+            select(AHProductMatch).order_by(
+                AHProductMatch.pinned.desc(), AHProductMatch.name_norm
+            )
+        )
+        return list(result.scalars().all())
+
+    async def pin(self, name_norm: str, product: AHProduct) -> AHProductMatch:
+        """Always resolve a name to the given product."""
+        match = await self.db.get(AHProductMatch, name_norm)
+        if match is None:
+            match = AHProductMatch(name_norm=name_norm)
+            self.db.add(match)
+
+        match.product_id = product.product_id
+        match.title = product.title
+        match.price = product.price
+        match.pinned = True
+        match.matched_at = datetime.utcnow()
+        match.expires_at = None
+        await self.db.commit()
+        return match
+
+    async def forget(self, name_norm: str) -> bool:
+        """Drop a cached or pinned match so the next sync searches again."""
+        result = await self.db.execute(
+            delete(AHProductMatch).where(AHProductMatch.name_norm == name_norm)
+        )
+        await self.db.commit()
+        return result.rowcount > 0
@@ -0,0 +1,108 @@
+"""Background resolving of newly added item names to AH products."""
+import asyncio
+import logging
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.ah import AHService, get_ah_service
+from app.services.ah_matches import AHMatchService
+
+logger = logging.getLogger(__name__)
+
+
+class MatchPrefetcher:
+    """Searches AH for item names as they are added, ahead of the next sync.
+
+    Names are queued by normalized name; a name that is already waiting is
+    not queued twice, and names with an unexpired cached match are not
+    searched. At most ``ah_prefetch_concurrency`` searches run at a time,
+    sharing the AH client's rate limit with syncs. When the queue is full
+    further names are dropped; the sync searches them itself.
+    """
+
+    def __init__(self, ah_service: AHService | None = None):
+        self.ah_service = ah_service
+        self.settings = get_settings()
+        self._queue: asyncio.Queue[str] | None = None
+        self._pending: dict[str, str] = {}
+        self._workers: list[asyncio.Task] = []
+        self.stats = {"queued": 0, "dropped": 0, "cached": 0, "searched": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return any(not worker.done() for worker in self._workers)
+
+    async def start(self) -> None:
+        """Start the search workers."""
+        self._queue = asyncio.Queue(maxsize=self.settings.ah_prefetch_queue_size)
+        self._workers = [
+            asyncio.create_task(self._run())
+            for _ in range(max(self.settings.ah_prefetch_concurrency, 1))
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers; names still queued are left to the next sync."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+
+    def queue(self, names: dict[str, str]) -> None:
+        """Queue names for a search, as {name_norm: name}; no-op when stopped."""
+        if not self.running:
+            return
+        for name_norm, name in names.items():
+            if name_norm in self._pending:
+                continue
+            try:
+                self._queue.put_nowait(name_norm)
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                continue
+            self._pending[name_norm] = name
+            self.stats["queued"] += 1
+
+    async def idle(self) -> None:
+        """Wait until every queued name has been handled."""
+        await self._queue.join()
+
+    def status(self) -> dict:
+        return {"running": self.running, "pending": len(self._pending), **self.stats}
+
+    async def _run(self) -> None:
+        while True:
+            name_norm = await self._queue.get()
+            try:
+                await self._resolve(name_norm, self._pending[name_norm])
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.warning(f"Prefetching AH match for '{name_norm}' failed: {e!r}")
+            finally:
+                self._pending.pop(name_norm, None)
+                self._queue.task_done()
+
+    async def _resolve(self, name_norm: str, name: str) -> None:
+        async with SessionLocal() as db:
+            matches = AHMatchService(db)
+            if await matches.lookup([name_norm]):
+                self.stats["cached"] += 1
+                return
+
+            ah_service = self.ah_service or get_ah_service()
+            async with asyncio.timeout(self.settings.ah_item_timeout_seconds):
+                product = await ah_service.search_product(name)
+            self.stats["searched"] += 1
+            await matches.remember({name_norm: product})
+
+
+# Singleton instance
+_match_prefetcher: MatchPrefetcher | None = None
+
+
+def get_match_prefetcher() -> MatchPrefetcher:
+    """Get the match prefetcher singleton."""
+    global _match_prefetcher
+    if _match_prefetcher is None:
+        _match_prefetcher = MatchPrefetcher()
+    return _match_prefetcher
@@ -0,0 +1,110 @@
+"""Per-item AH sync state, for syncing only what changed."""
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ah_sync import AHItemSync
+from app.models.item import Item, ItemStatus
+from app.services.ah import AHProduct, SyncResult
+
+
+class AHSyncStateService:
+    """Service for what earlier syncs already put on the AH shopping list."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def plan(
+        self, items: list[dict], full_resync: bool = False
+    ) -> tuple[list[dict], dict[str, SyncResult]]:
+        """Split open items into pushes and items AH already has.
+
+        Args:
+            items: Open items as dicts with 'id', 'name', 'name_norm' and
+                'qty' keys
+            full_resync: Push every item in full, ignoring earlier syncs
+
+        Returns:
+            The items to push, with 'qty' reduced to the increase since the
+            last sync and the earlier 'product' where known; and a result
+            per skipped item id
+        """
+        if full_resync or not items:
+            return [{**item, "synced_qty": item["qty"]} for item in items], {}
+
+        result = await self.db.execute(
+            select(AHItemSync).where(AHItemSync.item_id.in_([item["id"] for item in items]))
+        )
+        states = {state.item_id: state for state in result.scalars().all()}
+        # Don't hold the transaction (and its locks) open across AH requests
+        await self.db.commit()
+
+        to_push = []
+        unchanged = {}
+        for item in items:
+            state = states.get(item["id"])
+            if state is None:
+                to_push.append({**item, "synced_qty": item["qty"]})
+                continue
+
+            increase = int(item["qty"]) - int(state.qty)
+            if increase > 0:
+                to_push.append({
+                    **item,
+                    "qty": increase,
+                    "synced_qty": item["qty"],
+                    "product": AHProduct(product_id=state.product_id, title=state.title),
+                })
+            else:
+                # AH already has at least this many
+                unchanged[item["id"]] = SyncResult(
+                    item_name=item["name"],
+                    status="unchanged",
+                    ah_product=state.title,
+                    ah_product_id=state.product_id,
+                )
+        return to_push, unchanged
+
+    async def record(self, pushed: list[dict], results: list[SyncResult]) -> None:
+        """Remember what the pushed items (from ``plan``) now have on AH."""
+        now = datetime.utcnow()
+        rows = [
+            {
+                "item_id": item["id"],
+                "product_id": result.ah_product_id,
+                "title": result.ah_product,
+                "qty": item["synced_qty"],
+                "synced_at": now,
+            }
+            for item, result in zip(pushed, results)
+            if result.status == "ok"
+        ]
+        if not rows:
+            return
+
+        statement = insert(AHItemSync).values(rows)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[AHItemSync.item_id],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("product_id", "title", "qty", "synced_at")
+                },
+            )
+        )
+        # Items checked, removed or renamed while the sync ran start over next time
+        names = {item["id"]: item["name_norm"] for item in pushed}
+        result = await self.db.execute(
+            select(Item.id, Item.status, Item.name_norm).where(
+                Item.id.in_([row["item_id"] for row in rows])
+            )
+        )
+        stale = [
+            item_id
+            for item_id, status, name_norm in result.all()
+            if status != ItemStatus.OPEN or name_norm != names[item_id]
+        ]
+        if stale:
+            await self.db.execute(delete(AHItemSync).where(AHItemSync.item_id.in_(stale)))
+        await self.db.commit()
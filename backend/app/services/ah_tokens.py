@@ -0,0 +1,92 @@
+"""AH authentication tokens and their encrypted storage."""
+import base64
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_FILE_NAME = "ah_tokens.enc"
+KEY_DERIVATION_ROUNDS = 200_000
+
+
+@dataclass
+class AHTokens:
+    """AH authentication tokens."""
+    access_token: str
+    refresh_token: str
+    expires_at: datetime
+
+
+class TokenStore:
+    """Keeps AHTokens in a Fernet-encrypted file, so restarts can reuse them."""
+
+    def __init__(self, path: Path, key: bytes):
+        self.path = path
+        self._fernet = Fernet(key)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TokenStore | None":
+        """Store configured by ``ah_token_file`` and ``ah_token_key``.
+
+        The file defaults to the database directory (the data volume). Without
+        an explicit key, one is derived from the AH password, so the file is
+        only readable with the credentials that obtained the tokens. Returns
+        None when there is nothing to derive a key from.
+        """
+        if settings.ah_token_key:
+            key = settings.ah_token_key.encode()
+        elif settings.ah_password:
+            derived = hashlib.pbkdf2_hmac(
+                "sha256",
+                settings.ah_password.encode(),
+                f"boodschappen-ah-tokens:{settings.ah_email}".encode(),
+                KEY_DERIVATION_ROUNDS,
+            )
+            key = base64.urlsafe_b64encode(derived)
+        else:
+            return None
+
+        if settings.ah_token_file:
+            path = Path(settings.ah_token_file)
+        else:
+            db_path = settings.database_url.replace("sqlite:///", "")
+            path = Path(os.path.dirname(db_path) or ".") / TOKEN_FILE_NAME
+        return cls(path, key)
+
+    def load(self) -> AHTokens | None:
+        """Read stored tokens; None when missing or not readable with this key."""
+        try:
+            data = json.loads(self._fernet.decrypt(self.path.read_bytes()))
+            return AHTokens(
+                access_token=data["access_token"],
+                refresh_token=data["refresh_token"],
+                expires_at=datetime.fromisoformat(data["expires_at"]),
+            )
+        except FileNotFoundError:
+            return None
+        except (InvalidToken, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable AH token file {self.path}: {e!r}")
+            return None
+
+    def save(self, tokens: AHTokens) -> None:
+        """Write tokens atomically, readable by the owner only."""
+        data = json.dumps({
+            "access_token": tokens.access_token,
+            "refresh_token": tokens.refresh_token,
+            "expires_at": tokens.expires_at.isoformat(),
+        })
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self._fernet.encrypt(data.encode()))
+        os.replace(tmp_path, self.path)
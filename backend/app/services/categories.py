@@ -0,0 +1,67 @@
+"""Process-wide registry of categories."""
+from typing import Iterable, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category import Category
+from app.models.item import Item
+from app.schemas.category import CategoryResponse
+
+ItemT = TypeVar("ItemT", bound=Item)
+
+
+class CategoryRegistry:
+    """In-memory copy of the categories table.
+
+    Categories are a small, nearly static set, so they are loaded once and
+    reloaded whenever they change (seeding). Item reads resolve categories
+    and sort through the registry instead of joining ``categories``.
+    """
+
+    def __init__(self):
+        self._ordered: list[CategoryResponse] = []
+        self._by_id: dict[str, CategoryResponse] = {}
+        self._by_name: dict[str, CategoryResponse] = {}
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)load all categories from the database."""
+        result = await db.execute(select(Category).order_by(Category.sort_order))
+        self._ordered = [CategoryResponse.model_validate(category) for category in result.scalars()]
+        self._by_id = {category.id: category for category in self._ordered}
+        self._by_name = {category.name: category for category in self._ordered}
+
+    def all(self) -> list[CategoryResponse]:
+        """All categories in display order."""
+        return list(self._ordered)
+
+    def get(self, category_id: str | None) -> CategoryResponse | None:
+        """Look up a category by ID."""
+        return self._by_id.get(category_id) if category_id else None
+
+    def by_name(self, name: str) -> CategoryResponse | None:
+        """Look up a category by its (English) name."""
+        return self._by_name.get(name)
+
+    def sort_key(self, category_id: str | None) -> tuple[int, int]:
+        """Sort key placing categories by sort order, uncategorized last."""
+        category = self.get(category_id)
+        if category is None:
+            return (1, 0)
+        return (0, category.sort_order)
+
+    def sort_items(self, items: Iterable[ItemT]) -> list[ItemT]:
+        """Sort items by category sort order, then by name."""
+        return sorted(items, key=lambda item: (self.sort_key(item.category_id), item.name_norm))
+
+
+# Singleton instance
+_category_registry: CategoryRegistry | None = None
+
+
+def get_category_registry() -> CategoryRegistry:
+    """Get the category registry singleton."""
+    global _category_registry
+    if _category_registry is None:
+        _category_registry = CategoryRegistry()
+    return _category_registry
@@ -0,0 +1,122 @@
+"""In-process fan-out of list change events to stream subscribers."""
+import asyncio
+import json
+from dataclasses import dataclass
+
+from app.config import get_settings
+from app.models.item import Item, ItemStatus
+
+
+@dataclass(frozen=True)
+class ItemChange:
+    """A committed change to one item."""
+
+    id: str
+    status: ItemStatus
+    qty: float
+
+    @classmethod
+    def from_item(cls, item: Item) -> "ItemChange":
+        return cls(id=item.id, status=item.status, qty=item.qty)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """An event sent to stream subscribers."""
+
+    type: str  # "ready", "item" or "resync"
+    version: int
+    data: dict
+
+    def encode(self) -> str:
+        """Server-Sent Events wire format."""
+        payload = json.dumps({"type": self.type, "version": self.version, **self.data})
+        return f"id: {self.version}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscriber:
+    """One stream client with a bounded event buffer.
+
+    A client that falls behind does not hold up publishers or grow without
+    bound: once its buffer is full the backlog is replaced by a single
+    resync event, telling the client to refetch the list.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue[ChangeEvent] = asyncio.Queue(maxsize=buffer_size)
+        self.overflows = 0
+
+    def offer(self, event: ChangeEvent) -> None:
+        """Queue an event without waiting."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(ChangeEvent(type="resync", version=event.version, data={}))
+            self.overflows += 1
+
+    async def next_event(self, timeout: float) -> ChangeEvent | None:
+        """Wait for the next event, or None after the timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """Broadcasts committed list changes to all subscribers."""
+
+    # Larger commits (bulk adds, session close) are sent as one resync event
+    MAX_ITEM_EVENTS = 50
+
+    def __init__(self, buffer_size: int = 64):
+        self.buffer_size = buffer_size
+        self._subscribers: set[Subscriber] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Register a new subscriber."""
+        subscriber = Subscriber(self.buffer_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber."""
+        self._subscribers.discard(subscriber)
+
+    def publish(self, version: int, changes: list[ItemChange] | None) -> None:
+        """Publish the changes of one commit; None means "refetch everything"."""
+        if not self._subscribers:
+            return
+
+        if changes is None or len(changes) > self.MAX_ITEM_EVENTS:
+            events = [ChangeEvent(type="resync", version=version, data={})]
+        else:
+            events = [
+                ChangeEvent(
+                    type="item",
+                    version=version,
+                    data={"id": change.id, "status": change.status.value, "qty": change.qty},
+                )
+                for change in changes
+            ]
+
+        for subscriber in list(self._subscribers):
+            for event in events:
+                subscriber.offer(event)
+
+
+# Singleton instance
+_event_hub: EventHub | None = None
+
+
+def get_event_hub() -> EventHub:
+    """Get the event hub singleton."""
+    global _event_hub
+    if _event_hub is None:
+        _event_hub = EventHub(buffer_size=get_settings().event_buffer_size)
+    return _event_hub
@@ -0,0 +1,147 @@
+"""Incremental decoding of bulk item imports."""
+import codecs
+import csv
+import json
+from enum import Enum
+from typing import AsyncIterable, AsyncIterator
+
+from app.services.parser import UNIT_MAP, ParsedItem, parse_items
+
+# Longer lines are skipped instead of buffered
+MAX_LINE_LENGTH = 64 * 1024
+
+
+class ImportFormat(str, Enum):
+    """Import body format."""
+
+    TEXT = "text"
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+CONTENT_TYPES = {
+    "text/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+}
+
+
+def format_for_content_type(content_type: str | None) -> ImportFormat:
+    """Pick the import format from a Content-Type header; plain text by default."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return CONTENT_TYPES.get(media_type, ImportFormat.TEXT)
+
+
+def structured_item(name: str, qty: float, unit: str | None) -> ParsedItem:
+    """Item from separate name/qty/unit fields, with the unit normalized."""
+    if unit:
+        unit = UNIT_MAP.get(unit.lower(), unit)
+    return ParsedItem(name=name, qty=qty, unit=unit or None)
+
+
+class ImportReader:
+    """Turns an uploaded byte stream into parsed items, one line at a time.
+
+    Only the current line is held in memory. Lines that cannot be decoded
+    as the chosen format are skipped and counted.
+    """
+
+    def __init__(self, format: ImportFormat):
+        self.format = format
+        self.skipped = 0
+        self._csv_columns: dict[str, int] | None = None
+        self._first_row = True
+
+    async def lines(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        """Split a byte stream into text lines, across chunk boundaries."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        oversized = False
+
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *complete, pending = pending.split("\n")
+            for line in complete:
+                if oversized:
+                    # Tail of a line that was already skipped
+                    oversized = False
+                    continue
+                yield line.rstrip("\r")
+            if oversized:
+                pending = ""
+            elif len(pending) > MAX_LINE_LENGTH:
+                self.skipped += 1
+                pending = ""
+                oversized = True
+
+        pending += decoder.decode(b"", final=True)
+        if pending and not oversized:
+            yield pending.rstrip("\r")
+
+    async def items(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[ParsedItem]:
+        """Parsed items from an upload, in order."""
+        async for line in self.lines(chunks):
+            if not line.strip():
+                continue
+            for parsed in self._parse_line(line):
+                yield parsed
+
+    def _parse_line(self, line: str) -> list[ParsedItem]:
+        if self.format == ImportFormat.NDJSON:
+            return self._parse_ndjson(line)
+        if self.format == ImportFormat.CSV:
+            return self._parse_csv(line)
+        return parse_items(line)
+
+    def _parse_ndjson(self, line: str) -> list[ParsedItem]:
+        """A JSON string ("2x brood"), {"text": ...} or {"name", "qty", "unit"}."""
+        try:
+            value = json.loads(line)
+            if isinstance(value, str):
+                return parse_items(value)
+            if isinstance(value, dict) and isinstance(value.get("text"), str):
+                return parse_items(value["text"])
+            if isinstance(value, dict) and isinstance(value.get("name"), str) and value["name"].strip():
+                return [
+                    structured_item(
+                        value["name"].strip(), float(value.get("qty") or 1.0), value.get("unit")
+                    )
+                ]
+        except (ValueError, TypeError):
+            pass
+        self.skipped += 1
+        return []
+
+    def _parse_csv(self, line: str) -> list[ParsedItem]:
+        """Rows with a name,qty,unit header, or free text in the first column."""
+        try:
+            row = next(csv.reader([line]))
+        except csv.Error:
+            self.skipped += 1
+            return []
+
+        if self._first_row:
+            self._first_row = False
+            header = [cell.strip().lower() for cell in row]
+            if "name" in header:
+                self._csv_columns = {column: index for index, column in enumerate(header)}
+                return []
+
+        if self._csv_columns is None:
+            return parse_items(row[0]) if row else []
+
+        def cell(column: str) -> str:
+            index = self._csv_columns.get(column)
+            return row[index].strip() if index is not None and index < len(row) else ""
+
+        name = cell("name")
+        if not name:
+            self.skipped += 1
+            return []
+        try:
+            qty = float(cell("qty").replace(",", ".") or 1.0)
+        except ValueError:
+            self.skipped += 1
+            return []
+        return [structured_item(name, qty, cell("unit"))]
@@ -1,87 +1,243 @@
 """Item service for business logic."""
+import uuid
+from dataclasses import replace
 from datetime import datetime
-from sqlalchemy.orm import Session
+from typing import AsyncIterable
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.item import Item, ItemStatus
-from app.models.category import Category
+from app.models.item import Item, ItemStatus, Store
+from app.services.ah_prefetch import get_match_prefetcher
+from app.services.categories import get_category_registry
 from app.services.parser import parse_items, normalize_name, ParsedItem
-from app.schemas.item import ItemsAddRequest, ItemsAddResponse, AddedItem, ItemUpdateRequest
+from app.services.events import ItemChange, get_event_hub
+from app.services.versioning import get_list_version
+from app.schemas.item import (
+    AddedItem,
+    ImportBatchProgress,
+    ItemsAddRequest,
+    ItemsAddResponse,
+    ItemsImportResponse,
+    ItemUpdateRequest,
+)
 
 
 class ItemService:
     """Service for item operations."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_items(
+    async def _commit(self, changes: list[ItemChange] | None = None) -> None:
+        """Commit, publish a new list version and notify stream subscribers.
+
+        Without ``changes`` subscribers are told to refetch the whole list.
+        """
+        await self.db.commit()
+        list_version = get_list_version()
+        list_version.bump()
+        get_event_hub().publish(list_version.counter, changes)
+
+    def _prefetch(self, added_items: list[AddedItem]) -> None:
+        """Have the AH product for added items looked up ahead of the next sync."""
+        get_match_prefetcher().queue(
+            {normalize_name(item.name): item.name for item in added_items}
+        )
+
+    async def get_items(
         self,
         status: ItemStatus | None = None,
         category_id: str | None = None,
         include_snoozed: bool = False,
     ) -> list[Item]:
         """Get items with optional filters."""
-        query = self.db.query(Item)
+        query = select(Item)
 
         if status:
-            query = query.filter(Item.status == status)
+            query = query.where(Item.status == status)
         else:
-            # By default, exclude removed items
-            query = query.filter(Item.status != ItemStatus.REMOVED)
+            # By default, exclude removed items (as IN so the status index applies)
+            query = query.where(Item.status.in_([ItemStatus.OPEN, ItemStatus.CHECKED]))
 
         if category_id:
-            query = query.filter(Item.category_id == category_id)
+            query = query.where(Item.category_id == category_id)
 
         if not include_snoozed:
             # Exclude snoozed items (snooze_until in future)
-            query = query.filter(
+            query = query.where(
                 (Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow())
             )
 
-        # Order by category sort order, then by name
-        query = query.outerjoin(Category).order_by(
-            Category.sort_order.nulls_last(),
-            Item.name_norm,
+        # Order by category sort order, then by name (categories are in memory)
+        result = await self.db.execute(query)
+        return get_category_registry().sort_items(result.scalars())
+
+    async def get_changes(self, since: int, limit: int) -> tuple[list[Item], list[str], int, bool]:
+        """Get items written after a change cursor.
+
+        Returns (changed items, removed item IDs, new cursor, has_more). A
+        cursor of 0 means a fresh client, which has nothing to remove, so no
+        tombstones are returned.
+        """
+        result = await self.db.execute(
+            select(Item)
+            .where(Item.change_seq > since)
+            .order_by(Item.change_seq)
+            .limit(limit + 1)
         )
+        rows = list(result.scalars().all())
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
-        return query.all()
+        cursor = rows[-1].change_seq if rows else since
+        changed = [item for item in rows if item.status != ItemStatus.REMOVED]
+        removed = [item.id for item in rows if item.status == ItemStatus.REMOVED and since > 0]
+        return changed, removed, cursor, has_more
 
-    def get_item(self, item_id: str) -> Item | None:
+    async def get_item(self, item_id: str) -> Item | None:
         """Get a single item by ID."""
-        return self.db.query(Item).filter(Item.id == item_id).first()
+        result = await self.db.execute(select(Item).where(Item.id == item_id))
+        return result.scalars().first()
 
-    def add_items(self, request: ItemsAddRequest) -> ItemsAddResponse:
+    async def add_items(self, request: ItemsAddRequest) -> ItemsAddResponse:
         """Add items from text input."""
         parsed_items = parse_items(request.text)
-        added_items: list[AddedItem] = []
 
         # Get category if specified
         category_id = None
         if request.category:
-            category = (
-                self.db.query(Category)
-                .filter(Category.name == request.category)
-                .first()
-            )
+            category = get_category_registry().by_name(request.category)
             if category:
                 category_id = category.id
 
+        added_items = await self._merge_parsed_items(
+            parsed_items, category_id, request.preferred_store
+        )
+        # Added and merged items are always open afterwards
+        await self._commit(
+            [ItemChange(id=item.id, status=ItemStatus.OPEN, qty=item.qty) for item in added_items]
+        )
+        self._prefetch(added_items)
+
+        # Create Dutch confirmation message
+        count = len(added_items)
+        if count == 1:
+            message = f"1 item toegevoegd: {added_items[0].name}"
+        else:
+            names = ", ".join(item.name for item in added_items[:3])
+            if count > 3:
+                names += f" en {count - 3} meer"
+            message = f"{count} items toegevoegd: {names}"
+
+        return ItemsAddResponse(
+            count=count,
+            items=added_items,
+            message=message,
+        )
+
+    async def import_items(
+        self,
+        parsed_items: AsyncIterable[ParsedItem],
+        category: str | None,
+        preferred_store: Store | None,
+        batch_size: int,
+    ) -> ItemsImportResponse:
+        """Merge a stream of parsed items in bounded, separately committed batches.
+
+        At most ``batch_size`` items are held at a time, and no transaction
+        is open while waiting for more input.
+        """
+        category_id = None
+        if category:
+            found = get_category_registry().by_name(category)
+            if found:
+                category_id = found.id
+
+        batches: list[ImportBatchProgress] = []
+        batch: list[ParsedItem] = []
+
+        async def commit_batch() -> None:
+            added_items = await self._merge_parsed_items(batch, category_id, preferred_store)
+            await self._commit(
+                [ItemChange(id=item.id, status=ItemStatus.OPEN, qty=item.qty) for item in added_items]
+            )
+            self._prefetch(added_items)
+            new = sum(1 for item in added_items if item.is_new)
+            batches.append(
+                ImportBatchProgress(
+                    batch=len(batches) + 1,
+                    items=len(added_items),
+                    new=new,
+                    merged=len(added_items) - new,
+                )
+            )
+            batch.clear()
+
+        async for parsed in parsed_items:
+            batch.append(parsed)
+            if len(batch) >= batch_size:
+                await commit_batch()
+        if batch:
+            await commit_batch()
+
+        count = sum(progress.items for progress in batches)
+        new = sum(progress.new for progress in batches)
+        return ItemsImportResponse(
+            count=count,
+            new=new,
+            merged=count - new,
+            skipped=0,
+            batches=batches,
+            message=f"{count} items geïmporteerd ({new} nieuw, {count - new} samengevoegd)",
+        )
+
+    async def _merge_parsed_items(
+        self,
+        parsed_items: list[ParsedItem],
+        category_id: str | None,
+        preferred_store: Store | None,
+    ) -> list[AddedItem]:
+        """Merge parsed items into the list with a constant number of statements.
+
+        Duplicates within the input are combined first, all normalized names
+        are resolved with a single IN query and new rows are written with one
+        executemany INSERT. Does not commit.
+        """
+        # Combine duplicates within the request ("melk, 2 melk")
+        merged: dict[str, ParsedItem] = {}
         for parsed in parsed_items:
             name_norm = normalize_name(parsed.name)
+            if name_norm in merged:
+                first = merged[name_norm]
+                merged[name_norm] = replace(first, qty=first.qty + parsed.qty)
+            else:
+                merged[name_norm] = parsed
 
-            # Check for existing item with same normalized name
-            existing = (
-                self.db.query(Item)
-                .filter(Item.name_norm == name_norm)
-                .filter(Item.status != ItemStatus.REMOVED)
-                .first()
-            )
+        if not merged:
+            return []
+
+        # Resolve existing items with the same normalized names in one query
+        result = await self.db.execute(
+            select(Item)
+            .where(Item.name_norm.in_(list(merged)))
+            .where(Item.status != ItemStatus.REMOVED)
+        )
+        existing_by_name: dict[str, Item] = {}
+        for item in result.scalars():
+            existing_by_name.setdefault(item.name_norm, item)
+
+        now = datetime.utcnow()
+        added_items: list[AddedItem] = []
+        new_rows: list[dict] = []
+
+        for name_norm, parsed in merged.items():
+            existing = existing_by_name.get(name_norm)
 
             if existing:
                 # Merge: increase quantity, update last_added_at
                 existing.qty += parsed.qty
-                existing.last_added_at = datetime.utcnow()
-                existing.updated_at = datetime.utcnow()
+                existing.last_added_at = now
+                existing.updated_at = now
 
                 # If it was checked, reopen it
                 if existing.status == ItemStatus.CHECKED:
@@ -92,8 +248,8 @@ class ItemService:
                     existing.category_id = category_id
 
                 # Update store preference if provided
-                if request.preferred_store and not existing.preferred_store:
-                    existing.preferred_store = request.preferred_store
+                if preferred_store and not existing.preferred_store:
+                    existing.preferred_store = preferred_store
 
                 added_items.append(
                     AddedItem(
@@ -105,71 +261,62 @@ class ItemService:
                     )
                 )
             else:
-                # Create new item
-                item = Item(
-                    name_raw=parsed.name,
-                    name_norm=name_norm,
-                    qty=parsed.qty,
-                    unit=parsed.unit,
-                    category_id=category_id,
-                    preferred_store=request.preferred_store,
-                    status=ItemStatus.OPEN,
-                )
-                self.db.add(item)
-                self.db.flush()  # Get the ID
+                # Create new item; the ID is generated here so no flush is needed
+                row = {
+                    "id": str(uuid.uuid4()),
+                    "name_raw": parsed.name,
+                    "name_norm": name_norm,
+                    "qty": parsed.qty,
+                    "unit": parsed.unit,
+                    "category_id": category_id,
+                    "preferred_store": preferred_store,
+                    "status": ItemStatus.OPEN,
+                    "created_at": now,
+                    "updated_at": now,
+                    "last_added_at": now,
+                }
+                new_rows.append(row)
 
                 added_items.append(
                     AddedItem(
-                        id=item.id,
-                        name=item.name_raw,
-                        qty=item.qty,
-                        unit=item.unit,
+                        id=row["id"],
+                        name=row["name_raw"],
+                        qty=row["qty"],
+                        unit=row["unit"],
                         is_new=True,
                     )
                 )
 
-        self.db.commit()
-
-        # Create Dutch confirmation message
-        count = len(added_items)
-        if count == 1:
-            message = f"1 item toegevoegd: {added_items[0].name}"
-        else:
-            names = ", ".join(item.name for item in added_items[:3])
-            if count > 3:
-                names += f" en {count - 3} meer"
-            message = f"{count} items toegevoegd: {names}"
+        if new_rows:
+            await self.db.execute(insert(Item), new_rows)
 
-        return ItemsAddResponse(
-            count=count,
-            items=added_items,
-            message=message,
-        )
+        return added_items
 
-    def check_item(self, item_id: str) -> Item | None:
+    async def check_item(self, item_id: str) -> Item | None:
         """Mark an item as checked."""
-        item = self.get_item(item_id)
+        item = await self.get_item(item_id)
         if item:
             item.status = ItemStatus.CHECKED
             item.updated_at = datetime.utcnow()
-            self.db.commit()
+            await self._commit([ItemChange.from_item(item)])
         return item
 
-    def uncheck_item(self, item_id: str) -> Item | None:
+    async def uncheck_item(self, item_id: str) -> Item | None:
         """Mark an item as open (unchecked)."""
-        item = self.get_item(item_id)
+        item = await self.get_item(item_id)
         if item:
             item.status = ItemStatus.OPEN
             item.updated_at = datetime.utcnow()
-            self.db.commit()
+            await self._commit([ItemChange.from_item(item)])
         return item
 
-    def update_item(self, item_id: str, update: ItemUpdateRequest) -> Item | None:
+    async def update_item(self, item_id: str, update: ItemUpdateRequest) -> Item | None:
         """Update an item."""
-        item = self.get_item(item_id)
+        item = await self.get_item(item_id)
         if not item:
             return None
 
+        renamed = update.name_raw is not None and update.name_raw != item.name_raw
         if update.name_raw is not None:
             item.name_raw = update.name_raw
             item.name_norm = normalize_name(update.name_raw)
@@ -193,15 +340,17 @@ class ItemService:
             item.snooze_until = update.snooze_until
 
         item.updated_at = datetime.utcnow()
-        self.db.commit()
+        await self._commit([ItemChange.from_item(item)])
+        if renamed:
+            get_match_prefetcher().queue({item.name_norm: item.name_raw})
         return item
 
-    def delete_item(self, item_id: str) -> bool:
+    async def delete_item(self, item_id: str) -> bool:
         """Delete (mark as removed) an item."""
-        item = self.get_item(item_id)
+        item = await self.get_item(item_id)
         if item:
             item.status = ItemStatus.REMOVED
             item.updated_at = datetime.utcnow()
-            self.db.commit()
+            await self._commit([ItemChange.from_item(item)])
             return True
         return False
@@ -1,11 +1,14 @@
 """Parser service for Dutch grocery input."""
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 
+from app.config import get_settings
 
-@dataclass
+
+@dataclass(frozen=True)
 class ParsedItem:
-    """Parsed grocery item."""
+    """Parsed grocery item (immutable; parse results are shared via the memo)."""
 
     name: str
     qty: float = 1.0
@@ -33,73 +36,177 @@ UNIT_MAP = {
 # Units that should be removed (just quantity indicators)
 QUANTITY_ONLY_UNITS = {"stuks", "stuk", "st", "x"}
 
-# Regex patterns
-# Match: "2x brood", "3 stuks", "500g", "2L", "800gr"
-QUANTITY_PREFIX_PATTERN = re.compile(
-    r"^(\d+(?:[.,]\d+)?)\s*(?:(x|stuks?|st)\s+)?(.+)$", re.IGNORECASE
-)
+# Unit spellings recognised next to a quantity: "500g", "2 kilo", "melk 2L"
+QUANTITY_UNITS = {"l", "liter", "ml", "g", "gr", "gram", "kg", "kilo"}
 
-# Match: "brood 2x", "melk 2L", "gehakt 500g"
-QUANTITY_SUFFIX_PATTERN = re.compile(
-    r"^(.+?)\s+(\d+(?:[.,]\d+)?)\s*(x|stuks?|st|l|liter|ml|g|gr|gram|kg|kilo)?$", re.IGNORECASE
+# Words that may follow a quantity at the end of an item: "brood 2x", "melk 2 L"
+SUFFIX_UNITS = QUANTITY_UNITS | QUANTITY_ONLY_UNITS
+
+# Last characters of an item that may end in a quantity ("brood 2", "melk 2L")
+SUFFIX_LAST_CHARS = frozenset(
+    "0123456789" + "".join(unit[-1] + unit[-1].upper() for unit in SUFFIX_UNITS)
 )
 
-# Match unit at the end: "500g", "2L"
-UNIT_PATTERN = re.compile(r"^(\d+(?:[.,]\d+)?)\s*(l|liter|ml|g|gr|gram|kg|kilo)$", re.IGNORECASE)
+HAS_DIGIT = re.compile(r"\d").search
+
+# A comma directly followed by a digit is a decimal separator, not a list separator
+DECIMAL_COMMA = re.compile(r",[0-9]").search
+
+# Longer texts bypass the memos: they rarely repeat, and caching a few
+# hundred 64KB import lines would undo the bounded import memory
+MAX_CACHED_LENGTH = 200
+
+
+def _normalize_name(name: str) -> str:
+    # Lowercase, strip, collapse whitespace
+    return " ".join(name.lower().split())
+
+
+def _scan_number(text: str) -> int:
+    """Length of the quantity at the start of text ("2", "500", "1,5"), or 0."""
+    end = len(text)
+    i = 0
+    while i < end and text[i].isdecimal():
+        i += 1
+    if i and i + 1 < end and text[i] in ".," and text[i + 1].isdecimal():
+        i += 2
+        while i < end and text[i].isdecimal():
+            i += 1
+    return i
+
+
+def _to_qty(number: str) -> float:
+    return float(number.replace(",", "."))
+
+
+def _parse_bare_number(text: str) -> ParsedItem:
+    """Parse a number on its own, as the previous regex parser did.
+
+    Its quantity pattern had to leave at least one character for the name,
+    so "12" is 1x "2", "2.51" is 2.5x "1" and "1,5" is 1x ",5".
+    """
+    if len(text) == 1:
+        return ParsedItem(name=text)
+    separator = max(text.find(","), text.find("."))
+    if separator == -1 or len(text) - separator > 2:
+        return ParsedItem(name=text[-1], qty=_to_qty(text[:-1]))
+    return ParsedItem(name=text[separator:], qty=_to_qty(text[:separator]))
+
+
+def _parse_prefix(text: str, number_end: int) -> ParsedItem:
+    """Parse an item that starts with a quantity: "2x brood", "500g gehakt"."""
+    rest = text[number_end:].split(None, 1)
+    if not rest:
+        return _parse_bare_number(text)
+
+    word = rest[0].lower()
+    qty = _to_qty(text[:number_end])
+    if len(rest) == 2:
+        if word in QUANTITY_ONLY_UNITS:
+            return ParsedItem(name=rest[1], qty=qty)
+        if word in QUANTITY_UNITS:
+            return ParsedItem(name=rest[1], qty=qty, unit=UNIT_MAP[word])
+
+    # Anything else after the number is the name: "4 eieren"
+    return ParsedItem(name=text[number_end:].lstrip(), qty=qty)
+
+
+def _parse_suffix(text: str) -> ParsedItem | None:
+    """Parse an item that ends with a quantity: "brood 2x", "melk 2 L"."""
+    parts = text.rsplit(None, 1)
+    if len(parts) < 2:
+        return None
+    head, last = parts
+
+    number_end = _scan_number(last)
+    if number_end:
+        # Quantity with an optional unit attached: "2", "2x", "500gr"
+        unit = last[number_end:].lower()
+        if unit and unit not in SUFFIX_UNITS:
+            return None
+        return ParsedItem(name=head, qty=_to_qty(last[:number_end]), unit=UNIT_MAP.get(unit))
+
+    unit = last.lower()
+    if unit in SUFFIX_UNITS:
+        # Unit as a separate word after the quantity: "melk 2 L"
+        parts = head.rsplit(None, 1)
+        if len(parts) == 2 and _scan_number(parts[1]) == len(parts[1]):
+            return ParsedItem(name=parts[0], qty=_to_qty(parts[1]), unit=UNIT_MAP.get(unit))
+
+    return None
+
+
+def _parse_fragment(text: str) -> ParsedItem:
+    """Parse one stripped, non-empty item."""
+    # Most items carry no quantity at all, and every quantity has a digit
+    if not HAS_DIGIT(text):
+        return ParsedItem(text, 1.0, None)
+
+    if text[0].isdecimal():
+        number_end = _scan_number(text)
+        return _parse_prefix(text, number_end)
+
+    if text[-1] in SUFFIX_LAST_CHARS or text[-1].isdecimal():
+        # Could end in a quantity
+        parsed = _parse_suffix(text)
+        if parsed is not None:
+            return parsed
+
+    return ParsedItem(text, 1.0, None)
+
+
+def configure_parse_cache(maxsize: int) -> None:
+    """(Re)create the parse and normalize memos with room for ``maxsize`` entries each.
+
+    A size of 0 disables memoization. Texts longer than
+    ``MAX_CACHED_LENGTH`` are never memoized.
+    """
+    global _cached_parse_fragment, _cached_normalize_name
+    _cached_parse_fragment = lru_cache(maxsize=maxsize)(_parse_fragment)
+    _cached_normalize_name = lru_cache(maxsize=maxsize)(_normalize_name)
+
+
+def parse_cache_stats() -> dict:
+    """Hit/miss counters of the parse and normalize memos."""
+    stats = {}
+    for label, cached in (("parse", _cached_parse_fragment), ("normalize", _cached_normalize_name)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[label] = {
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 3) if lookups else 0.0,
+        }
+    return stats
+
+
+# The same phrases ("melk", "2x brood") arrive over and over, so repeated
+# fragments cost a single cache lookup
+configure_parse_cache(get_settings().parse_cache_size)
 
 
 def normalize_name(name: str) -> str:
     """Normalize item name for deduplication."""
-    # Lowercase, strip, collapse whitespace
-    normalized = name.lower().strip()
-    normalized = re.sub(r"\s+", " ", normalized)
-    return normalized
+    if len(name) > MAX_CACHED_LENGTH:
+        return _normalize_name(name)
+    return _cached_normalize_name(name)
 
 
 def parse_single_item(text: str) -> ParsedItem:
-    """Parse a single item text into structured data."""
+    """Parse a single item text into structured data.
+
+    A quantity may precede the name, optionally followed by a unit or
+    "x"/"stuks" ("2x brood", "500g gehakt", "3 stuks paprika"), or follow
+    it ("brood 2x", "melk 2L", "gehakt 500 gram").
+    """
     text = text.strip()
     if not text:
         return ParsedItem(name="", qty=0)
-
-    qty = 1.0
-    unit = None
-    name = text
-
-    # Try quantity prefix: "2x brood", "3 stuks paprika", "500g gehakt"
-    match = QUANTITY_PREFIX_PATTERN.match(text)
-    if match:
-        num_str = match.group(1).replace(",", ".")
-        qty = float(num_str)
-        unit_or_x = match.group(2)
-        name = match.group(3).strip()
-
-        # Check if the number has a unit attached (like "500g gehakt")
-        unit_check = UNIT_PATTERN.match(match.group(1) + (unit_or_x or ""))
-        if unit_check:
-            qty = float(unit_check.group(1).replace(",", "."))
-            unit_raw = unit_check.group(2).lower()
-            if unit_raw in UNIT_MAP:
-                unit = UNIT_MAP[unit_raw]
-        elif unit_or_x and unit_or_x.lower() in QUANTITY_ONLY_UNITS:
-            # "x" or "stuks" - just quantity, no unit
-            unit = None
-    else:
-        # Try quantity suffix: "brood 2x", "melk 2L"
-        match = QUANTITY_SUFFIX_PATTERN.match(text)
-        if match:
-            name = match.group(1).strip()
-            qty = float(match.group(2).replace(",", "."))
-            unit_raw = match.group(3)
-
-            if unit_raw:
-                unit_lower = unit_raw.lower()
-                if unit_lower in UNIT_MAP:
-                    unit = UNIT_MAP[unit_lower]
-                elif unit_lower in QUANTITY_ONLY_UNITS:
-                    unit = None
-
-    return ParsedItem(name=name, qty=qty, unit=unit)
+    if len(text) > MAX_CACHED_LENGTH:
+        return _parse_fragment(text)
+    return _cached_parse_fragment(text)
 
 
 def parse_items(text: str) -> list[ParsedItem]:
@@ -113,18 +220,27 @@ def parse_items(text: str) -> list[ParsedItem]:
     - With quantities: "2x brood, melk 2L, 500g gehakt"
     """
     items = []
+    parse_fragment = _cached_parse_fragment
 
     # Split by newlines first, then by commas
-    lines = text.strip().split("\n")
-    for line in lines:
-        # Split by comma, but be careful with numbers like "1,5"
-        # Use a smarter split that doesn't break "1,5 liter"
-        parts = re.split(r",\s*(?![0-9])", line)
+    for line in text.split("\n"):
+        parts = line.split(",")
+        if len(parts) > 1 and DECIMAL_COMMA(line):
+            # Glue decimals back together ("1,5 liter")
+            merged = [parts[0]]
+            for part in parts[1:]:
+                if "0" <= part[:1] <= "9":
+                    merged[-1] += "," + part
+                else:
+                    merged.append(part)
+            parts = merged
+
         for part in parts:
             part = part.strip()
             if part:
-                parsed = parse_single_item(part)
-                if parsed.name:
-                    items.append(parsed)
+                if len(part) > MAX_CACHED_LENGTH:
+                    items.append(_parse_fragment(part))
+                else:
+                    items.append(parse_fragment(part))
 
     return items
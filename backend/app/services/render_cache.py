@@ -0,0 +1,93 @@
+"""In-process cache for rendered list responses."""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Hashable
+
+from app.config import get_settings
+
+
+@dataclass
+class RenderedBody:
+    """A rendered response body."""
+
+    content: bytes
+    media_type: str
+
+
+@dataclass
+class _Entry:
+    version: int
+    expires_at: datetime | None
+    body: RenderedBody
+
+
+class RenderCache:
+    """LRU cache of rendered bodies, each valid for one list version.
+
+    Entries are stamped with the list version they were rendered from and
+    dropped on lookup once the version moved on or the snooze deadline that
+    was pending at render time has passed.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: int) -> RenderedBody | None:
+        """Return the cached body for a key if it is still current."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expired = entry.expires_at is not None and datetime.utcnow() >= entry.expires_at
+            if entry.version == version and not expired:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.body
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        key: Hashable,
+        version: int,
+        body: RenderedBody,
+        expires_at: datetime | None = None,
+    ) -> None:
+        """Store a rendered body, evicting the least recently used entries."""
+        self._entries[key] = _Entry(version=version, expires_at=expires_at, body=body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Cache counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Singleton instance
+_render_cache: RenderCache | None = None
+
+
+def get_render_cache() -> RenderCache:
+    """Get the render cache singleton."""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache(max_entries=get_settings().render_cache_max_entries)
+    return _render_cache
@@ -0,0 +1,140 @@
+"""Rate limiting, retry backoff and circuit breaking for outgoing API calls."""
+import asyncio
+import random
+import time
+from enum import Enum
+from typing import Callable
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service that is considered down."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"AH API unavailable, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """Token bucket allowing ``rate`` calls per second with bursts of ``capacity``.
+
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Take a token, waiting until one is available."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        if self._tokens < 1:
+            self.waits += 1
+        while self._tokens < 1:
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._refill()
+        self._tokens -= 1
+
+    def status(self) -> dict:
+        if self.rate > 0:
+            self._refill()
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self._tokens, 2),
+            "waits": self.waits,
+        }
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive failures.
+
+    Once open, calls are refused for ``reset_seconds``. After that the
+    circuit is half-open: the next call is let through as a probe, and its
+    outcome closes the circuit again or reopens it for another cool-down.
+    Other calls are refused while the probe is in flight; a probe that
+    never reports back (e.g. cancelled) is replaced after ``reset_seconds``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._opened_at: float | None = None
+        self._probe_started: float | None = None
+        self.failures = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def check(self) -> None:
+        """Raise CircuitOpenError while the circuit is open or being probed."""
+        state = self.state
+        if state == CircuitState.OPEN:
+            raise CircuitOpenError(self._opened_at + self.reset_seconds - self._clock())
+        if state == CircuitState.HALF_OPEN:
+            now = self._clock()
+            if self._probe_started is not None and now - self._probe_started < self.reset_seconds:
+                raise CircuitOpenError(0)
+            self._probe_started = now
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_started = None
+        if self.state == CircuitState.HALF_OPEN or (
+            self.state == CircuitState.CLOSED and self.failures >= self.failure_threshold
+        ):
+            self._opened_at = self._clock()
+            self.times_opened += 1
+
+    def status(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "retry_in": (
+                round(self._opened_at + self.reset_seconds - self._clock(), 1)
+                if state == CircuitState.OPEN
+                else None
+            ),
+        }
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter for the given retry (0-based)."""
+    return random.uniform(0, min(maximum, base * 2**attempt))
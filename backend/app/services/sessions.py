@@ -1,77 +1,113 @@
 """Session service for shopping sessions."""
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.item import Item, ItemStatus, Store
 from app.models.session import ShoppingSession, SessionItem, ClosePolicy, SessionItemState
 from app.schemas.session import SessionStartRequest, SessionCloseRequest
+from app.services.events import ItemChange, get_event_hub
+from app.services.versioning import get_list_version
+
+
+def _uuid4_sql():
+    """SQL expression producing a random UUID4 string in SQLite.
+
+    Lets snapshot rows get the same kind of IDs as ORM-created rows without
+    round-tripping through Python.
+    """
+    def hex_bytes(n: int):
+        return func.lower(func.hex(func.randomblob(n)))
+
+    return (
+        hex_bytes(4)
+        + "-"
+        + hex_bytes(2)
+        + "-4"
+        + func.substr(hex_bytes(2), 2)
+        + "-"
+        + func.substr("89ab", 1 + func.abs(func.random()) % 4, 1)
+        + func.substr(hex_bytes(2), 2)
+        + "-"
+        + hex_bytes(6)
+    )
 
 
 class SessionService:
     """Service for shopping session operations."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_sessions(self, limit: int = 20) -> list[ShoppingSession]:
+    async def _commit(self, changes: list[ItemChange] | None = None) -> None:
+        """Commit a change to list items and publish a new list version.
+
+        Stream subscribers get ``changes``, or a resync event without them.
+        """
+        await self.db.commit()
+        list_version = get_list_version()
+        list_version.bump()
+        get_event_hub().publish(list_version.counter, changes)
+
+    async def get_sessions(self, limit: int = 20) -> list[ShoppingSession]:
         """Get recent sessions."""
-        return (
-            self.db.query(ShoppingSession)
+        result = await self.db.execute(
+            select(ShoppingSession)
             .order_by(ShoppingSession.started_at.desc())
             .limit(limit)
-            .all()
         )
+        return list(result.scalars().all())
 
-    def get_session(self, session_id: str) -> ShoppingSession | None:
+    async def get_session(self, session_id: str) -> ShoppingSession | None:
         """Get a single session by ID."""
-        return (
-            self.db.query(ShoppingSession)
-            .filter(ShoppingSession.id == session_id)
-            .first()
+        result = await self.db.execute(
+            select(ShoppingSession).where(ShoppingSession.id == session_id)
         )
+        return result.scalars().first()
 
-    def start_session(self, request: SessionStartRequest) -> ShoppingSession:
+    async def start_session(self, request: SessionStartRequest) -> ShoppingSession:
         """Start a new shopping session."""
         # Create the session
         session = ShoppingSession(store=request.store)
         self.db.add(session)
-        self.db.flush()
-
-        # Get open items (respecting store preference)
-        query = self.db.query(Item).filter(Item.status == ItemStatus.OPEN)
+        await self.db.flush()
+
+        # Snapshot open items (respecting store preference) with one INSERT ... SELECT
+        snapshot = select(
+            _uuid4_sql(),
+            literal(session.id),
+            Item.id,
+            Item.qty,
+            Item.unit,
+            literal(SessionItemState.EXPORTED, SessionItem.__table__.c.state.type),
+        ).where(Item.status == ItemStatus.OPEN)
 
         # Exclude snoozed items
-        query = query.filter(
+        snapshot = snapshot.where(
             (Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow())
         )
 
         # Filter by store preference if specified
         if request.store:
-            query = query.filter(
+            snapshot = snapshot.where(
                 (Item.preferred_store.is_(None)) | (Item.preferred_store == request.store)
             )
 
-        items = query.all()
-
-        # Create session items snapshot
-        for item in items:
-            session_item = SessionItem(
-                session_id=session.id,
-                item_id=item.id,
-                qty_at_export=item.qty,
-                unit_at_export=item.unit,
-                state=SessionItemState.EXPORTED,
+        await self.db.execute(
+            insert(SessionItem).from_select(
+                ["id", "session_id", "item_id", "qty_at_export", "unit_at_export", "state"],
+                snapshot,
             )
-            self.db.add(session_item)
+        )
 
-        self.db.commit()
+        await self.db.commit()
         return session
 
-    def close_session(
+    async def close_session(
         self, session_id: str, request: SessionCloseRequest
     ) -> ShoppingSession | None:
         """Close a session with the specified policy."""
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             return None
 
@@ -79,72 +115,95 @@ class SessionService:
             # Already closed
             return session
 
-        # Apply policy to leftover items
-        leftover_items = (
-            self.db.query(SessionItem)
-            .filter(SessionItem.session_id == session_id)
-            .filter(SessionItem.state == SessionItemState.EXPORTED)
-            .all()
+        # Apply policy to leftover items with set-based updates
+        now = datetime.utcnow()
+        leftover_item_ids = (
+            select(SessionItem.item_id)
+            .where(SessionItem.session_id == session_id)
+            .where(SessionItem.state == SessionItemState.EXPORTED)
         )
 
-        for session_item in leftover_items:
-            session_item.state = SessionItemState.LEFTOVER
+        if request.policy == ClosePolicy.SNOOZE_LEFTOVERS:
+            # Snooze the actual items
+            await self.db.execute(
+                update(Item)
+                .where(Item.id.in_(leftover_item_ids))
+                .values(snooze_until=now + timedelta(days=request.snooze_days), updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
 
-            if request.policy == ClosePolicy.SNOOZE_LEFTOVERS:
-                # Snooze the actual item
-                item = self.db.query(Item).filter(Item.id == session_item.item_id).first()
-                if item:
-                    item.snooze_until = datetime.utcnow() + timedelta(days=request.snooze_days)
-                    item.updated_at = datetime.utcnow()
+        elif request.policy == ClosePolicy.REMOVE_LEFTOVERS:
+            # Remove the actual items
+            await self.db.execute(
+                update(Item)
+                .where(Item.id.in_(leftover_item_ids))
+                .values(status=ItemStatus.REMOVED, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
 
-            elif request.policy == ClosePolicy.REMOVE_LEFTOVERS:
-                # Remove the actual item
-                item = self.db.query(Item).filter(Item.id == session_item.item_id).first()
-                if item:
-                    item.status = ItemStatus.REMOVED
-                    item.updated_at = datetime.utcnow()
+        # Mark leftovers last; the item updates above select them by state
+        await self.db.execute(
+            update(SessionItem)
+            .where(SessionItem.session_id == session_id)
+            .where(SessionItem.state == SessionItemState.EXPORTED)
+            .values(state=SessionItemState.LEFTOVER)
+            .execution_options(synchronize_session=False)
+        )
 
         # Close the session
-        session.closed_at = datetime.utcnow()
+        session.closed_at = now
         session.close_policy = request.policy
-        self.db.commit()
+        await self._commit()
 
         return session
 
-    def check_session_item(self, session_id: str, item_id: str) -> SessionItem | None:
+    async def check_session_item(self, session_id: str, item_id: str) -> SessionItem | None:
         """Mark an item as checked within a session."""
-        session_item = (
-            self.db.query(SessionItem)
-            .filter(SessionItem.session_id == session_id)
-            .filter(SessionItem.item_id == item_id)
-            .first()
+        result = await self.db.execute(
+            select(SessionItem)
+            .where(SessionItem.session_id == session_id)
+            .where(SessionItem.item_id == item_id)
         )
+        session_item = result.scalars().first()
 
         if session_item:
             session_item.state = SessionItemState.CHECKED
             session_item.checked_at = datetime.utcnow()
 
             # Also check the actual item
-            item = self.db.query(Item).filter(Item.id == item_id).first()
+            item = await self.db.get(Item, item_id)
+            changes = []
             if item:
                 item.status = ItemStatus.CHECKED
                 item.updated_at = datetime.utcnow()
+                changes.append(ItemChange.from_item(item))
 
-            self.db.commit()
+            await self._commit(changes)
 
         return session_item
 
-    def get_session_stats(self, session: ShoppingSession) -> dict:
-        """Get statistics for a session."""
-        total = (
-            self.db.query(SessionItem)
-            .filter(SessionItem.session_id == session.id)
-            .count()
-        )
-        checked = (
-            self.db.query(SessionItem)
-            .filter(SessionItem.session_id == session.id)
-            .filter(SessionItem.state == SessionItemState.CHECKED)
-            .count()
+    async def get_sessions_stats(self, session_ids: list[str]) -> dict[str, dict]:
+        """Get statistics for several sessions with a single aggregate query."""
+        stats = {
+            session_id: {"item_count": 0, "checked_count": 0} for session_id in session_ids
+        }
+        if not session_ids:
+            return stats
+
+        result = await self.db.execute(
+            select(
+                SessionItem.session_id,
+                func.count(),
+                func.sum(case((SessionItem.state == SessionItemState.CHECKED, 1), else_=0)),
+            )
+            .where(SessionItem.session_id.in_(session_ids))
+            .group_by(SessionItem.session_id)
         )
-        return {"item_count": total, "checked_count": checked}
+        for session_id, total, checked in result:
+            stats[session_id] = {"item_count": total, "checked_count": checked}
+        return stats
+
+    async def get_session_stats(self, session: ShoppingSession) -> dict:
+        """Get statistics for a session."""
+        stats = await self.get_sessions_stats([session.id])
+        return stats[session.id]
@@ -0,0 +1,231 @@
+"""Background AH sync jobs."""
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal, WriteSessionLocal
+from app.models.item import Item, ItemStatus
+from app.models.sync_job import SyncJob, SyncJobStatus
+from app.services.ah import AHService, SyncResult, get_ah_service
+from app.services.ah_matches import AHMatchService
+from app.services.ah_sync_state import AHSyncStateService
+
+logger = logging.getLogger(__name__)
+
+INTERRUPTED_ERROR = "Onderbroken door herstart"
+
+
+async def get_items_to_sync(db: AsyncSession) -> list[dict]:
+    """Open, unsnoozed items in the form AHService.sync_items takes."""
+    result = await db.execute(
+        select(Item)
+        .where(Item.status == ItemStatus.OPEN)
+        .where(
+            (Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow())
+        )
+    )
+    return [
+        {"id": item.id, "name": item.name_raw, "name_norm": item.name_norm, "qty": item.qty}
+        for item in result.scalars().all()
+    ]
+
+
+def record_results(job: SyncJob, results: list[SyncResult]) -> None:
+    """Store per-item results and their counts on a job."""
+    job.total = len(results)
+    job.synced = sum(1 for r in results if r.status == "ok")
+    job.unchanged = sum(1 for r in results if r.status == "unchanged")
+    job.not_found = sum(1 for r in results if r.status == "not_found")
+    job.failed = sum(1 for r in results if r.status == "error")
+    job.results = [
+        {
+            "item": r.item_name,
+            "status": r.status,
+            "ah_product": r.ah_product,
+            "error": r.error,
+        }
+        for r in results
+    ]
+
+
+class SyncWorker:
+    """Runs queued sync jobs one at a time on an asyncio task.
+
+    A job pushes only new items and quantity increases since the previous
+    sync (see AHSyncStateService), unless it is a full resync.
+
+    Jobs are persisted, so jobs that were still queued at shutdown run after
+    the next start. A job that was running is marked failed instead of being
+    retried, because part of its products may already be on the AH list.
+    """
+
+    def __init__(self, ah_service: AHService | None = None):
+        self.ah_service = ah_service
+        self._queue: asyncio.Queue[str] | None = None
+        self._task: asyncio.Task | None = None
+        self._finished: dict[str, asyncio.Event] = {}
+        self._progress: dict[str, tuple[int, int]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Resume persisted jobs and start the worker task."""
+        self._queue = asyncio.Queue()
+        async with WriteSessionLocal() as db:
+            result = await db.execute(
+                select(SyncJob)
+                .where(SyncJob.status.in_([SyncJobStatus.QUEUED, SyncJobStatus.RUNNING]))
+                .order_by(SyncJob.created_at)
+            )
+            for job in result.scalars().all():
+                if job.status == SyncJobStatus.RUNNING:
+                    job.status = SyncJobStatus.FAILED
+                    job.error = INTERRUPTED_ERROR
+                    job.finished_at = datetime.utcnow()
+                else:
+                    self._schedule(job.id)
+            await db.commit()
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker task; queued jobs stay queued in the database."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def enqueue(self, db: AsyncSession, full_resync: bool = False) -> SyncJob:
+        """Queue a sync of the open items, or return the sync already waiting.
+
+        With ``full_resync`` every open item is pushed in full instead of
+        only what changed since the last sync.
+        """
+        if not self.running:
+            raise RuntimeError("Sync worker is not running")
+
+        result = await db.execute(
+            select(SyncJob)
+            .where(SyncJob.status == SyncJobStatus.QUEUED)
+            .order_by(SyncJob.created_at)
+            .limit(1)
+        )
+        job = result.scalar_one_or_none()
+        if job is not None and job.id not in self._finished:
+            # Queued, but its run crashed before it could be marked failed
+            self._schedule(job.id)
+        if job is None:
+            job = SyncJob(status=SyncJobStatus.QUEUED, full_resync=full_resync)
+            db.add(job)
+            await db.commit()
+            self._schedule(job.id)
+        else:
+            if full_resync:
+                job.full_resync = True
+            # End the transaction: callers wait for the job next, and must
+            # not hold the write lock it needs meanwhile
+            await db.commit()
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a job; True once it finished."""
+        finished = self._finished.get(job_id)
+        if finished is None:
+            # Not queued in this process: finished before a restart, or unknown
+            return True
+        try:
+            await asyncio.wait_for(finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def progress(self, job_id: str) -> tuple[int, int] | None:
+        """(finished, total) items of a job that is running right now."""
+        return self._progress.get(job_id)
+
+    def _schedule(self, job_id: str) -> None:
+        self._finished[job_id] = asyncio.Event()
+        self._queue.put_nowait(job_id)
+
+    async def _run(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                logger.exception(f"Sync job {job_id} crashed")
+                await self._fail_crashed(job_id, e)
+            finally:
+                self._progress.pop(job_id, None)
+                self._finished.pop(job_id).set()
+
+    async def _fail_crashed(self, job_id: str, error: Exception) -> None:
+        """Mark a job failed whose run crashed, so it isn't left queued or running."""
+        try:
+            async with WriteSessionLocal() as db:
+                job = await db.get(SyncJob, job_id)
+                if job is not None and job.status in (SyncJobStatus.QUEUED, SyncJobStatus.RUNNING):
+                    job.status = SyncJobStatus.FAILED
+                    job.error = str(error) or type(error).__name__
+                    job.finished_at = datetime.utcnow()
+                    await db.commit()
+        except Exception:
+            logger.exception(f"Could not mark crashed sync job {job_id} failed")
+
+    async def _process(self, job_id: str) -> None:
+        async with WriteSessionLocal() as db:
+            job = await db.get(SyncJob, job_id)
+            if job is None or job.status != SyncJobStatus.QUEUED:
+                return
+            job.status = SyncJobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            await db.commit()
+
+        results: list[SyncResult] = []
+        error = None
+        try:
+            async with SessionLocal() as db:
+                items = await get_items_to_sync(db)
+                sync_state = AHSyncStateService(db)
+                to_push, unchanged = await sync_state.plan(items, job.full_resync)
+                self._progress[job_id] = (len(unchanged), len(items))
+
+                def report(done: int) -> None:
+                    self._progress[job_id] = (len(unchanged) + done, len(items))
+
+                ah_service = self.ah_service or get_ah_service()
+                pushed = await ah_service.sync_items(to_push, AHMatchService(db), progress=report)
+                await sync_state.record(to_push, pushed)
+
+                pushed_by_id = {item["id"]: result for item, result in zip(to_push, pushed)}
+                results = [unchanged.get(item["id"]) or pushed_by_id[item["id"]] for item in items]
+        except Exception as e:
+            logger.error(f"Sync job {job_id} failed: {e}")
+            error = str(e) or type(e).__name__
+
+        async with WriteSessionLocal() as db:
+            job = await db.get(SyncJob, job_id)
+            record_results(job, results)
+            job.status = SyncJobStatus.FAILED if error else SyncJobStatus.DONE
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+
+
+# Singleton instance
+_sync_worker: SyncWorker | None = None
+
+
+def get_sync_worker() -> SyncWorker:
+    """Get the sync worker singleton."""
+    global _sync_worker
+    if _sync_worker is None:
+        _sync_worker = SyncWorker()
+    return _sync_worker
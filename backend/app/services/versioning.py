@@ -0,0 +1,90 @@
+"""List version tracking for conditional requests."""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.item import Item
+from app.services.events import get_event_hub
+
+
+class ListVersion:
+    """Process-wide version token for the grocery list.
+
+    Services bump it after every committed write, so readers can tell
+    whether anything changed without querying the list. Snoozed items
+    reappear without a write, so the token also rolls over once the earliest
+    pending ``snooze_until`` has passed; that deadline is looked up once per
+    version, not once per request.
+    """
+
+    def __init__(self):
+        # Distinguishes tokens across restarts, when the counter starts over
+        self._boot_id = uuid.uuid4().hex[:8]
+        self._counter = 0
+        self._snooze_deadline: datetime | None = None
+        self._deadline_known = False
+
+    @property
+    def counter(self) -> int:
+        """Number of writes (and snooze expiries) seen by this process."""
+        return self._counter
+
+    def bump(self) -> None:
+        """Record that the list changed."""
+        self._counter += 1
+        self._deadline_known = False
+
+    def expire_snoozes(self) -> bool:
+        """Roll the version if the known snooze deadline has passed.
+
+        Snoozed items reappear without a write, so stream subscribers are
+        told to refetch the list.
+        """
+        deadline = self._snooze_deadline
+        if self._deadline_known and deadline and datetime.utcnow() >= deadline:
+            self.bump()
+            get_event_hub().publish(self._counter, None)
+            return True
+        return False
+
+    async def current(self, db: AsyncSession) -> int:
+        """Current version; queries the next snooze expiry only after a change."""
+        self.expire_snoozes()
+        now = datetime.utcnow()
+        # The query below starts the caller's read snapshot; a write committed
+        # meanwhile must not tag that older snapshot with its newer version
+        counter = self._counter
+
+        if not self._deadline_known:
+            deadline = await db.scalar(
+                select(func.min(Item.snooze_until)).where(Item.snooze_until > now)
+            )
+            # Only trust the result if no write happened while we were querying
+            if counter == self._counter:
+                self._snooze_deadline = deadline
+                self._deadline_known = True
+
+        return counter
+
+    @property
+    def snooze_deadline(self) -> datetime | None:
+        """Earliest pending snooze expiry, as of the last lookup."""
+        return self._snooze_deadline if self._deadline_known else None
+
+    def etag(self, version: int) -> str:
+        """Weak ETag for responses rendered at a given version."""
+        return f'W/"{self._boot_id}-{version}"'
+
+
+# Singleton instance
+_list_version: ListVersion | None = None
+
+
+def get_list_version() -> ListVersion:
+    """Get the list version singleton."""
+    global _list_version
+    if _list_version is None:
+        _list_version = ListVersion()
+    return _list_version
@@ -0,0 +1 @@
+"""Performance benchmarks. Run from backend/ as `python -m benchmarks.<name>`."""
@@ -0,0 +1,94 @@
+"""Statement count and latency of ItemService.add_items for pastes of various sizes.
+
+Compares the set-based merge path with the previous per-item loop (one
+SELECT and one flush per parsed item, reproduced below as ``legacy``). Each
+size is measured twice: on an empty list (all inserts) and again with the
+same paste (all merges).
+
+    python -m benchmarks.bench_add_items [--sizes 1 50 1000]
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from benchmarks.common import timer, use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import delete, event, select
+
+from app.database import SessionLocal, engine, run_migrations
+from app.main import seed_categories
+from app.models.item import Item, ItemStatus
+from app.schemas.item import ItemsAddRequest
+from app.services.items import ItemService
+from app.services.parser import normalize_name, parse_items
+
+statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def count_statement(*args):
+    global statements
+    statements += 1
+
+
+async def legacy_add_items(db, request: ItemsAddRequest) -> None:
+    """Previous implementation: one lookup and one flush per parsed item."""
+    for parsed in parse_items(request.text):
+        name_norm = normalize_name(parsed.name)
+        result = await db.execute(
+            select(Item)
+            .where(Item.name_norm == name_norm)
+            .where(Item.status != ItemStatus.REMOVED)
+        )
+        existing = result.scalars().first()
+        if existing:
+            existing.qty += parsed.qty
+            existing.last_added_at = datetime.utcnow()
+            existing.updated_at = datetime.utcnow()
+        else:
+            db.add(Item(name_raw=parsed.name, name_norm=name_norm, qty=parsed.qty, unit=parsed.unit))
+            await db.flush()
+    await db.commit()
+
+
+async def bulk_add_items(db, request: ItemsAddRequest) -> None:
+    await ItemService(db).add_items(request)
+
+
+async def measure(add, request: ItemsAddRequest) -> tuple[int, float]:
+    global statements
+    async with SessionLocal() as db:
+        statements = 0
+        with timer() as elapsed:
+            await add(db, request)
+    return statements, elapsed["elapsed"]
+
+
+async def main(sizes: list[int]) -> None:
+    await run_migrations()
+    async with SessionLocal() as db:
+        await seed_categories(db)
+
+    print(f"{'size':>6} {'path':8} {'insert stmts':>12} {'insert ms':>10} {'merge stmts':>12} {'merge ms':>10}")
+    for size in sizes:
+        request = ItemsAddRequest(text="\n".join(f"product{i}" for i in range(size)))
+        for label, add in (("legacy", legacy_add_items), ("bulk", bulk_add_items)):
+            async with SessionLocal() as db:
+                await db.execute(delete(Item))
+                await db.commit()
+            insert_stmts, insert_time = await measure(add, request)
+            merge_stmts, merge_time = await measure(add, request)
+            print(
+                f"{size:>6} {label:8} {insert_stmts:>12} {insert_time * 1000:>10.1f} "
+                f"{merge_stmts:>12} {merge_time * 1000:>10.1f}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50, 1000])
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes))
@@ -0,0 +1,130 @@
+"""Throughput and tail latency of an AH sync against the local AH stand-in.
+
+Syncs lists of distinct items with ``AHService.sync_items`` (every name is a
+search, then the products are added in PATCH batches) against
+``tests.ah_stub.AHStub``, which simulates network latency, random 503s and,
+optionally, a server-side rate limit answered with 429s. The stand-in is
+served by uvicorn on localhost, so connection handling and the client's
+pool are part of the measurement; ``--in-process`` talks to it through
+httpx.ASGITransport instead.
+
+Per list size it reports the sync time and throughput (median of the
+rounds), p50/p95/p99 of the AH calls as the sync saw them (including
+rate-limiter waits and retries), and how many items failed. The client rate
+limit is off by default to measure the sync itself; pass
+``--client-rate-limit 10`` to include the production limit.
+
+    python -m benchmarks.bench_ah_sync [--sizes 10 50 100 250 500] [--rounds 3]
+        [--latency 0.03] [--jitter 0.02] [--error-rate 0.01] [--server-rate-limit 0]
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from contextlib import AsyncExitStack
+
+from benchmarks.common import percentile, timer
+
+import httpx
+from cryptography.fernet import Fernet
+
+from app.config import get_settings
+from app.services.ah import AHService
+from tests.ah_stub import AHStub
+
+
+def time_requests(service: AHService, samples: list[float]) -> None:
+    """Record the duration of every AH call the service makes."""
+    request = service._request
+
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await request(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+
+    service._request = timed
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Retries of the simulated errors are expected; only show what fails
+    logging.getLogger("app.services.ah").setLevel(logging.ERROR)
+    settings = get_settings()
+    settings.ah_email = "bench@example.com"
+    settings.ah_password = "bench"
+    settings.ah_token_key = Fernet.generate_key().decode()
+    settings.ah_token_file = f"{tempfile.mkdtemp(prefix='boodschappen-bench-')}/ah_tokens.enc"
+    settings.ah_rate_limit_per_second = args.client_rate_limit
+
+    stub = AHStub(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.server_rate_limit,
+        seed=1,
+    )
+
+    async with AsyncExitStack() as stack:
+        if args.in_process:
+            settings.ah_base_url = "http://ah-stub"
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app()))
+            service = AHService(client=client)
+        else:
+            settings.ah_base_url = await stack.enter_async_context(stub.serve())
+            service = AHService()
+        stack.push_async_callback(service.close)
+
+        samples: list[float] = []
+        time_requests(service, samples)
+
+        print(
+            f"stand-in: latency={args.latency * 1000:.0f}ms jitter={args.jitter * 1000:.0f}ms "
+            f"error rate={args.error_rate:.0%} rate limit={args.server_rate_limit or 'off'}; "
+            f"client: concurrency={settings.ah_sync_concurrency} "
+            f"rate limit={args.client_rate_limit or 'off'}"
+        )
+        print(
+            f"{'items':>6} {'sync s':>8} {'items/s':>8} {'calls':>6} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>7} {'retries':>8} {'429s':>5}"
+        )
+        for size in args.sizes:
+            durations = []
+            failed = 0
+            samples.clear()
+            retries = service.stats["retries"]
+            rate_limited = service.stats["rate_limited"]
+            for round_ in range(args.rounds):
+                items = [
+                    {"name": f"product {round_} {i}", "qty": 1} for i in range(size)
+                ]
+                with timer() as elapsed:
+                    results = await service.sync_items(items)
+                durations.append(elapsed["elapsed"])
+                failed += sum(1 for r in results if r.status != "ok")
+
+            duration = statistics.median(durations)
+            print(
+                f"{size:>6} {duration:>8.2f} {size / duration:>8.1f} {len(samples):>6} "
+                f"{statistics.median(samples) * 1000:>8.1f} "
+                f"{percentile(samples, 95) * 1000:>8.1f} "
+                f"{percentile(samples, 99) * 1000:>8.1f} "
+                f"{failed:>7} {service.stats['retries'] - retries:>8} "
+                f"{service.stats['rate_limited'] - rate_limited:>5}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 250, 500])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per AH request")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random latency")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="share of requests failing with 503")
+    parser.add_argument("--server-rate-limit", type=float, default=0.0, help="requests/s before 429s")
+    parser.add_argument("--client-rate-limit", type=float, default=0.0, help="AH_RATE_LIMIT_PER_SECOND")
+    parser.add_argument("--in-process", action="store_true", help="skip the localhost server")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,147 @@
+"""Concurrent request latency with a blocking vs. async database layer.
+
+A background connection repeatedly holds an exclusive SQLite lock (as a large
+session close does while committing) while clients fetch items and a probe
+keeps hitting ``GET /health``. With a synchronous SQLAlchemy session inside an
+``async def`` handler (the old behaviour, reproduced by ``/blocking/...``) a
+read that waits for the lock sleeps *on the event loop*, so every other
+request - even the health probe - waits with it. With the async session the
+wait happens on the driver thread and the probe stays fast.
+
+The app is served by uvicorn on localhost so requests queue the way they do
+in production.
+
+    python -m benchmarks.bench_concurrency [--requests 40] [--lock-ms 100]
+"""
+import argparse
+import asyncio
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from benchmarks.common import summarize, timer, use_temp_database
+
+DATABASE_URL = use_temp_database()
+
+import httpx
+import uvicorn
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SessionLocal, engine, run_migrations
+from app.main import app, seed_categories
+from app.models.item import Item
+
+blocking_engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+BlockingSession = sessionmaker(bind=blocking_engine)
+
+
+@app.get("/blocking/items/{item_id}", include_in_schema=False)
+async def blocking_get_item(item_id: str):
+    """Baseline handler: synchronous session called from the event loop."""
+    with BlockingSession() as db:
+        item = db.get(Item, item_id)
+        return {"id": item.id, "name_raw": item.name_raw}
+
+
+def serve_in_thread() -> tuple[uvicorn.Server, str]:
+    """Run the app with uvicorn on a free localhost port in a background thread."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def hold_write_lock(stop: threading.Event, lock_seconds: float) -> None:
+    """Repeatedly lock the database for a while, like a long session close."""
+    conn = sqlite3.connect(DATABASE_URL.replace("sqlite:///", ""), timeout=30)
+    conn.isolation_level = None
+    while not stop.is_set():
+        conn.execute("BEGIN EXCLUSIVE")
+        time.sleep(lock_seconds)
+        conn.execute("COMMIT")
+        time.sleep(0.005)
+    conn.close()
+
+
+async def setup(n_items: int) -> list[str]:
+    await run_migrations()
+    ids = [str(uuid.uuid4()) for _ in range(n_items)]
+    async with SessionLocal() as db:
+        await seed_categories(db)
+        await db.execute(
+            insert(Item),
+            [{"id": i, "name_raw": f"product{n}", "name_norm": f"product{n}"} for n, i in enumerate(ids)],
+        )
+        await db.commit()
+    return ids
+
+
+async def run(client: httpx.AsyncClient, path: str, ids: list[str]) -> tuple[list, list, float]:
+    probe_latencies: list[float] = []
+    read_latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def timed(method: str, url: str, sink: list[float]) -> None:
+        start = time.perf_counter()
+        response = await client.request(method, url)
+        response.raise_for_status()
+        sink.append(time.perf_counter() - start)
+
+    async def reads() -> None:
+        await asyncio.gather(
+            *(timed("GET", path.format(item_id=item_id), read_latencies) for item_id in ids)
+        )
+        done.set()
+
+    async def probes() -> None:
+        while not done.is_set():
+            await timed("GET", "/health", probe_latencies)
+            await asyncio.sleep(0.01)
+
+    with timer() as elapsed:
+        await asyncio.gather(reads(), probes())
+    return read_latencies, probe_latencies, elapsed["elapsed"]
+
+
+async def main(n_requests: int, lock_ms: int) -> None:
+    ids = await setup(n_requests)
+    await engine.dispose()  # the server thread runs its own event loop
+    server, base_url = serve_in_thread()
+
+    paths = {
+        "blocking": "/blocking/items/{item_id}",
+        "async": "/api/v1/items/{item_id}",
+    }
+    limits = httpx.Limits(max_connections=n_requests + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        print(f"{n_requests} concurrent item reads, writer holding lock {lock_ms}ms at a time")
+        for label, path in paths.items():
+            stop = threading.Event()
+            writer = threading.Thread(target=hold_write_lock, args=(stop, lock_ms / 1000))
+            writer.start()
+            try:
+                reads, probes, elapsed = await run(client, path, ids)
+            finally:
+                stop.set()
+                writer.join()
+            print(f"  {label:8s} total={elapsed:6.2f}s")
+            print(f"    read   {summarize(reads)}")
+            print(f"    health {summarize(probes)}")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--lock-ms", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.lock_ms))
@@ -0,0 +1,102 @@
+"""Cost of SessionService.start_session as the open list grows.
+
+Compares the INSERT ... SELECT snapshot with the previous approach of one
+``SessionItem`` ORM object per open item (reproduced below as ``legacy``).
+
+    python -m benchmarks.bench_start_session [--sizes 10 100 1000 10000]
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import datetime
+
+from benchmarks.common import timer, use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import delete, event, insert, select
+
+from app.database import SessionLocal, engine, run_migrations
+from app.main import seed_categories
+from app.models.item import Item, ItemStatus
+from app.models.session import SessionItem, SessionItemState, ShoppingSession
+from app.schemas.session import SessionStartRequest
+from app.services.sessions import SessionService
+
+statements = 0
+params_from_python = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    global statements, params_from_python
+    statements += 1
+    if executemany:
+        params_from_python += len(parameters)
+
+
+async def legacy_start_session(db, request: SessionStartRequest) -> None:
+    """Previous implementation: one ORM SessionItem per open item."""
+    session = ShoppingSession(store=request.store)
+    db.add(session)
+    await db.flush()
+    result = await db.execute(
+        select(Item)
+        .where(Item.status == ItemStatus.OPEN)
+        .where((Item.snooze_until.is_(None)) | (Item.snooze_until <= datetime.utcnow()))
+    )
+    for item in result.scalars():
+        db.add(
+            SessionItem(
+                session_id=session.id,
+                item_id=item.id,
+                qty_at_export=item.qty,
+                unit_at_export=item.unit,
+                state=SessionItemState.EXPORTED,
+            )
+        )
+    await db.commit()
+
+
+async def bulk_start_session(db, request: SessionStartRequest) -> None:
+    await SessionService(db).start_session(request)
+
+
+async def main(sizes: list[int]) -> None:
+    global statements, params_from_python
+    await run_migrations()
+    async with SessionLocal() as db:
+        await seed_categories(db)
+
+    print(f"{'open items':>10} {'path':8} {'statements':>10} {'params sent':>11} {'ms':>9}")
+    for size in sizes:
+        async with SessionLocal() as db:
+            await db.execute(delete(SessionItem))
+            await db.execute(delete(ShoppingSession))
+            await db.execute(delete(Item))
+            await db.execute(
+                insert(Item),
+                [
+                    {"id": str(uuid.uuid4()), "name_raw": f"product{i}", "name_norm": f"product{i}"}
+                    for i in range(size)
+                ],
+            )
+            await db.commit()
+
+        for label, start in (("legacy", legacy_start_session), ("bulk", bulk_start_session)):
+            async with SessionLocal() as db:
+                statements = params_from_python = 0
+                with timer() as elapsed:
+                    await start(db, SessionStartRequest())
+            print(
+                f"{size:>10} {label:8} {statements:>10} {params_from_python:>11} "
+                f"{elapsed['elapsed'] * 1000:>9.1f}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes))
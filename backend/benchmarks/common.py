@@ -0,0 +1,38 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def use_temp_database() -> str:
+    """Point the app at a fresh SQLite file; call before importing app modules."""
+    tmp_dir = tempfile.mkdtemp(prefix="boodschappen-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+    return os.environ["DATABASE_URL"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> str:
+    """Format latency samples (seconds) as p50/p95/max in milliseconds."""
+    return (
+        f"p50={statistics.median(samples) * 1000:7.1f}ms "
+        f"p95={percentile(samples, 95) * 1000:7.1f}ms "
+        f"max={max(samples) * 1000:7.1f}ms"
+    )
+
+
+@contextmanager
+def timer():
+    """Measure elapsed wall time; yields a dict filled in on exit."""
+    result = {}
+    start = time.perf_counter()
+    yield result
+    result["elapsed"] = time.perf_counter() - start
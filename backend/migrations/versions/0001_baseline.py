@@ -0,0 +1,97 @@
+"""Baseline schema
+
+The tables as previously created by ``Base.metadata.create_all``. Databases
+that predate migrations are stamped at this revision on startup.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+store_enum = sa.Enum("AH", "JUMBO", name="store")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("name_nl", sa.String(length=100), nullable=False),
+        sa.Column("icon", sa.String(length=10), nullable=True),
+        sa.Column("sort_order", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_categories_name", "categories", ["name"], unique=True)
+
+    op.create_table(
+        "sessions",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("store", store_enum, nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("closed_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "close_policy",
+            sa.Enum("KEEP_OPEN", "SNOOZE_LEFTOVERS", "REMOVE_LEFTOVERS", name="closepolicy"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "items",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("name_raw", sa.String(length=255), nullable=False),
+        sa.Column("name_norm", sa.String(length=255), nullable=False),
+        sa.Column("category_id", sa.String(length=36), nullable=True),
+        sa.Column("qty", sa.Float(), nullable=True),
+        sa.Column("unit", sa.String(length=50), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column(
+            "status", sa.Enum("OPEN", "CHECKED", "REMOVED", name="itemstatus"), nullable=False
+        ),
+        sa.Column("preferred_store", store_enum, nullable=True),
+        sa.Column("snooze_until", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("last_added_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_items_name_norm", "items", ["name_norm"], unique=False)
+
+    op.create_table(
+        "session_items",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("session_id", sa.String(length=36), nullable=False),
+        sa.Column("item_id", sa.String(length=36), nullable=False),
+        sa.Column("qty_at_export", sa.Float(), nullable=False),
+        sa.Column("unit_at_export", sa.String(length=50), nullable=True),
+        sa.Column("checked_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "state",
+            sa.Enum("EXPORTED", "CHECKED", "LEFTOVER", name="sessionitemstate"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"]),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("session_items")
+    op.drop_index("ix_items_name_norm", table_name="items")
+    op.drop_table("items")
+    op.drop_table("sessions")
+    op.drop_index("ix_categories_name", table_name="categories")
+    op.drop_table("categories")
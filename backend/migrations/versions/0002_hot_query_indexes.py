@@ -0,0 +1,52 @@
+"""Indexes for the hot list and session queries
+
+- items (status, snooze_until): every list, export, sync and session start
+  filters on status and the snooze window. Queries bind enum values as
+  parameters, so SQLite can only use a leading equality/IN on status plus
+  the snooze range; preferred_store is always tested as
+  ``IS NULL OR = ?`` and is cheaper to filter on the narrowed rows than to
+  index separately.
+- items (snooze_until) WHERE snooze_until IS NOT NULL: partial index for
+  finding the next snooze expiry without touching unsnoozed rows.
+- session_items (session_id, state) and (session_id, item_id): stats,
+  close-policy and check-in lookups within one session.
+- sessions (started_at): newest-first session listing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_items_status_snooze_until", "items", ["status", "snooze_until"])
+    op.create_index(
+        "ix_items_snooze_until_set",
+        "items",
+        ["snooze_until"],
+        sqlite_where=sa.text("snooze_until IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_session_items_session_id_state", "session_items", ["session_id", "state"]
+    )
+    op.create_index(
+        "ix_session_items_session_id_item_id", "session_items", ["session_id", "item_id"]
+    )
+    op.create_index("ix_sessions_started_at", "sessions", ["started_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_started_at", table_name="sessions")
+    op.drop_index("ix_session_items_session_id_item_id", table_name="session_items")
+    op.drop_index("ix_session_items_session_id_state", table_name="session_items")
+    op.drop_index("ix_items_snooze_until_set", table_name="items")
+    op.drop_index("ix_items_status_snooze_until", table_name="items")
@@ -0,0 +1,61 @@
+"""Monotonic change sequence on items for delta sync
+
+Every insert or update of an item stamps ``items.change_seq`` with one more
+than the current maximum, so ``GET /api/v1/items/changes?since=<seq>`` can
+return everything written after a cursor through ``ix_items_change_seq``.
+The stamping lives in triggers so ORM flushes, bulk inserts and set-based
+updates (session close) are all covered. Writers hold the database write
+lock, so sequence numbers increase in commit order. Items are never deleted
+(removal is a status), which keeps the maximum from ever going backwards.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+NEXT_SEQ = "(SELECT COALESCE(MAX(change_seq), 0) + 1 FROM items)"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "items",
+        sa.Column("change_seq", sa.Integer(), server_default="0", nullable=False),
+    )
+    # Existing rows get distinct sequence numbers in insertion order
+    op.execute("UPDATE items SET change_seq = rowid")
+    op.create_index("ix_items_change_seq", "items", ["change_seq"])
+
+    op.execute(
+        f"""
+        CREATE TRIGGER items_change_seq_insert AFTER INSERT ON items
+        BEGIN
+            UPDATE items SET change_seq = {NEXT_SEQ} WHERE rowid = NEW.rowid;
+        END
+        """
+    )
+    # The guard stops the trigger's own update from firing it again
+    op.execute(
+        f"""
+        CREATE TRIGGER items_change_seq_update AFTER UPDATE ON items
+        WHEN NEW.change_seq = OLD.change_seq
+        BEGIN
+            UPDATE items SET change_seq = {NEXT_SEQ} WHERE rowid = NEW.rowid;
+        END
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER items_change_seq_update")
+    op.execute("DROP TRIGGER items_change_seq_insert")
+    op.drop_index("ix_items_change_seq", table_name="items")
+    op.drop_column("items", "change_seq")
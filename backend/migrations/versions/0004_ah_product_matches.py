@@ -0,0 +1,38 @@
+"""Cache of item names resolved to AH products
+
+``ah_product_matches`` maps ``items.name_norm`` to the AH product a sync
+found for it (or to nothing, for names AH does not know), so repeat syncs
+of a familiar list skip the product search. Rows expire through
+``expires_at``; pinned rows are manual overrides without an expiry.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ah_product_matches",
+        sa.Column("name_norm", sa.String(length=255), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=True),
+        sa.Column("title", sa.String(length=255), nullable=True),
+        sa.Column("price", sa.Float(), nullable=True),
+        sa.Column("pinned", sa.Boolean(), nullable=False),
+        sa.Column("matched_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name_norm"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ah_product_matches")
@@ -0,0 +1,48 @@
+"""Background AH sync jobs
+
+``sync_jobs`` records each AH sync with its status, counts and per-item
+results, so a sync runs off the request path and its outcome can be
+polled, also after a restart. ``ix_sync_jobs_status`` serves the startup
+scan for jobs that were queued or running.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_jobs",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("QUEUED", "RUNNING", "DONE", "FAILED", name="syncjobstatus"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("synced", sa.Integer(), nullable=False),
+        sa.Column("not_found", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("results", sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_sync_jobs_status", "sync_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_jobs_status", table_name="sync_jobs")
+    op.drop_table("sync_jobs")
@@ -0,0 +1,63 @@
+"""Per-item AH sync state for incremental syncs
+
+``ah_item_sync`` records, per open item, the AH product and quantity the
+last successful sync put on the AH shopping list, so the next sync only
+pushes new items and quantity increases. When an item leaves the open
+state (checked, removed, session close) a trigger drops its row: once
+bought or removed, the next time it is needed it is pushed in full. The
+trigger covers ORM flushes and the set-based session-close updates alike.
+
+``sync_jobs`` gains ``full_resync`` (ignore the state and push everything)
+and ``unchanged`` (items skipped because AH already had them).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ah_item_sync",
+        sa.Column("item_id", sa.String(length=36), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=True),
+        sa.Column("qty", sa.Float(), nullable=False),
+        sa.Column("synced_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"]),
+        sa.PrimaryKeyConstraint("item_id"),
+    )
+    op.execute(
+        """
+        CREATE TRIGGER items_ah_sync_reset AFTER UPDATE OF status ON items
+        WHEN NEW.status <> 'OPEN'
+        BEGIN
+            DELETE FROM ah_item_sync WHERE item_id = NEW.id;
+        END
+        """
+    )
+
+    op.add_column(
+        "sync_jobs",
+        sa.Column("full_resync", sa.Boolean(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "sync_jobs",
+        sa.Column("unchanged", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sync_jobs", "unchanged")
+    op.drop_column("sync_jobs", "full_resync")
+    op.execute("DROP TRIGGER items_ah_sync_reset")
+    op.drop_table("ah_item_sync")
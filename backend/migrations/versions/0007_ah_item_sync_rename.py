@@ -0,0 +1,35 @@
+"""Reset an item's AH sync state when it is renamed
+
+A renamed item is a different product: its ``ah_item_sync`` row still
+pointed at the old name's AH product, so the next quantity increase went
+to that product. Like leaving the open state, a change of ``name_norm``
+now drops the row, and the next sync pushes the item in full.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TRIGGER items_ah_sync_rename AFTER UPDATE OF name_norm ON items
+        WHEN NEW.name_norm <> OLD.name_norm
+        BEGIN
+            DELETE FROM ah_item_sync WHERE item_id = NEW.id;
+        END
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER items_ah_sync_rename")
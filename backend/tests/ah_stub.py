@@ -0,0 +1,195 @@
+"""Stand-in for the AH mobile API, for sync tests and benchmarks.
+
+Used in-process through httpx.ASGITransport, or served on localhost for the
+app to talk to (with AH_BASE_URL pointing at it):
+
+    python -m tests.ah_stub [--port 8100] [--latency 0.05] [--error-rate 0.01] [--rate-limit 20]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class AHStub:
+    """Fake api.ah.nl taking ``latency`` plus up to ``jitter`` seconds per request.
+
+    Every name is found as product "AH <name>", except ``unknown``;
+    searches for a name in ``slow`` take ``slow_latency`` instead. A
+    shopping-list PATCH containing a product for a name in ``rejected``
+    fails with 400. An accepted PATCH is answered ``patch_reply_delay``
+    seconds after it was applied, with ``patch_reply_status`` if set. The
+    next requests are answered with the status codes in ``faults`` (with
+    ``retry_after`` on 429s); while ``down`` every request gets a 503.
+    Otherwise a random ``error_rate`` share of requests
+    gets a 503, and requests beyond ``rate_limit`` per second get a 429.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0  # 0 disables
+    seed: int | None = None
+    slow: set[str] = field(default_factory=set)
+    slow_latency: float = 5.0
+    unknown: set[str] = field(default_factory=set)
+    rejected: set[str] = field(default_factory=set)
+    patch_reply_delay: float = 0.0
+    patch_reply_status: int | None = None
+    faults: list[int] = field(default_factory=list)
+    retry_after: str | None = None
+    down: bool = False
+    token_lifetime: int = 3600
+    refresh_fails: bool = False
+    calls: Counter = field(default_factory=Counter)
+    shopping_list: list[dict] = field(default_factory=list)
+    product_ids: dict[str, int] = field(default_factory=dict)
+    in_flight: int = 0
+    max_in_flight: int = 0
+    throttled: int = 0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._recent: deque[float] = deque()
+
+    def _over_rate_limit(self) -> bool:
+        if self.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+            return True
+        self._recent.append(now)
+        return False
+
+    def app(self) -> FastAPI:
+        app = FastAPI()
+
+        def fault(status: int) -> JSONResponse:
+            headers = {}
+            if status == 429:
+                headers["Retry-After"] = self.retry_after or "1"
+            return JSONResponse({"error": "fault"}, status_code=status, headers=headers)
+
+        @app.middleware("http")
+        async def track(request: Request, call_next):
+            self.calls[(request.method, request.url.path)] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                if self._over_rate_limit():
+                    self.throttled += 1
+                    return fault(429)
+                query = request.query_params.get("query")
+                latency = self.slow_latency if query in self.slow else self.latency
+                await asyncio.sleep(latency + self._rng.uniform(0, self.jitter))
+                if self.down or self.faults:
+                    return fault(self.faults.pop(0) if self.faults else 503)
+                if self.error_rate and self._rng.random() < self.error_rate:
+                    return fault(503)
+                return await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.post("/mobile-auth/v1/auth/token/anonymous")
+        async def anonymous():
+            return {"access_token": "anon"}
+
+        @app.post("/mobile-auth/v1/auth/token/password")
+        async def login():
+            return self.tokens()
+
+        @app.post("/mobile-auth/v1/auth/token/refresh")
+        async def refresh():
+            if self.refresh_fails:
+                return JSONResponse({"error": "invalid_grant"}, status_code=400)
+            return self.tokens()
+
+        @app.get("/mobile-services/product/search/v2")
+        async def search(query: str):
+            if query in self.unknown:
+                return {"products": []}
+            product_id = self.product_ids.setdefault(query, len(self.product_ids) + 1)
+            return {"products": [{"webshopId": product_id, "title": f"AH {query}"}]}
+
+        @app.patch("/mobile-services/shoppinglist/v2/items")
+        async def add_items(request: Request):
+            body = await request.json()
+            if request.headers.get("authorization") != "Bearer access":
+                return JSONResponse({"error": "unauthorized"}, status_code=401)
+            rejected = {self.product_ids.get(name) for name in self.rejected}
+            if any(item["productId"] in rejected for item in body["items"]):
+                return JSONResponse({"error": "product unavailable"}, status_code=400)
+            self.shopping_list.extend(body["items"])
+            await asyncio.sleep(self.patch_reply_delay)
+            if self.patch_reply_status:
+                return JSONResponse({"error": "fault"}, status_code=self.patch_reply_status)
+            return {}
+
+        return app
+
+    @asynccontextmanager
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> AsyncIterator[str]:
+        """Serve the stub with uvicorn on this event loop; yields its base URL."""
+        server = uvicorn.Server(
+            uvicorn.Config(self.app(), host=host, port=port, lifespan="off", ws="none", log_level="warning")
+        )
+        server.install_signal_handlers = lambda: None
+        task = asyncio.create_task(server.serve())
+        try:
+            while not server.started:
+                await asyncio.sleep(0.01)
+            port = server.servers[0].sockets[0].getsockname()[1]
+            yield f"http://{host}:{port}"
+        finally:
+            server.should_exit = True
+            await task
+
+    def tokens(self) -> dict:
+        return {"access_token": "access", "refresh_token": "refresh", "expires_in": self.token_lifetime}
+
+    @property
+    def logins(self) -> int:
+        return self.calls[("POST", "/mobile-auth/v1/auth/token/password")]
+
+    @property
+    def refreshes(self) -> int:
+        return self.calls[("POST", "/mobile-auth/v1/auth/token/refresh")]
+
+    @property
+    def searches(self) -> int:
+        return self.calls[("GET", "/mobile-services/product/search/v2")]
+
+    @property
+    def patches(self) -> int:
+        return self.calls[("PATCH", "/mobile-services/shoppinglist/v2/items")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--unknown", nargs="*", default=[], help="names that are not found")
+    args = parser.parse_args()
+    stub = AHStub(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        unknown=set(args.unknown),
+    )
+    uvicorn.run(stub.app(), host=args.host, port=args.port)
@@ -0,0 +1,73 @@
+"""Shared test fixtures."""
+import os
+import tempfile
+
+# Point the app at a throwaway database before any app module reads settings
+_tmp_dir = tempfile.mkdtemp(prefix="boodschappen-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/test.db"
+
+import glob
+
+import httpx
+import pytest
+from cryptography.fernet import Fernet
+
+from app.config import get_settings
+from app.database import SessionLocal, engine, run_migrations
+from app.main import app, seed_categories
+from app.services.ah import AHService
+from app.services.versioning import get_list_version
+from tests.ah_stub import AHStub
+
+
+@pytest.fixture
+async def db():
+    """Freshly migrated database with seeded categories, yielding an async session."""
+    await engine.dispose()
+    for path in glob.glob(f"{_tmp_dir}/test.db*"):
+        os.remove(path)
+    await run_migrations()
+    async with SessionLocal() as session:
+        await seed_categories(session)
+        # A new database is a new list; drop anything cached for the old one
+        get_list_version().bump()
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(db):
+    """HTTP client talking to the app in-process."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+
+
+@pytest.fixture
+def stub():
+    """Local stand-in for the AH API."""
+    return AHStub()
+
+
+@pytest.fixture
+async def stub_url(stub):
+    """Base URL of the AH stub served over real TCP on localhost."""
+    async with stub.serve() as url:
+        yield url
+
+
+@pytest.fixture
+async def ah(stub, monkeypatch, tmp_path):
+    """AH service whose HTTP client talks to the stub, with fast retries."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ah_email", "test@example.com")
+    monkeypatch.setattr(settings, "ah_password", "secret")
+    monkeypatch.setattr(settings, "ah_token_key", Fernet.generate_key().decode())
+    monkeypatch.setattr(settings, "ah_token_file", str(tmp_path / "ah_tokens.enc"))
+    monkeypatch.setattr(settings, "ah_rate_limit_per_second", 0.0)
+    monkeypatch.setattr(settings, "ah_retry_base_delay", 0.01)
+    monkeypatch.setattr(settings, "ah_retry_max_delay", 0.05)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app()))
+    service = AHService(client=client)
+    yield service
+    await service.close()
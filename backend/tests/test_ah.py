@@ -0,0 +1,230 @@
+"""Tests for the AH sync service against a local stub."""
+import time
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.services.ah import AHProduct, AHService
+from app.services.ah_matches import AHMatchService
+
+
+def items(*names: str) -> list[dict]:
+    return [{"name": name, "qty": 1} for name in names]
+
+
+class TestSyncItems:
+    """Test concurrent syncing."""
+
+    async def test_results_keep_item_order(self, ah, stub):
+        stub.unknown = {"tandpasta"}
+        results = await ah.sync_items(items("brood", "tandpasta", "melk"))
+
+        assert [(r.item_name, r.status, r.ah_product) for r in results] == [
+            ("brood", "ok", "AH brood"),
+            ("tandpasta", "not_found", None),
+            ("melk", "ok", "AH melk"),
+        ]
+        assert len(stub.shopping_list) == 2
+
+    async def test_concurrency_is_limited(self, ah, stub, monkeypatch):
+        stub.latency = 0.01
+        monkeypatch.setattr(ah.settings, "ah_sync_concurrency", 3)
+        await ah.sync_items(items(*(f"product{i}" for i in range(12))))
+
+        assert stub.max_in_flight == 3
+        assert stub.searches == 12
+
+    async def test_faster_than_serial(self, ah, stub, monkeypatch):
+        stub.latency = 0.05
+        names = items(*(f"product{i}" for i in range(12)))
+
+        monkeypatch.setattr(ah.settings, "ah_sync_concurrency", 1)
+        start = time.perf_counter()
+        await ah.sync_items(names)
+        serial = time.perf_counter() - start
+
+        monkeypatch.setattr(ah.settings, "ah_sync_concurrency", 12)
+        start = time.perf_counter()
+        await ah.sync_items(names)
+        concurrent = time.perf_counter() - start
+
+        # 12 searches and a PATCH in sequence versus one round of each; the
+        # margin leaves room for event loop overhead on a busy test run
+        assert concurrent < serial / 2
+
+    async def test_progress(self, ah, stub):
+        stub.unknown = {"tandpasta"}
+        reported = []
+        await ah.sync_items(items("brood", "tandpasta", "melk"), progress=reported.append)
+
+        assert reported == [1, 3]
+
+    async def test_slow_item_times_out(self, ah, stub, monkeypatch):
+        stub.slow = {"kaas"}
+        monkeypatch.setattr(ah.settings, "ah_item_timeout_seconds", 0.2)
+        results = await ah.sync_items(items("brood", "kaas", "melk"))
+
+        assert [(r.status, r.error) for r in results] == [
+            ("ok", None),
+            ("error", "timeout"),
+            ("ok", None),
+        ]
+
+    async def test_missing_credentials(self, ah, monkeypatch):
+        monkeypatch.setattr(ah.settings, "ah_email", "")
+        with pytest.raises(ValueError):
+            await ah.sync_items(items("brood"))
+
+
+class TestLocalStandIn:
+    """Test syncing against the stub as a stand-in for api.ah.nl."""
+
+    async def test_sync_against_base_url(self, ah, stub, stub_url, monkeypatch):
+        """With ah_base_url pointing at the stand-in, syncs go there over HTTP."""
+        monkeypatch.setattr(get_settings(), "ah_base_url", stub_url)
+        service = AHService()
+        try:
+            results = await service.sync_items(items("melk", "brood"))
+        finally:
+            await service.close()
+
+        assert [r.status for r in results] == ["ok", "ok"]
+        assert len(stub.shopping_list) == 2
+
+    async def test_rate_limited_requests_are_retried(self, ah, stub, monkeypatch):
+        """Requests over the stand-in's rate limit get a 429 and are retried."""
+        monkeypatch.setattr(get_settings(), "ah_retry_max_delay", 1.0)
+        stub.rate_limit = 5
+        stub.retry_after = "0.5"
+
+        results = await ah.sync_items(items("melk", "brood", "kaas", "eieren"))
+
+        assert [r.status for r in results] == ["ok"] * 4
+        assert stub.throttled > 0
+        assert ah.stats["rate_limited"] == stub.throttled
+
+    async def test_error_rate(self, ah, stub):
+        """An error rate of 1 fails every request, after retries."""
+        stub.error_rate = 1.0
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await ah.add_to_shopping_list(1)
+
+        assert ah.stats["retries"] == get_settings().ah_retry_attempts
+        assert stub.shopping_list == []
+
+
+class TestShoppingListBatches:
+    """Test batched shopping-list PATCHes."""
+
+    async def test_one_patch_for_the_whole_list(self, ah, stub):
+        await ah.sync_items([{"name": f"product{i}", "qty": i + 1} for i in range(12)])
+
+        assert stub.patches == 1
+        assert [item["quantity"] for item in stub.shopping_list] == list(range(1, 13))
+
+    async def test_batch_size(self, ah, stub, monkeypatch):
+        monkeypatch.setattr(ah.settings, "ah_patch_batch_size", 5)
+        await ah.sync_items(items(*(f"product{i}" for i in range(12))))
+
+        assert stub.patches == 3
+        assert len(stub.shopping_list) == 12
+
+    async def test_rejected_batch_falls_back_to_single_items(self, ah, stub):
+        stub.rejected = {"kaas"}
+        results = await ah.sync_items(items("brood", "kaas", "melk"))
+
+        assert [(r.item_name, r.status, r.ah_product) for r in results] == [
+            ("brood", "ok", "AH brood"),
+            ("kaas", "error", None),
+            ("melk", "ok", "AH melk"),
+        ]
+        assert "400" in results[1].error
+        # The failed batch, then one PATCH per product
+        assert stub.patches == 4
+        assert len(stub.shopping_list) == 2
+
+    async def test_server_error_after_patch_is_not_resent(self, ah, stub):
+        """A batch that may have been applied is not sent again."""
+        stub.patch_reply_status = 503
+        results = await ah.sync_items(items("brood", "kaas", "melk"))
+
+        assert [r.status for r in results] == ["error"] * 3
+        assert "503" in results[0].error
+        assert stub.patches == 1
+        assert len(stub.shopping_list) == 3
+
+    async def test_timed_out_patch_is_not_resent(self, ah, stub, monkeypatch):
+        """A PATCH answered after the timeout fails its items without duplicates."""
+        monkeypatch.setattr(get_settings(), "ah_item_timeout_seconds", 0.1)
+        stub.patch_reply_delay = 0.5
+        results = await ah.sync_items(items("brood", "kaas", "melk"))
+
+        assert [(r.status, r.error) for r in results] == [("error", "timeout")] * 3
+        assert stub.patches == 1
+        assert len(stub.shopping_list) == 3
+
+
+class TestMatchCache:
+    """Test the persistent name-to-product cache."""
+
+    async def test_repeat_sync_does_not_search(self, ah, stub, db):
+        stub.unknown = {"tandpasta"}
+        first = await ah.sync_items(items("Brood", "tandpasta", "melk"), AHMatchService(db))
+        assert stub.searches == 3
+
+        second = await ah.sync_items(items("brood", "tandpasta", "melk"), AHMatchService(db))
+        assert stub.searches == 3
+        assert [(r.status, r.ah_product) for r in second] == [
+            (r.status, r.ah_product) for r in first
+        ]
+        assert stub.patches == 2
+
+    async def test_same_name_is_searched_once(self, ah, stub, db):
+        await ah.sync_items(items("Melk", "melk "), AHMatchService(db))
+        assert stub.searches == 1
+        assert len(stub.shopping_list) == 2
+
+    async def test_expired_matches_are_searched_again(self, ah, stub, db, monkeypatch):
+        stub.unknown = {"tandpasta"}
+        monkeypatch.setattr(ah.settings, "ah_match_not_found_ttl_hours", 0)
+        await ah.sync_items(items("brood", "tandpasta"), AHMatchService(db))
+        await ah.sync_items(items("brood", "tandpasta"), AHMatchService(db))
+
+        # Only the miss expired
+        assert stub.searches == 3
+
+    async def test_errors_are_not_cached(self, ah, stub, db, monkeypatch):
+        stub.slow = {"kaas"}
+        monkeypatch.setattr(ah.settings, "ah_item_timeout_seconds", 0.2)
+        await ah.sync_items(items("kaas"), AHMatchService(db))
+        assert await AHMatchService(db).lookup(["kaas"]) == {}
+
+    async def test_pinned_match_wins(self, ah, stub, db):
+        matches = AHMatchService(db)
+        await matches.pin("melk", AHProduct(product_id=999, title="AH Halfvolle melk"))
+        results = await ah.sync_items(items("Melk"), matches)
+
+        assert stub.searches == 0
+        assert results[0].ah_product == "AH Halfvolle melk"
+        assert stub.shopping_list[0]["productId"] == 999
+
+        # Search results never replace a pin
+        await matches.remember({"melk": AHProduct(product_id=1, title="AH Melk")})
+        assert (await matches.lookup(["melk"]))["melk"].product_id == 999
+
+    async def test_match_endpoints(self, client):
+        response = await client.put(
+            "/api/v1/sync/ah/matches/Halfvolle Melk",
+            json={"product_id": 42, "title": "AH Halfvolle melk"},
+        )
+        assert response.status_code == 200
+        assert response.json()["name_norm"] == "halfvolle melk"
+        assert response.json()["pinned"] is True
+
+        matches = (await client.get("/api/v1/sync/ah/matches")).json()
+        assert [m["product_id"] for m in matches] == [42]
+
+        assert (await client.delete("/api/v1/sync/ah/matches/halfvolle melk")).status_code == 200
+        assert (await client.delete("/api/v1/sync/ah/matches/halfvolle melk")).status_code == 404
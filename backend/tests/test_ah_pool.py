@@ -0,0 +1,95 @@
+"""Tests for the AH client's connection pool and its lifecycle."""
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.main import app
+from app.services import ah as ah_module
+from app.services.ah import AHService, create_ah_client, get_ah_service
+
+
+@pytest.fixture
+async def pooled(monkeypatch):
+    """AH service with the production client, without rate limiting."""
+    monkeypatch.setattr(get_settings(), "ah_rate_limit_per_second", 0.0)
+    service = AHService()
+    yield service
+    await service.close()
+
+
+class TestClientFactory:
+    """Test the AH HTTP client configuration."""
+
+    async def test_timeouts_from_settings(self, monkeypatch):
+        """Connect and read timeouts are configured separately."""
+        settings = get_settings()
+        monkeypatch.setattr(settings, "ah_http_connect_timeout_seconds", 2.0)
+        monkeypatch.setattr(settings, "ah_http_read_timeout_seconds", 12.0)
+        monkeypatch.setattr(settings, "ah_http_pool_timeout_seconds", 3.0)
+
+        client = create_ah_client(settings)
+        try:
+            assert client.timeout.connect == 2.0
+            assert client.timeout.read == 12.0
+            assert client.timeout.pool == 3.0
+        finally:
+            await client.aclose()
+
+    async def test_http2_optional(self, monkeypatch):
+        """HTTP/2 is only negotiated when enabled."""
+        settings = get_settings()
+        for enabled in (False, True):
+            monkeypatch.setattr(settings, "ah_http2", enabled)
+            client = create_ah_client(settings)
+            try:
+                assert client._transport._pool._http2 is enabled
+            finally:
+                await client.aclose()
+
+
+class TestConnectionReuse:
+    """Test that requests share pooled connections."""
+
+    async def test_sequential_requests_reuse_connection(self, pooled, stub_url):
+        """Back-to-back requests go over one kept-alive connection."""
+        for _ in range(10):
+            response = await pooled._request("POST", f"{stub_url}/mobile-auth/v1/auth/token/anonymous")
+            assert response.status_code == 200
+
+        stats = pooled.pool_stats()
+        assert stats["connections_opened"] == 1
+        assert stats["open_connections"] == 1
+        assert stats["idle_connections"] == 1
+
+    async def test_concurrency_bounded_by_pool(self, pooled, stub, stub_url, monkeypatch):
+        """Concurrent requests open at most max_connections connections."""
+        stub.latency = 0.05
+        monkeypatch.setattr(get_settings(), "ah_http_max_connections", 2)
+        await pooled._client.aclose()
+        pooled._client = create_ah_client(get_settings())
+
+        await asyncio.gather(*[
+            pooled._request("POST", f"{stub_url}/mobile-auth/v1/auth/token/anonymous")
+            for _ in range(8)
+        ])
+
+        assert stub.max_in_flight == 2
+        assert pooled.pool_stats()["connections_opened"] == 2
+
+    async def test_status_includes_pool(self, pooled):
+        """The health status reports the pool."""
+        assert "connections_opened" in pooled.status()["pool"]
+
+
+class TestLifecycle:
+    """Test that the app owns the AH client's lifetime."""
+
+    async def test_lifespan_closes_client(self, db):
+        """Shutdown closes the shared client and its connections."""
+        async with app.router.lifespan_context(app):
+            service = get_ah_service()
+            assert not service._client.is_closed
+
+        assert service._client.is_closed
+        assert ah_module._ah_service is None
@@ -0,0 +1,121 @@
+"""Tests for background prefetching of AH product matches."""
+import pytest
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services import ah_prefetch
+from app.services.ah_matches import AHMatchService
+from app.services.ah_prefetch import MatchPrefetcher
+from app.services.sync_jobs import get_items_to_sync
+
+
+async def cached_matches(*names: str) -> dict[str, str | None]:
+    """Cached titles by name, read in a new session."""
+    async with SessionLocal() as session:
+        matches = await AHMatchService(session).lookup(names)
+    return {name: match.title for name, match in matches.items()}
+
+
+@pytest.fixture
+async def prefetcher(ah, db, monkeypatch):
+    """Running prefetcher using the stubbed AH service, installed as the singleton."""
+    prefetcher = MatchPrefetcher(ah_service=ah)
+    monkeypatch.setattr(ah_prefetch, "_match_prefetcher", prefetcher)
+    await prefetcher.start()
+    yield prefetcher
+    await prefetcher.stop()
+
+
+class TestPrefetch:
+    """Test looking up products as items are added."""
+
+    async def test_added_items_are_resolved(self, client, prefetcher, stub):
+        """Products for added items are cached without a sync."""
+        await client.post("/api/v1/items:add", json={"text": "melk, 2 brood"})
+        await prefetcher.idle()
+
+        assert await cached_matches("melk", "brood") == {"melk": "AH melk", "brood": "AH brood"}
+        assert stub.searches == 2
+
+    async def test_sync_after_prefetch_only_adds(self, client, prefetcher, ah, stub):
+        """A sync of prefetched items needs no searches, just the PATCH."""
+        await client.post("/api/v1/items:add", json={"text": "melk, brood, kaas"})
+        await prefetcher.idle()
+        searches = stub.searches
+
+        async with SessionLocal() as session:
+            items = await get_items_to_sync(session)
+            results = await ah.sync_items(items, AHMatchService(session))
+
+        assert [r.status for r in results] == ["ok"] * 3
+        assert stub.searches == searches
+        assert stub.patches == 1
+
+    async def test_renamed_item_is_resolved(self, client, prefetcher, stub):
+        """Renaming an item looks up the new name."""
+        response = await client.post("/api/v1/items:add", json={"text": "melk"})
+        item_id = response.json()["items"][0]["id"]
+        await prefetcher.idle()
+
+        await client.patch(f"/api/v1/items/{item_id}", json={"name_raw": "Halfvolle melk"})
+        await prefetcher.idle()
+
+        assert stub.searches == 2
+        assert stub.product_ids.keys() == {"melk", "Halfvolle melk"}
+
+    async def test_cached_names_are_not_searched(self, client, prefetcher, stub):
+        """Names with a cached match are skipped."""
+        await client.post("/api/v1/items:add", json={"text": "melk"})
+        await prefetcher.idle()
+        await client.post("/api/v1/items:add", json={"text": "melk, melk"})
+        await prefetcher.idle()
+
+        assert stub.searches == 1
+        assert prefetcher.stats["cached"] == 1
+
+    async def test_queued_names_are_deduplicated(self, prefetcher, stub):
+        """A name already waiting is not queued again."""
+        stub.latency = 0.05
+        prefetcher.queue({"melk": "melk", "brood": "brood", "kaas": "kaas"})
+        prefetcher.queue({"kaas": "Kaas"})
+        await prefetcher.idle()
+
+        assert prefetcher.stats["queued"] == 3
+        assert stub.searches == 3
+
+    async def test_concurrency_is_limited(self, prefetcher, stub):
+        """At most ah_prefetch_concurrency searches run at once."""
+        stub.latency = 0.02
+        prefetcher.queue({f"product{i}": f"product{i}" for i in range(10)})
+        await prefetcher.idle()
+
+        assert stub.searches == 10
+        assert stub.max_in_flight == get_settings().ah_prefetch_concurrency
+
+    async def test_full_queue_drops_names(self, ah, db, monkeypatch):
+        """Names beyond the queue size are left to the sync."""
+        monkeypatch.setattr(get_settings(), "ah_prefetch_queue_size", 2)
+        prefetcher = MatchPrefetcher(ah_service=ah)
+        await prefetcher.start()
+        try:
+            prefetcher.queue({"melk": "melk", "brood": "brood", "kaas": "kaas"})
+            assert prefetcher.stats["dropped"] == 1
+            await prefetcher.idle()
+        finally:
+            await prefetcher.stop()
+
+    async def test_errors_are_not_cached(self, prefetcher, stub):
+        """A failed search leaves the name for the sync."""
+        stub.down = True
+        prefetcher.queue({"melk": "melk"})
+        await prefetcher.idle()
+
+        assert prefetcher.stats["failed"] == 1
+        assert await cached_matches("melk") == {}
+
+    async def test_not_started_ignores_names(self, ah):
+        """A prefetcher that isn't running (the default) queues nothing."""
+        prefetcher = MatchPrefetcher(ah_service=ah)
+        prefetcher.queue({"melk": "melk"})
+
+        assert prefetcher.status() == {**prefetcher.status(), "running": False, "queued": 0}
@@ -0,0 +1,107 @@
+"""Tests for AH token refresh and persistence."""
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.config import Settings
+from app.services.ah import AHService
+from app.services.ah_tokens import AHTokens, TokenStore
+
+
+def restarted(stub) -> AHService:
+    """A new AH service, as after a restart, using the stored tokens."""
+    return AHService(client=httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app())))
+
+
+def expiring_in(seconds: int) -> AHTokens:
+    return AHTokens(
+        access_token="access",
+        refresh_token="refresh",
+        expires_at=datetime.utcnow() + timedelta(seconds=seconds),
+    )
+
+
+class TestSingleFlight:
+    """Concurrent callers share one login or refresh."""
+
+    async def test_one_login_for_concurrent_searches(self, ah, stub):
+        stub.latency = 0.02
+        await asyncio.gather(*(ah.search_product(f"product{i}") for i in range(20)))
+
+        assert stub.logins == 1
+        assert stub.searches == 20
+
+    async def test_one_refresh_for_concurrent_searches(self, ah, stub):
+        ah._store_tokens(expiring_in(-10))
+        await asyncio.gather(*(ah.search_product(f"product{i}") for i in range(20)))
+
+        assert stub.refreshes == 1
+        assert stub.logins == 0
+
+    async def test_refresh_before_expiry(self, ah, stub):
+        ah._store_tokens(expiring_in(60))
+        await ah.search_product("melk")
+        assert stub.refreshes == 1
+
+        # Fresh token: no further refreshes
+        await ah.search_product("brood")
+        assert stub.refreshes == 1
+
+    async def test_failed_early_refresh_keeps_valid_token(self, ah, stub):
+        stub.refresh_fails = True
+        ah._store_tokens(expiring_in(60))
+        assert await ah.search_product("melk")
+        assert stub.logins == 0
+
+    async def test_failed_refresh_of_expired_token_logs_in(self, ah, stub):
+        stub.refresh_fails = True
+        ah._store_tokens(expiring_in(-10))
+        assert await ah.search_product("melk")
+        assert stub.logins == 1
+
+
+class TestTokenPersistence:
+    """Tokens survive a restart, encrypted."""
+
+    async def test_restart_reuses_tokens(self, ah, stub):
+        await ah.search_product("melk")
+        assert stub.logins == 1
+
+        service = restarted(stub)
+        try:
+            await service.search_product("brood")
+        finally:
+            await service.close()
+        assert stub.logins == 1
+
+    async def test_restart_refreshes_expired_tokens(self, ah, stub):
+        ah._store_tokens(expiring_in(-10))
+        service = restarted(stub)
+        try:
+            await service.search_product("brood")
+        finally:
+            await service.close()
+        assert (stub.refreshes, stub.logins) == (1, 0)
+
+    def test_file_is_encrypted(self, tmp_path):
+        settings = Settings(
+            ah_email="a@example.com", ah_password="secret", ah_token_file=str(tmp_path / "t")
+        )
+        TokenStore.from_settings(settings).save(expiring_in(3600))
+
+        content = (tmp_path / "t").read_bytes()
+        assert b"refresh" not in content
+        assert (tmp_path / "t").stat().st_mode & 0o077 == 0
+        assert TokenStore.from_settings(settings).load().refresh_token == "refresh"
+
+    def test_other_key_cannot_read(self, tmp_path):
+        path = str(tmp_path / "t")
+        store = TokenStore.from_settings(Settings(ah_password="secret", ah_token_file=path))
+        store.save(expiring_in(3600))
+
+        other = TokenStore.from_settings(Settings(ah_password="changed", ah_token_file=path))
+        assert other.load() is None
+
+    def test_no_key_material(self):
+        assert TokenStore.from_settings(Settings(ah_password="", ah_token_key="")) is None
@@ -0,0 +1,57 @@
+"""Tests for the category registry."""
+from sqlalchemy import event
+
+from app.database import engine
+from app.models.category import DEFAULT_CATEGORIES
+from app.services.categories import get_category_registry
+
+
+class TestCategoryRegistry:
+    """Test lookups and ordering."""
+
+    async def test_loaded_with_seed(self, db):
+        registry = get_category_registry()
+        assert [category.name for category in registry.all()] == [
+            category["name"] for category in sorted(DEFAULT_CATEGORIES, key=lambda c: c["sort_order"])
+        ]
+        dairy = registry.by_name("dairy")
+        assert registry.get(dairy.id) == dairy
+        assert registry.get(None) is None
+        assert registry.by_name("unknown") is None
+
+    async def test_items_sorted_by_category_then_name(self, client):
+        await client.post("/api/v1/items:add", json={"text": "zeep", "category": "household"})
+        await client.post("/api/v1/items:add", json={"text": "appel, banaan", "category": "produce"})
+        await client.post("/api/v1/items:add", json={"text": "aaa"})
+        await client.post("/api/v1/items:add", json={"text": "kaas", "category": "dairy"})
+
+        names = [item["name_raw"] for item in (await client.get("/api/v1/items")).json()]
+        assert names == ["appel", "banaan", "kaas", "zeep", "aaa"]
+
+        text = (await client.get("/api/v1/export/all")).text
+        assert text.index("## Groente & Fruit") < text.index("## Zuivel") < text.index("## Overig")
+
+
+class TestNoCategoryQueries:
+    """Add, list and export paths never touch the categories table."""
+
+    async def test_hot_paths(self, client):
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            added = (await client.post("/api/v1/items:add", json={"text": "kaas", "category": "dairy"})).json()
+            listed = (await client.get("/api/v1/items")).json()
+            categories = (await client.get("/api/v1/categories")).json()
+            await client.get("/api/v1/export/ah?format=json")
+            patched = await client.patch(
+                f"/api/v1/items/{added['items'][0]['id']}",
+                json={"category_id": get_category_registry().by_name("produce").id},
+            )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        assert listed[0]["category"]["name"] == "dairy"
+        assert patched.json()["category"]["name"] == "produce"
+        assert len(categories) == len(DEFAULT_CATEGORIES)
+        assert not [statement for statement in statements if "categories" in statement]
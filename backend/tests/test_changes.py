@@ -0,0 +1,87 @@
+"""Tests for the delta sync endpoint."""
+from sqlalchemy import text
+
+from app.database import engine
+
+
+async def changes(client, since: int = 0, **params) -> dict:
+    response = await client.get("/api/v1/items/changes", params={"since": since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestChanges:
+    """Test GET /api/v1/items/changes."""
+
+    async def test_initial_sync_returns_everything(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        result = await changes(client)
+        assert sorted(item["name_raw"] for item in result["items"]) == ["brood", "melk"]
+        assert result["removed"] == []
+        assert result["cursor"] > 0
+        assert result["has_more"] is False
+
+    async def test_nothing_changed(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+        cursor = (await changes(client))["cursor"]
+        result = await changes(client, cursor)
+        assert result == {"cursor": cursor, "items": [], "removed": [], "has_more": False}
+
+    async def test_only_changed_items_are_returned(self, client):
+        added = (await client.post("/api/v1/items:add", json={"text": "brood, melk, kaas"})).json()
+        cursor = (await changes(client))["cursor"]
+
+        melk = next(item for item in added["items"] if item["name"] == "melk")
+        await client.post(f"/api/v1/items/{melk['id']}:check")
+        await client.post("/api/v1/items:add", json={"text": "eieren"})
+
+        result = await changes(client, cursor)
+        assert sorted(item["name_raw"] for item in result["items"]) == ["eieren", "melk"]
+        assert result["cursor"] > cursor
+
+    async def test_removed_items_are_tombstones(self, client):
+        added = (await client.post("/api/v1/items:add", json={"text": "brood, melk"})).json()
+        cursor = (await changes(client))["cursor"]
+
+        brood_id = added["items"][0]["id"]
+        await client.delete(f"/api/v1/items/{brood_id}")
+
+        result = await changes(client, cursor)
+        assert result["items"] == []
+        assert result["removed"] == [brood_id]
+        # A fresh client never sees tombstones
+        assert (await changes(client))["removed"] == []
+
+    async def test_set_based_session_updates_are_tracked(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        session = (await client.post("/api/v1/sessions:start", json={"store": "AH"})).json()
+        cursor = (await changes(client))["cursor"]
+
+        await client.post(f"/api/v1/sessions/{session['id']}:close", json={"policy": "snooze_leftovers"})
+
+        result = await changes(client, cursor)
+        assert len(result["items"]) == 2
+        assert all(item["snooze_until"] for item in result["items"])
+
+    async def test_paging(self, client):
+        await client.post("/api/v1/items:add", json={"text": ", ".join(f"item{i}" for i in range(5))})
+
+        seen = []
+        cursor = 0
+        while True:
+            result = await changes(client, cursor, limit=2)
+            seen.extend(item["name_raw"] for item in result["items"])
+            cursor = result["cursor"]
+            if not result["has_more"]:
+                break
+        assert sorted(seen) == [f"item{i}" for i in range(5)]
+
+    async def test_sequence_is_monotonic(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        added = (await client.post("/api/v1/items:add", json={"text": "brood"})).json()
+
+        async with engine.connect() as conn:
+            rows = (await conn.execute(text("SELECT id, change_seq FROM items ORDER BY change_seq"))).all()
+        assert len({seq for _, seq in rows}) == len(rows)
+        # The item touched last carries the highest sequence number
+        assert rows[-1].id == added["items"][0]["id"]
@@ -0,0 +1,53 @@
+"""Tests for the SQLite engine profile."""
+import asyncio
+
+from sqlalchemy import text
+
+from app.database import engine
+
+
+class TestEngineProfile:
+    """Test connection pragmas."""
+
+    async def test_pragmas_applied(self, db):
+        async with engine.connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+            busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+            cache_size = (await conn.execute(text("PRAGMA cache_size"))).scalar()
+
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout == 5000
+        assert cache_size == -16 * 1024
+
+
+class TestConcurrentWriters:
+    """Stress concurrent writes the way several phones do while shopping."""
+
+    async def test_concurrent_checks_while_closing(self, client):
+        text_input = "\n".join(f"product{i}" for i in range(200))
+        await client.post("/api/v1/items:add", json={"text": text_input})
+        session = (await client.post("/api/v1/sessions:start", json={})).json()
+        items = (await client.get("/api/v1/items")).json()
+
+        async def tap(item_id: str):
+            await client.post(f"/api/v1/sessions/{session['id']}/items/{item_id}:check")
+            await client.post(f"/api/v1/items/{item_id}:uncheck")
+            return await client.post(f"/api/v1/items/{item_id}:check")
+
+        async def close():
+            await asyncio.sleep(0.01)
+            return await client.post(
+                f"/api/v1/sessions/{session['id']}:close",
+                json={"policy": "snooze_leftovers"},
+            )
+
+        responses = await asyncio.gather(
+            *(tap(item["id"]) for item in items[:100]),
+            close(),
+            *(client.post("/api/v1/items:add", json={"text": f"extra{i}"}) for i in range(20)),
+        )
+
+        assert [r.status_code for r in responses] == [200] * len(responses)
+        assert len((await client.get("/api/v1/items?status=checked&include_snoozed=true")).json()) == 100
@@ -0,0 +1,95 @@
+"""Tests for ETag / If-None-Match support on list reads."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.routers.conditional import etag_matches
+from app.services.versioning import get_list_version
+
+LIST_URLS = ["/api/v1/items", "/api/v1/categories", "/api/v1/export/ah?simple=true"]
+
+
+class TestEtagMatching:
+    """Test If-None-Match parsing."""
+
+    def test_weak_and_strong_match(self):
+        assert etag_matches('W/"abc-1"', 'W/"abc-1"')
+        assert etag_matches('"abc-1"', 'W/"abc-1"')
+        assert etag_matches('"x", W/"abc-1"', 'W/"abc-1"')
+        assert etag_matches("*", 'W/"abc-1"')
+        assert not etag_matches('W/"abc-2"', 'W/"abc-1"')
+        assert not etag_matches(None, 'W/"abc-1"')
+
+
+class TestConditionalRequests:
+    """Test conditional GETs on list endpoints."""
+
+    @pytest.mark.parametrize("url", LIST_URLS)
+    async def test_unchanged_list_is_not_modified(self, client, url):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        first = await client.get(url)
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            second = await client.get(url, headers={"If-None-Match": etag})
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert statements == []
+
+    async def test_writes_change_the_etag(self, client):
+        added = (await client.post("/api/v1/items:add", json={"text": "brood"})).json()
+        etag = (await client.get("/api/v1/items")).headers["etag"]
+
+        await client.post(f"/api/v1/items/{added['items'][0]['id']}:check")
+
+        response = await client.get("/api/v1/items", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()[0]["status"] == "checked"
+
+    async def test_snooze_expiry_changes_the_etag(self, client):
+        added = (await client.post("/api/v1/items:add", json={"text": "brood"})).json()
+        snooze_until = datetime.utcnow() + timedelta(milliseconds=300)
+        await client.patch(
+            f"/api/v1/items/{added['items'][0]['id']}",
+            json={"snooze_until": snooze_until.isoformat()},
+        )
+        hidden = await client.get("/api/v1/items")
+        assert hidden.json() == []
+
+        await asyncio.sleep(0.4)
+
+        response = await client.get("/api/v1/items", headers={"If-None-Match": hidden.headers["etag"]})
+        assert response.status_code == 200
+        assert [item["name_norm"] for item in response.json()] == ["brood"]
+
+
+class TestListVersion:
+    """Test the version handed to readers."""
+
+    async def test_write_during_lookup_keeps_older_version(self, db, monkeypatch):
+        """A write committed while the snapshot starts doesn't tag it newer."""
+        list_version = get_list_version()
+        list_version.bump()
+        before = list_version.counter
+        scalar = db.scalar
+
+        async def scalar_with_concurrent_write(*args, **kwargs):
+            result = await scalar(*args, **kwargs)
+            list_version.bump()
+            return result
+
+        monkeypatch.setattr(db, "scalar", scalar_with_concurrent_write)
+
+        assert await list_version.current(db) == before
+        assert list_version.snooze_deadline is None
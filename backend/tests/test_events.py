@@ -0,0 +1,106 @@
+"""Tests for the change event hub and SSE stream."""
+import asyncio
+import json
+
+from app.models.item import ItemStatus
+from app.routers.items import stream_events
+from app.services.events import EventHub, ItemChange, get_event_hub
+
+
+def change(item_id: str, status: ItemStatus = ItemStatus.OPEN) -> ItemChange:
+    return ItemChange(id=item_id, status=status, qty=1.0)
+
+
+def parse(frame: str) -> dict:
+    data = next(line for line in frame.splitlines() if line.startswith("data: "))
+    return json.loads(data.removeprefix("data: "))
+
+
+class TestEventHub:
+    """Test fan-out and buffering."""
+
+    async def test_every_subscriber_gets_the_event(self):
+        hub = EventHub(buffer_size=8)
+        subscribers = [hub.subscribe() for _ in range(300)]
+        hub.publish(1, [change("a", ItemStatus.CHECKED)])
+
+        for subscriber in subscribers:
+            event = await subscriber.next_event(timeout=0.1)
+            assert event.type == "item"
+            assert event.data == {"id": "a", "status": "checked", "qty": 1.0}
+
+    async def test_slow_subscriber_gets_resync(self):
+        hub = EventHub(buffer_size=4)
+        subscriber = hub.subscribe()
+        for version in range(1, 10):
+            hub.publish(version, [change(f"item{version}")])
+
+        events = []
+        while (event := await subscriber.next_event(timeout=0.01)) is not None:
+            events.append(event)
+        # The backlog was collapsed into a resync, followed by newer events
+        assert events[0].type == "resync"
+        assert subscriber.queue.maxsize == 4
+        assert len(events) <= 4
+        assert events[-1].version == 9
+
+    async def test_bulk_changes_become_resync(self):
+        hub = EventHub(buffer_size=8)
+        subscriber = hub.subscribe()
+        hub.publish(1, [change(f"item{i}") for i in range(EventHub.MAX_ITEM_EVENTS + 1)])
+        hub.publish(2, None)
+
+        assert (await subscriber.next_event(timeout=0.1)).type == "resync"
+        assert (await subscriber.next_event(timeout=0.1)).type == "resync"
+
+    async def test_unsubscribe(self):
+        hub = EventHub()
+        subscriber = hub.subscribe()
+        hub.unsubscribe(subscriber)
+        hub.publish(1, [change("a")])
+        assert hub.subscriber_count == 0
+        assert subscriber.queue.empty()
+
+
+class TestStream:
+    """Test the SSE stream against real writes."""
+
+    async def test_writes_are_streamed(self, client):
+        stream = stream_events(heartbeat_seconds=5)
+        assert parse(await anext(stream))["type"] == "ready"
+
+        added = (await client.post("/api/v1/items:add", json={"text": "brood"})).json()
+        item_id = added["items"][0]["id"]
+        event = parse(await anext(stream))
+        assert event["type"] == "item"
+        assert event["id"] == item_id
+        assert event["status"] == "open"
+
+        await client.post(f"/api/v1/items/{item_id}:check")
+        event = parse(await anext(stream))
+        assert (event["id"], event["status"]) == (item_id, "checked")
+
+        await stream.aclose()
+        assert get_event_hub().subscriber_count == 0
+
+    async def test_session_check_and_close_are_streamed(self, client):
+        added = (await client.post("/api/v1/items:add", json={"text": "brood, melk"})).json()
+        session = (await client.post("/api/v1/sessions:start", json={"store": "AH"})).json()
+
+        stream = stream_events(heartbeat_seconds=5)
+        await anext(stream)
+
+        item_id = added["items"][0]["id"]
+        await client.post(f"/api/v1/sessions/{session['id']}/items/{item_id}:check")
+        event = parse(await anext(stream))
+        assert (event["id"], event["status"]) == (item_id, "checked")
+
+        await client.post(f"/api/v1/sessions/{session['id']}:close", json={"policy": "keep_open"})
+        assert parse(await anext(stream))["type"] == "resync"
+        await stream.aclose()
+
+    async def test_heartbeat_when_idle(self, db):
+        stream = stream_events(heartbeat_seconds=0.01)
+        await anext(stream)
+        assert await asyncio.wait_for(anext(stream), 1) == ": heartbeat\n\n"
+        await stream.aclose()
@@ -0,0 +1,117 @@
+"""Tests for the streaming bulk import."""
+import json
+
+from app.config import get_settings
+from app.services.importer import ImportFormat, ImportReader
+from app.services.items import ItemService
+
+
+async def chunked(data: bytes, size: int):
+    """Upload body in small chunks, splitting lines and characters."""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def read_all(reader: ImportReader, data: bytes, size: int = 3) -> list[tuple]:
+    return [(item.name, item.qty, item.unit) async for item in reader.items(chunked(data, size))]
+
+
+class TestImportReader:
+    """Test incremental decoding."""
+
+    async def test_text_lines_across_chunks(self):
+        data = "2x brood, melk\r\ncrème fraîche\n500g gehakt".encode()
+        items = await read_all(ImportReader(ImportFormat.TEXT), data)
+        assert items == [
+            ("brood", 2.0, None),
+            ("melk", 1.0, None),
+            ("crème fraîche", 1.0, None),
+            ("gehakt", 500.0, "g"),
+        ]
+
+    async def test_csv_with_header(self):
+        data = b'name,qty,unit\nmelk,2,liter\n"kaas, jong",1,\n,3,\n'
+        reader = ImportReader(ImportFormat.CSV)
+        assert await read_all(reader, data) == [("melk", 2.0, "L"), ("kaas, jong", 1.0, None)]
+        assert reader.skipped == 1
+
+    async def test_csv_without_header(self):
+        data = b"2x brood\nmelk 2L,ignored\n"
+        assert await read_all(ImportReader(ImportFormat.CSV), data) == [
+            ("brood", 2.0, None),
+            ("melk", 2.0, "L"),
+        ]
+
+    async def test_ndjson(self):
+        lines = ['"2x brood"', '{"text": "melk, kaas"}', '{"name": "eieren", "qty": 12}', "{broken"]
+        reader = ImportReader(ImportFormat.NDJSON)
+        assert await read_all(reader, "\n".join(lines).encode()) == [
+            ("brood", 2.0, None),
+            ("melk", 1.0, None),
+            ("kaas", 1.0, None),
+            ("eieren", 12.0, None),
+        ]
+        assert reader.skipped == 1
+
+    async def test_oversized_line_is_skipped(self, monkeypatch):
+        monkeypatch.setattr("app.services.importer.MAX_LINE_LENGTH", 10)
+        reader = ImportReader(ImportFormat.TEXT)
+        data = b"brood\n" + b"x" * 50 + b"\nmelk\n"
+        assert await read_all(reader, data, size=4) == [("brood", 1.0, None), ("melk", 1.0, None)]
+        assert reader.skipped == 1
+
+
+class TestImportEndpoint:
+    """Test POST /api/v1/items:import."""
+
+    async def test_batches_are_bounded(self, client, monkeypatch):
+        monkeypatch.setattr(get_settings(), "import_batch_size", 40)
+        batch_sizes = []
+        merge = ItemService._merge_parsed_items
+
+        async def spy(self, parsed_items, *args):
+            batch_sizes.append(len(parsed_items))
+            return await merge(self, parsed_items, *args)
+
+        monkeypatch.setattr(ItemService, "_merge_parsed_items", spy)
+
+        body = "\n".join(f"product{i}" for i in range(100)).encode()
+        response = await client.post(
+            "/api/v1/items:import",
+            content=chunked(body, 64),
+            headers={"Content-Type": "text/plain"},
+        )
+        result = response.json()
+
+        assert response.status_code == 200
+        assert batch_sizes == [40, 40, 20]
+        assert [batch["items"] for batch in result["batches"]] == [40, 40, 20]
+        assert (result["count"], result["new"], result["merged"]) == (100, 100, 0)
+        assert len((await client.get("/api/v1/items")).json()) == 100
+
+    async def test_merges_across_batches_and_existing(self, client, monkeypatch):
+        monkeypatch.setattr(get_settings(), "import_batch_size", 2)
+        await client.post("/api/v1/items:add", json={"text": "melk"})
+
+        lines = [json.dumps({"name": name}) for name in ["brood", "melk", "kaas", "brood"]]
+        response = await client.post(
+            "/api/v1/items:import?category=dairy",
+            content="\n".join(lines).encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        result = response.json()
+
+        assert (result["count"], result["new"], result["merged"]) == (4, 2, 2)
+        items = {item["name_raw"]: item for item in (await client.get("/api/v1/items")).json()}
+        assert items["brood"]["qty"] == 2.0
+        assert items["kaas"]["category"]["name"] == "dairy"
+
+    async def test_format_parameter_overrides_content_type(self, client):
+        response = await client.post(
+            "/api/v1/items:import?format=csv",
+            content=b"name,qty\nappels,6\n",
+            headers={"Content-Type": "text/plain"},
+        )
+        assert response.json()["count"] == 1
+        items = (await client.get("/api/v1/items")).json()
+        assert (items[0]["name_raw"], items[0]["qty"]) == ("appels", 6.0)
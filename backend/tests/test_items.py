@@ -0,0 +1,95 @@
+"""Tests for the items API and service."""
+from app.models.item import ItemStatus
+from app.schemas.item import ItemsAddRequest
+from app.services.categories import get_category_registry
+from app.services.items import ItemService
+
+
+class TestItemService:
+    """Test item business logic."""
+
+    async def test_add_and_merge(self, db):
+        service = ItemService(db)
+        await service.add_items(ItemsAddRequest(text="melk, brood"))
+        result = await service.add_items(ItemsAddRequest(text="2x melk"))
+
+        assert result.count == 1
+        assert result.items[0].is_new is False
+        assert result.items[0].qty == 3.0
+
+    async def test_duplicates_in_request_are_combined(self, db):
+        service = ItemService(db)
+        result = await service.add_items(ItemsAddRequest(text="melk, 2 melk, brood"))
+
+        assert result.count == 2
+        assert [(item.name, item.qty, item.is_new) for item in result.items] == [
+            ("melk", 3.0, True),
+            ("brood", 1.0, True),
+        ]
+        items = await service.get_items()
+        assert sorted((item.name_norm, item.qty) for item in items) == [
+            ("brood", 1.0),
+            ("melk", 3.0),
+        ]
+
+    async def test_large_paste(self, db):
+        service = ItemService(db)
+        text = "\n".join(f"product{i}" for i in range(1500))
+        result = await service.add_items(ItemsAddRequest(text=text, preferred_store="AH"))
+        assert result.count == 1500
+
+        result = await service.add_items(ItemsAddRequest(text=text))
+        assert all(not item.is_new and item.qty == 2.0 for item in result.items)
+        assert len(await service.get_items()) == 1500
+
+    async def test_add_with_category(self, db):
+        service = ItemService(db)
+        await service.add_items(ItemsAddRequest(text="kaas", category="dairy"))
+
+        items = await service.get_items()
+        assert get_category_registry().get(items[0].category_id).name == "dairy"
+
+    async def test_check_reopens_on_add(self, db):
+        service = ItemService(db)
+        added = await service.add_items(ItemsAddRequest(text="eieren"))
+        await service.check_item(added.items[0].id)
+        await service.add_items(ItemsAddRequest(text="eieren"))
+
+        item = await service.get_item(added.items[0].id)
+        assert item.status == ItemStatus.OPEN
+
+
+class TestItemsApi:
+    """Test item endpoints."""
+
+    async def test_add_list_check_delete(self, client):
+        response = await client.post("/api/v1/items:add", json={"text": "2x brood, melk 2L"})
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+
+        items = (await client.get("/api/v1/items")).json()
+        assert {item["name_norm"] for item in items} == {"brood", "melk"}
+
+        item_id = items[0]["id"]
+        checked = await client.post(f"/api/v1/items/{item_id}:check")
+        assert checked.json()["status"] == "checked"
+
+        deleted = await client.delete(f"/api/v1/items/{item_id}")
+        assert deleted.status_code == 200
+        remaining = (await client.get("/api/v1/items")).json()
+        assert item_id not in {item["id"] for item in remaining}
+
+    async def test_update_category(self, client, db):
+        added = (await client.post("/api/v1/items:add", json={"text": "appels"})).json()
+        categories = (await client.get("/api/v1/categories")).json()
+        produce = next(c for c in categories if c["name"] == "produce")
+
+        response = await client.patch(
+            f"/api/v1/items/{added['items'][0]['id']}",
+            json={"category_id": produce["id"]},
+        )
+        assert response.json()["category"]["name"] == "produce"
+
+    async def test_missing_item(self, client):
+        response = await client.get("/api/v1/items/does-not-exist")
+        assert response.status_code == 404
@@ -0,0 +1,103 @@
+"""Tests for schema migrations and the query plans of hot paths."""
+import re
+from contextlib import contextmanager
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import event, text
+
+from app.database import BASELINE_REVISION, Base, alembic_config, engine, run_migrations
+
+# A plain "SCAN <table>" is a full table scan; "SCAN ... USING INDEX" is not
+FULL_SCAN = re.compile(r"^SCAN (items|session_items|sessions)$")
+
+
+@contextmanager
+def capture_statements():
+    """Record every non-executemany statement the app sends to SQLite."""
+    statements: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def full_scans(statements: list[tuple[str, tuple]]) -> list[tuple[str, str]]:
+    """Return (statement, plan detail) for every full table scan."""
+    scans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            for row in plan:
+                if FULL_SCAN.match(row.detail):
+                    scans.append((statement, row.detail))
+    return scans
+
+
+class TestMigrations:
+    """Test the migration history."""
+
+    async def test_models_match_migrations(self, db):
+        async with engine.connect() as conn:
+            diff = await conn.run_sync(
+                lambda sync_conn: compare_metadata(
+                    MigrationContext.configure(sync_conn), Base.metadata
+                )
+            )
+        assert diff == []
+
+    async def test_existing_database_is_stamped(self, db):
+        # Recreate a pre-migration database: baseline tables, no version table
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                lambda sync_conn: command.downgrade(alembic_config(sync_conn), BASELINE_REVISION)
+            )
+            await conn.execute(text("DROP TABLE alembic_version"))
+
+        await run_migrations()
+
+        async with engine.connect() as conn:
+            indexes = {row.name for row in await conn.execute(text("PRAGMA index_list('items')"))}
+            assert {"ix_items_status_snooze_until", "ix_items_change_seq"} <= indexes
+
+
+class TestQueryPlans:
+    """Hot list and session queries must be served by indexes."""
+
+    async def test_item_and_export_queries(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk, kaas"})
+
+        with capture_statements() as statements:
+            await client.get("/api/v1/items")
+            await client.get("/api/v1/items?status=open")
+            await client.get("/api/v1/export/ah")
+            await client.get("/api/v1/export/jumbo?format=json&include_checked=true")
+            await client.get("/api/v1/export/all?simple=true")
+            await client.get("/api/v1/items/changes?since=1")
+            await client.post("/api/v1/items:add", json={"text": "brood, eieren"})
+
+        assert statements
+        assert await full_scans(statements) == []
+
+    async def test_session_queries(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk, kaas"})
+        items = (await client.get("/api/v1/items")).json()
+
+        with capture_statements() as statements:
+            session = (await client.post("/api/v1/sessions:start", json={"store": "AH"})).json()
+            await client.post(f"/api/v1/sessions/{session['id']}/items/{items[0]['id']}:check")
+            await client.get(f"/api/v1/sessions/{session['id']}")
+            await client.get("/api/v1/sessions")
+            await client.post(
+                f"/api/v1/sessions/{session['id']}:close", json={"policy": "snooze_leftovers"}
+            )
+
+        assert statements
+        assert await full_scans(statements) == []
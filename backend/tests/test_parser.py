@@ -1,6 +1,15 @@
 """Tests for the item parser."""
+import dataclasses
+
 import pytest
-from app.services.parser import parse_items, parse_single_item, normalize_name
+from app.config import get_settings
+from app.services.parser import (
+    configure_parse_cache,
+    normalize_name,
+    parse_cache_stats,
+    parse_items,
+    parse_single_item,
+)
 
 
 class TestNormalizeName:
@@ -72,6 +81,37 @@ class TestParseSingleItem:
         assert result.name == "pak hagelslag"
         assert result.qty == 1.0
 
+    def test_unit_prefix(self):
+        result = parse_single_item("500g gehakt")
+        assert (result.name, result.qty, result.unit) == ("gehakt", 500.0, "g")
+
+    def test_unit_prefix_separate_word(self):
+        result = parse_single_item("2 kilo aardappelen")
+        assert (result.name, result.qty, result.unit) == ("aardappelen", 2.0, "kg")
+
+    def test_unit_suffix_separate_word(self):
+        result = parse_single_item("melk 1,5 liter")
+        assert (result.name, result.qty, result.unit) == ("melk", 1.5, "L")
+
+    def test_bare_number_parsed_as_before(self):
+        # Unchanged from the regex parser: the quantity leaves one character
+        cases = {
+            "7": ("7", 1.0),
+            "12": ("2", 1.0),
+            "500": ("0", 50.0),
+            "1,5": (",5", 1.0),
+            "2.51": ("1", 2.5),
+            "007": ("7", 0.0),
+        }
+        for text, expected in cases.items():
+            result = parse_single_item(text)
+            assert (result.name, result.qty, result.unit) == (*expected, None)
+
+    def test_number_in_name_is_kept(self):
+        result = parse_single_item("cola 0.5l x")
+        assert result.name == "cola 0.5l x"
+        assert result.qty == 1.0
+
     def test_decimal_quantity(self):
         result = parse_single_item("1,5L melk")
         # This is tricky - the current parser might not handle this perfectly
@@ -100,6 +140,13 @@ class TestParseItems:
         assert results[1].unit == "L"
         assert results[2].unit == "g"
 
+    def test_decimal_comma_is_not_a_separator(self):
+        results = parse_items("1,5 liter melk, brood,2 kaas")
+        assert [(item.name, item.qty) for item in results] == [
+            ("melk", 1.5),
+            ("brood,2 kaas", 1.0),
+        ]
+
     def test_empty_input(self):
         results = parse_items("")
         assert len(results) == 0
@@ -109,3 +156,49 @@ class TestParseItems:
         assert len(results) == 2
         assert results[0].name == "brood"
         assert results[1].name == "melk"
+
+
+class TestParseCache:
+    """Test the parse and normalize memos."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        configure_parse_cache(8)
+        yield
+        configure_parse_cache(get_settings().parse_cache_size)
+
+    def test_repeated_phrases_hit_the_cache(self):
+        first = parse_items("2x brood, melk")
+        second = parse_items("melk, 2x brood")
+        assert first == second[::-1]
+        assert parse_cache_stats()["parse"]["hits"] == 2
+        assert parse_cache_stats()["parse"]["misses"] == 2
+
+        normalize_name("Halfvolle  Melk")
+        normalize_name("Halfvolle  Melk")
+        assert parse_cache_stats()["normalize"]["hit_rate"] == 0.5
+
+    def test_cache_is_bounded(self):
+        parse_items(", ".join(f"product{i}" for i in range(20)))
+        assert parse_cache_stats()["parse"]["entries"] == 8
+
+    def test_long_fragments_are_not_cached(self):
+        long_name = "zeer lange omschrijving " * 20
+        items = parse_items(f"2x {long_name}, melk")
+        assert items[0].qty == 2
+        assert normalize_name(long_name) == long_name.strip()
+
+        stats = parse_cache_stats()
+        assert stats["parse"]["entries"] == 1
+        assert stats["parse"]["misses"] == 1
+        assert stats["normalize"]["entries"] == 0
+
+    def test_cached_results_are_immutable(self):
+        result = parse_single_item("2x brood")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.qty = 3
+
+    def test_disabled(self):
+        configure_parse_cache(0)
+        parse_items("melk, melk")
+        assert parse_cache_stats()["parse"]["hits"] == 0
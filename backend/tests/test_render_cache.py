@@ -0,0 +1,99 @@
+"""Tests for the versioned render cache."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.database import engine
+from app.services.render_cache import RenderCache, RenderedBody, get_render_cache
+
+
+def body(text: str) -> RenderedBody:
+    return RenderedBody(content=text.encode(), media_type="text/plain")
+
+
+class TestRenderCache:
+    """Test cache bookkeeping."""
+
+    def test_hit_on_same_version(self):
+        cache = RenderCache(max_entries=4)
+        cache.put("a", 1, body("x"))
+        assert cache.get("a", 1).content == b"x"
+        assert cache.stats()["hits"] == 1
+
+    def test_new_version_invalidates(self):
+        cache = RenderCache(max_entries=4)
+        cache.put("a", 1, body("x"))
+        assert cache.get("a", 2) is None
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["misses"] == 1
+
+    def test_snooze_deadline_expires_entry(self):
+        cache = RenderCache(max_entries=4)
+        cache.put("a", 1, body("x"), expires_at=datetime.utcnow() - timedelta(seconds=1))
+        assert cache.get("a", 1) is None
+
+    def test_least_recently_used_is_evicted(self):
+        cache = RenderCache(max_entries=2)
+        cache.put("a", 1, body("a"))
+        cache.put("b", 1, body("b"))
+        cache.get("a", 1)
+        cache.put("c", 1, body("c"))
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) is not None
+        assert cache.stats()["evictions"] == 1
+
+
+class TestCachedEndpoints:
+    """Test cached list and export responses."""
+
+    async def test_repeated_export_skips_database(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, 2 melk"})
+        url = "/api/v1/export/ah"
+        first = await client.get(url)
+
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            second = await client.get(url)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        assert second.status_code == 200
+        assert second.text == first.text
+        assert second.headers["content-type"] == first.headers["content-type"]
+        assert statements == []
+
+    async def test_write_invalidates_cached_bodies(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+        assert "melk" not in (await client.get("/api/v1/export/ah?simple=true")).text
+        names = [item["name_raw"] for item in (await client.get("/api/v1/items")).json()]
+        assert names == ["brood"]
+
+        await client.post("/api/v1/items:add", json={"text": "melk"})
+        assert "melk" in (await client.get("/api/v1/export/ah?simple=true")).text
+        names = [item["name_raw"] for item in (await client.get("/api/v1/items")).json()]
+        assert sorted(names) == ["brood", "melk"]
+
+    async def test_filters_are_cached_separately(self, client):
+        added = (await client.post("/api/v1/items:add", json={"text": "brood, melk"})).json()
+        await client.post(f"/api/v1/items/{added['items'][0]['id']}:check")
+
+        open_items = (await client.get("/api/v1/items?status=open")).json()
+        checked_items = (await client.get("/api/v1/items?status=checked")).json()
+        assert [item["name_raw"] for item in open_items] == ["melk"]
+        assert [item["name_raw"] for item in checked_items] == ["brood"]
+
+    async def test_cached_item_list_matches_schema(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood", "category": "bakkerij"})
+        first = (await client.get("/api/v1/items")).json()
+        second = (await client.get("/api/v1/items")).json()
+        assert first == second
+        assert first[0]["status"] == "open"
+
+    async def test_stats_endpoint(self, client):
+        await client.get("/api/v1/export/ah")
+        await client.get("/api/v1/export/ah")
+        stats = (await client.get("/health/cache")).json()["render"]
+        assert stats["hits"] >= 1
+        assert stats["max_entries"] == get_render_cache().max_entries
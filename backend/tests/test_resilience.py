@@ -0,0 +1,192 @@
+"""Tests for the AH client's rate limiter, retries and circuit breaker."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.resilience import CircuitBreaker, CircuitOpenError, CircuitState, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    """Test the token bucket."""
+
+    async def test_burst_then_rate(self, monkeypatch):
+        clock = FakeClock()
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock.now += seconds
+
+        monkeypatch.setattr("app.services.resilience.asyncio.sleep", fake_sleep)
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+        for _ in range(5):
+            await bucket.acquire()
+
+        # Three from the burst, then one every half second
+        assert sleeps == [0.5, 0.5]
+        assert bucket.waits == 2
+
+    async def test_disabled(self):
+        bucket = TokenBucket(rate=0, capacity=1)
+        for _ in range(100):
+            await bucket.acquire()
+        assert bucket.waits == 0
+
+
+class TestCircuitBreaker:
+    """Test the circuit breaker state machine."""
+
+    def test_opens_after_consecutive_failures(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+    def test_half_open_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 30
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.check()
+        # A failed probe reopens for another cool-down
+        breaker.record_failure()
+        assert breaker.status()["state"] == CircuitState.OPEN
+        assert breaker.status()["retry_in"] == 30
+
+        clock.now = 60
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.times_opened == 2
+
+    def test_half_open_lets_one_probe_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 30
+        breaker.check()
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+        # The probe's outcome decides for everyone
+        breaker.record_success()
+        breaker.check()
+        breaker.check()
+
+    def test_lost_probe_is_replaced(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 30
+        breaker.check()
+        clock.now = 59
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+        clock.now = 60
+        breaker.check()
+
+
+class TestAHClient:
+    """Test retries and fail-fast against the AH stub."""
+
+    async def test_search_retries_server_errors(self, ah, stub):
+        stub.faults = [503, 502]
+        product = await ah.search_product("melk")
+
+        assert product.title == "AH melk"
+        assert ah.stats["retries"] == 2
+
+    async def test_gives_up_after_max_attempts(self, ah, stub, monkeypatch):
+        monkeypatch.setattr(ah.settings, "ah_retry_attempts", 2)
+        await ah.search_product("melk")
+        stub.faults = [503, 503, 503, 503]
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await ah.search_product("brood")
+        assert ah.stats["retries"] == 2
+
+    async def test_patch_is_not_retried_on_server_error(self, ah, stub):
+        await ah.search_product("melk")
+        stub.faults = [500]
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await ah.add_to_shopping_list(1)
+        assert stub.patches == 1
+        assert stub.shopping_list == []
+
+    async def test_rate_limited_patch_is_retried(self, ah, stub):
+        await ah.search_product("melk")
+        stub.faults = [429]
+        stub.retry_after = "0"
+
+        assert await ah.add_to_shopping_list(1)
+        assert stub.patches == 2
+        assert ah.stats["rate_limited"] == 1
+
+    async def test_long_retry_after_is_not_waited_for(self, ah, stub):
+        await ah.search_product("melk")
+        stub.faults = [429]
+        stub.retry_after = "3600"
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await ah.search_product("brood")
+        assert ah.stats["retries"] == 0
+
+    async def test_circuit_opens_when_ah_is_down(self, ah, stub, monkeypatch):
+        monkeypatch.setattr(ah.settings, "ah_sync_concurrency", 1)
+        await ah.search_product("melk")
+        ah.breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        stub.down = True
+
+        results = await ah.sync_items([{"name": f"product{i}", "qty": 1} for i in range(20)])
+        assert {r.status for r in results} == {"error"}
+        # Only the requests before the circuit opened reached AH
+        assert stub.searches == 1 + 3
+        assert ah.status()["circuit"]["state"] == "open"
+        assert any("unavailable" in r.error for r in results)
+
+    async def test_status_endpoint(self, client):
+        response = await client.get("/health/ah")
+        assert response.status_code == 200
+        assert response.json()["circuit"]["state"] == "closed"
+        assert "tokens" in response.json()["rate_limit"]
+
+    async def test_concurrent_calls_after_cool_down(self, ah, stub, monkeypatch):
+        """Only one request probes an AH that is still down."""
+        monkeypatch.setattr(ah.settings, "ah_retry_attempts", 0)
+        clock = FakeClock()
+        ah.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+        stub.down = True
+        with pytest.raises(httpx.HTTPStatusError):
+            await ah._request("POST", f"{ah.base_url}/mobile-auth/v1/auth/token/anonymous")
+
+        clock.now = 30
+        stub.latency = 0.05
+        results = await asyncio.gather(*[
+            ah._request("POST", f"{ah.base_url}/mobile-auth/v1/auth/token/anonymous")
+            for _ in range(2)
+        ], return_exceptions=True)
+
+        assert sorted(type(r).__name__ for r in results) == ["CircuitOpenError", "HTTPStatusError"]
+        assert stub.calls[("POST", "/mobile-auth/v1/auth/token/anonymous")] == 2
@@ -0,0 +1,127 @@
+"""Tests for shopping sessions."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.database import engine
+from app.models.item import Item, ItemStatus
+from app.models.session import ClosePolicy, SessionItem, SessionItemState
+from app.schemas.item import ItemsAddRequest
+from app.schemas.session import SessionCloseRequest, SessionStartRequest
+from app.services.items import ItemService
+from app.services.sessions import SessionService
+
+
+class TestSessionService:
+    """Test session business logic."""
+
+    async def test_start_snapshots_matching_items(self, db):
+        item_service = ItemService(db)
+        await item_service.add_items(ItemsAddRequest(text="brood, 2x melk"))
+        await item_service.add_items(ItemsAddRequest(text="hagelslag", preferred_store="Jumbo"))
+        service = SessionService(db)
+
+        session = await service.start_session(SessionStartRequest(store="AH"))
+
+        result = await db.execute(
+            select(Item.name_norm, SessionItem.qty_at_export, SessionItem.state)
+            .join(Item, Item.id == SessionItem.item_id)
+            .where(SessionItem.session_id == session.id)
+            .order_by(Item.name_norm)
+        )
+        assert result.all() == [
+            ("brood", 1.0, SessionItemState.EXPORTED),
+            ("melk", 2.0, SessionItemState.EXPORTED),
+        ]
+        assert await service.get_session_stats(session) == {"item_count": 2, "checked_count": 0}
+
+    @pytest.mark.parametrize(
+        "policy", [ClosePolicy.SNOOZE_LEFTOVERS, ClosePolicy.REMOVE_LEFTOVERS]
+    )
+    async def test_close_policy_on_large_session(self, db, policy):
+        item_service = ItemService(db)
+        await item_service.add_items(
+            ItemsAddRequest(text="\n".join(f"product{i}" for i in range(3000)))
+        )
+        service = SessionService(db)
+        session = await service.start_session(SessionStartRequest())
+
+        checked = (await item_service.get_items())[:100]
+        for item in checked:
+            await service.check_session_item(session.id, item.id)
+
+        await service.close_session(session.id, SessionCloseRequest(policy=policy))
+
+        counts = dict(
+            (await db.execute(
+                select(SessionItem.state, func.count())
+                .where(SessionItem.session_id == session.id)
+                .group_by(SessionItem.state)
+            )).all()
+        )
+        assert counts == {SessionItemState.CHECKED: 100, SessionItemState.LEFTOVER: 2900}
+
+        if policy == ClosePolicy.SNOOZE_LEFTOVERS:
+            snoozed = await db.scalar(
+                select(func.count()).where(Item.snooze_until > datetime.utcnow())
+            )
+            assert snoozed == 2900
+        else:
+            removed = await db.scalar(
+                select(func.count()).where(Item.status == ItemStatus.REMOVED)
+            )
+            assert removed == 2900
+        assert await db.scalar(
+            select(func.count()).where(Item.status == ItemStatus.CHECKED)
+        ) == 100
+
+
+class TestSessionsApi:
+    """Test session endpoints."""
+
+    async def test_start_check_close(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk, kaas"})
+
+        session = (await client.post("/api/v1/sessions:start", json={})).json()
+        assert session["item_count"] == 3
+        assert session["checked_count"] == 0
+
+        items = (await client.get("/api/v1/items")).json()
+        await client.post(f"/api/v1/sessions/{session['id']}/items/{items[0]['id']}:check")
+
+        closed = (
+            await client.post(
+                f"/api/v1/sessions/{session['id']}:close",
+                json={"policy": "remove_leftovers"},
+            )
+        ).json()
+        assert closed["closed_at"] is not None
+        assert closed["checked_count"] == 1
+
+        remaining = (await client.get("/api/v1/items")).json()
+        assert [item["status"] for item in remaining] == ["checked"]
+
+        sessions = (await client.get("/api/v1/sessions")).json()
+        assert sessions[0]["id"] == session["id"]
+        assert sessions[0]["item_count"] == 3
+
+    async def test_list_sessions_query_count(self, client):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        for _ in range(5):
+            await client.post("/api/v1/sessions:start", json={})
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            sessions = (await client.get("/api/v1/sessions")).json()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        assert [s["item_count"] for s in sessions] == [2] * 5
+        # The page of sessions and one aggregate for all their stats
+        assert len([s for s in statements if s.startswith("SELECT")]) == 2
@@ -0,0 +1,218 @@
+"""Tests for background AH sync jobs."""
+import pytest
+from sqlalchemy import select
+
+from app.database import SessionLocal, WriteSessionLocal
+from app.models.sync_job import SyncJob, SyncJobStatus
+from app.services import sync_jobs
+from app.services.sync_jobs import INTERRUPTED_ERROR, SyncWorker
+
+
+@pytest.fixture
+async def worker(db, ah, monkeypatch):
+    """Sync worker running against the AH stub."""
+    worker = SyncWorker(ah_service=ah)
+    monkeypatch.setattr(sync_jobs, "_sync_worker", worker)
+    await worker.start()
+    yield worker
+    await worker.stop()
+
+
+class TestSyncJobs:
+    """Test queuing, running and polling sync jobs."""
+
+    async def test_sync_runs_in_background(self, client, worker, stub):
+        stub.unknown = {"tandpasta"}
+        await client.post("/api/v1/items:add", json={"text": "brood, tandpasta, melk"})
+
+        response = await client.post("/api/v1/sync/ah")
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+
+        assert await worker.wait(job["id"], timeout=5)
+        job = (await client.get(f"/api/v1/sync/jobs/{job['id']}")).json()
+        assert job["status"] == "done"
+        assert (job["total"], job["processed"]) == (3, 3)
+        assert (job["synced"], job["not_found"], job["failed"]) == (2, 1, 0)
+        assert sorted((r["item"], r["status"]) for r in job["results"]) == [
+            ("brood", "ok"),
+            ("melk", "ok"),
+            ("tandpasta", "not_found"),
+        ]
+        assert len(stub.shopping_list) == 2
+
+    async def test_nothing_to_sync(self, client, worker):
+        assert (await client.post("/api/v1/sync/ah")).status_code == 404
+        response = await client.post("/api/v1/sync/ah/simple")
+        assert response.text == "Geen items om te synchroniseren."
+
+    async def test_unknown_job(self, client, worker):
+        assert (await client.get("/api/v1/sync/jobs/nope")).status_code == 404
+
+    async def test_simple_waits_for_result(self, client, worker):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        response = await client.post("/api/v1/sync/ah/simple")
+        assert response.text == "2 items toegevoegd aan Appie."
+
+    async def test_simple_answers_before_slow_sync_finishes(
+        self, client, worker, stub, monkeypatch
+    ):
+        stub.latency = 0.3
+        monkeypatch.setattr(worker.ah_service.settings, "ah_sync_wait_seconds", 0.05)
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+
+        response = await client.post("/api/v1/sync/ah/simple")
+        assert response.text == "Bezig met synchroniseren naar Appie..."
+
+        async with SessionLocal() as db:
+            job = (await db.execute(select(SyncJob))).scalar_one()
+        assert await worker.wait(job.id, timeout=5)
+        assert len(stub.shopping_list) == 2
+
+    async def test_simple_joins_queued_job(self, client, worker, stub):
+        """Waiting on an already queued job doesn't block its writes."""
+        stub.latency = 0.05
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        running = (await client.post("/api/v1/sync/ah")).json()
+        queued = (await client.post("/api/v1/sync/ah")).json()
+
+        response = await client.post("/api/v1/sync/ah/simple")
+        assert response.text == "Appie is al bijgewerkt."
+
+        for job_id in (running["id"], queued["id"]):
+            job = (await client.get(f"/api/v1/sync/jobs/{job_id}")).json()
+            assert (job["status"], job["error"]) == ("done", None)
+
+    async def test_crashed_job_is_marked_failed(self, client, worker, monkeypatch):
+        """A job whose run crashes before it starts doesn't stay queued."""
+        async def crash(job_id):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(worker, "_process", crash)
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+        job = (await client.post("/api/v1/sync/ah")).json()
+        assert await worker.wait(job["id"], timeout=5)
+
+        job = (await client.get(f"/api/v1/sync/jobs/{job['id']}")).json()
+        assert (job["status"], job["error"]) == ("failed", "database is locked")
+
+    async def test_orphaned_queued_job_is_rescheduled(self, client, worker, stub):
+        """A queued job this process isn't running is picked up by the next enqueue."""
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+        orphan = SyncJob(status=SyncJobStatus.QUEUED)
+        async with WriteSessionLocal() as session:
+            session.add(orphan)
+            await session.commit()
+
+        job = (await client.post("/api/v1/sync/ah")).json()
+        assert job["id"] == orphan.id
+        assert await worker.wait(orphan.id, timeout=5)
+        job = (await client.get(f"/api/v1/sync/jobs/{orphan.id}")).json()
+        assert job["status"] == "done"
+
+    async def test_failed_sync(self, client, worker, monkeypatch):
+        monkeypatch.setattr(worker.ah_service.settings, "ah_password", "")
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+
+        response = await client.post("/api/v1/sync/ah/simple")
+        assert response.text.startswith("AH sync mislukt: AH credentials not configured")
+
+    async def test_restart_resumes_queued_jobs(self, ah, stub, client):
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+        interrupted = SyncJob(status=SyncJobStatus.RUNNING)
+        queued = SyncJob(status=SyncJobStatus.QUEUED)
+        async with WriteSessionLocal() as session:
+            session.add_all([interrupted, queued])
+            await session.commit()
+
+        worker = SyncWorker(ah_service=ah)
+        await worker.start()
+        try:
+            assert await worker.wait(queued.id, timeout=5)
+        finally:
+            await worker.stop()
+
+        async with SessionLocal() as session:
+            interrupted = await session.get(SyncJob, interrupted.id)
+            queued = await session.get(SyncJob, queued.id)
+        assert (interrupted.status, interrupted.error) == (SyncJobStatus.FAILED, INTERRUPTED_ERROR)
+        assert (queued.status, queued.synced) == (SyncJobStatus.DONE, 1)
+        assert len(stub.shopping_list) == 1
+
+
+async def run_sync(client, worker, full_resync: bool = False) -> dict:
+    """Sync and wait for the job; returns the finished job."""
+    job = (await client.post(f"/api/v1/sync/ah?full_resync={str(full_resync).lower()}")).json()
+    assert await worker.wait(job["id"], timeout=5)
+    return (await client.get(f"/api/v1/sync/jobs/{job['id']}")).json()
+
+
+class TestIncrementalSync:
+    """Only changes since the last sync are pushed."""
+
+    async def test_repeat_sync_pushes_nothing(self, client, worker, stub):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk, kaas"})
+        await run_sync(client, worker)
+        requests = sum(stub.calls.values())
+
+        job = await run_sync(client, worker)
+        assert (job["synced"], job["unchanged"]) == (0, 3)
+        assert {r["status"] for r in job["results"]} == {"unchanged"}
+        assert sum(stub.calls.values()) == requests
+        assert len(stub.shopping_list) == 3
+
+        response = await client.post("/api/v1/sync/ah/simple")
+        assert response.text == "Appie is al bijgewerkt."
+
+    async def test_pushes_new_items_and_increases(self, client, worker, stub):
+        await client.post("/api/v1/items:add", json={"text": "brood, 2x melk"})
+        await run_sync(client, worker)
+        searches = stub.searches
+
+        await client.post("/api/v1/items:add", json={"text": "3x brood, melk, eieren"})
+        items = {item["name_norm"]: item for item in (await client.get("/api/v1/items")).json()}
+        await client.patch(f"/api/v1/items/{items['melk']['id']}", json={"qty": 1})
+
+        job = await run_sync(client, worker)
+        assert (job["synced"], job["unchanged"]) == (2, 1)
+        # Only the new item was searched; brood went to its known product
+        assert stub.searches == searches + 1
+        pushed = {(item["productId"], item["quantity"]) for item in stub.shopping_list[2:]}
+        assert pushed == {(stub.product_ids["brood"], 3), (stub.product_ids["eieren"], 1)}
+
+    async def test_checked_item_is_pushed_again(self, client, worker, stub):
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+        await run_sync(client, worker)
+        item = (await client.get("/api/v1/items")).json()[0]
+
+        await client.post(f"/api/v1/items/{item['id']}:check")
+        await client.post("/api/v1/items:add", json={"text": "brood"})
+        job = await run_sync(client, worker)
+
+        # Re-adding a checked item reopens it with the quantities summed
+        assert job["synced"] == 1
+        assert [item["quantity"] for item in stub.shopping_list] == [1, 2]
+
+    async def test_renamed_item_is_pushed_as_new_product(self, client, worker, stub):
+        await client.post("/api/v1/items:add", json={"text": "2x brood"})
+        await run_sync(client, worker)
+        item = (await client.get("/api/v1/items")).json()[0]
+
+        await client.patch(f"/api/v1/items/{item['id']}", json={"name_raw": "kaas"})
+        job = await run_sync(client, worker)
+
+        assert [(r["item"], r["status"], r["ah_product"]) for r in job["results"]] == [
+            ("kaas", "ok", "AH kaas")
+        ]
+        assert stub.shopping_list[-1]["productId"] == stub.product_ids["kaas"]
+        assert stub.shopping_list[-1]["quantity"] == 2
+
+    async def test_full_resync(self, client, worker, stub):
+        await client.post("/api/v1/items:add", json={"text": "brood, melk"})
+        await run_sync(client, worker)
+
+        job = await run_sync(client, worker, full_resync=True)
+        assert job["full_resync"] is True
+        assert (job["synced"], job["unchanged"]) == (2, 0)
+        assert len(stub.shopping_list) == 4
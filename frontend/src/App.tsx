@@ -1,5 +1,5 @@
 import { useState } from 'react'
-import { useItems, useCategories, groupItemsByCategory } from './hooks/useItems'
+import { useItems, useItemStream, useCategories, groupItemsByCategory } from './hooks/useItems'
 import AddItemForm from './components/AddItemForm'
 import ItemList from './components/ItemList'
 import ExportButtons from './components/ExportButtons'
@@ -7,6 +7,7 @@ import ExportButtons from './components/ExportButtons'
 function App() {
   const [showChecked, setShowChecked] = useState(false)
   const { data: items, isLoading, error, refetch } = useItems()
+  useItemStream()
   const { data: categories } = useCategories()
 
   const openItems = items?.filter((item) => item.status === 'open') ?? []
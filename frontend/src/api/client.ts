@@ -1,6 +1,6 @@
 import type { Item, Category, AddItemsRequest, AddItemsResponse, UpdateItemRequest } from '../types'
 
-const API_BASE = '/api/v1'
+export const API_BASE = '/api/v1'
 
 async function fetchApi<T>(path: string, options?: RequestInit): Promise<T> {
   const response = await fetch(`${API_BASE}${path}`, {
@@ -1,6 +1,14 @@
+import { useEffect } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import * as api from '../api/client'
-import type { Item, AddItemsRequest, UpdateItemRequest, GroupedItems, Category } from '../types'
+import type {
+  Item,
+  ItemChangeEvent,
+  AddItemsRequest,
+  UpdateItemRequest,
+  GroupedItems,
+  Category,
+} from '../types'
 
 export function useItems() {
   return useQuery({
@@ -9,6 +17,46 @@ export function useItems() {
   })
 }
 
+// Apply changes made on other devices as they happen
+export function useItemStream() {
+  const queryClient = useQueryClient()
+
+  useEffect(() => {
+    const source = new EventSource(`${api.API_BASE}/items/stream`)
+    let connected = false
+    const refetch = () => queryClient.invalidateQueries({ queryKey: ['items'] })
+
+    source.addEventListener('ready', () => {
+      // Changes may have been missed while reconnecting
+      if (connected) refetch()
+      connected = true
+    })
+    source.addEventListener('resync', refetch)
+    source.addEventListener('item', (message) => {
+      const change: ItemChangeEvent = JSON.parse((message as MessageEvent).data)
+      const items = queryClient.getQueryData<Item[]>(['items'])
+
+      // New items need the full record
+      if (!items?.some((item) => item.id === change.id)) {
+        refetch()
+        return
+      }
+
+      queryClient.setQueryData<Item[]>(['items'], (old) =>
+        change.status === 'removed'
+          ? old?.filter((item) => item.id !== change.id)
+          : old?.map((item) =>
+              item.id === change.id
+                ? { ...item, status: change.status ?? item.status, qty: change.qty ?? item.qty }
+                : item
+            )
+      )
+    })
+
+    return () => source.close()
+  }, [queryClient])
+}
+
 export function useCategories() {
   return useQuery({
     queryKey: ['categories'],
@@ -27,6 +27,15 @@ export interface Item {
   last_added_at: string
 }
 
+// Event from GET /items/stream
+export interface ItemChangeEvent {
+  type: 'ready' | 'item' | 'resync'
+  version: number
+  id?: string
+  status?: ItemStatus
+  qty?: number
+}
+
 export interface AddedItem {
   id: string
   name: string